@@ -29,6 +29,8 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import time
+
 from ansible.module_utils.basic import missing_required_lib
 
 try:
@@ -70,14 +72,35 @@ def aws_cvs_host_argument_spec():
     )
 
 
+# job states reported by Jobs/<id>, any other state is considered as in progress
+JOB_SUCCESS_STATES = ('done',)
+JOB_FAILURE_STATES = ('error', 'failed')
+
+
+def get_retry_after(response, default):
+    ''' return the delay in seconds requested in a Retry-After header, or default
+        an HTTP date is not supported, and the default is used
+    '''
+    try:
+        return max(0, int(response.headers.get('Retry-After')))
+    except (AttributeError, TypeError, ValueError):
+        return default
+
+
 class AwsCvsRestAPI(object):
-    def __init__(self, module, timeout=60):
+    def __init__(self, module, timeout=60, job_timeout=3600, max_retries=3):
+        ''' timeout: HTTP timeout for each request
+            job_timeout: maximum time in seconds to wait for a job to complete
+            max_retries: number of retries when a request is throttled (429)
+        '''
         self.module = module
         self.api_key = self.module.params['api_key']
         self.secret_key = self.module.params['secret_key']
         self.api_url = self.module.params['api_url']
         self.verify = self.module.params['validate_certs']
         self.timeout = timeout
+        self.job_timeout = job_timeout
+        self.max_retries = max_retries
         self.url = 'https://' + self.api_url + '/v1/'
         self.check_required_library()
 
@@ -114,7 +137,7 @@ class AwsCvsRestAPI(object):
                 error = None
             return json, error
         try:
-            response = requests.request(method, url, headers=headers, timeout=self.timeout, json=json)
+            response = self.request_with_retries(method, url, headers=headers, json=json)
             # If the response was successful, no Exception will be raised
             json_dict, json_error = get_json(response)
         except requests.exceptions.HTTPError as err:
@@ -130,6 +153,17 @@ class AwsCvsRestAPI(object):
 
         return json_dict, error_details
 
+    def request_with_retries(self, method, url, headers, json):
+        ''' issue the request, and retry when throttled, honouring Retry-After if present '''
+        delay = 1
+        for retry in range(self.max_retries + 1):
+            response = requests.request(method, url, headers=headers, timeout=self.timeout, json=json)
+            if response.status_code != 429 or retry == self.max_retries:
+                break
+            time.sleep(get_retry_after(response, delay))
+            delay *= 2
+        return response
+
     # If an error was reported in the json payload, it is handled below
     def get(self, api, params=None):
         method = 'GET'
@@ -151,9 +185,55 @@ class AwsCvsRestAPI(object):
         method = 'DELETE'
         return self.send_request(method, api, params, json=data)
 
-    def get_state(self, job_id):
-        """ Method to get the state of the job """
-        response, dummy = self.get('Jobs/%s' % job_id)
-        while str(response['state']) not in 'done':
-            response, dummy = self.get('Jobs/%s' % job_id)
-        return 'done'
+    def get_state(self, job_id, timeout=None):
+        """ Method to get the state of the job
+            wait for the job to complete, and return its final state
+            on timeout or persistent errors, the last known state is returned
+        """
+        state, dummy = self.wait_on_jobs([job_id], timeout)[job_id]
+        return state
+
+    def wait_on_jobs(self, job_ids, timeout=None, max_interval=30, max_consecutive_errors=3):
+        """ wait for several jobs to complete, polling with an exponential backoff
+            timeout: defaults to job_timeout
+            return a dict indexed by job id, with a (state, error) tuple for each job
+            error is set if the job failed, timed out, or could not be queried
+        """
+        if timeout is None:
+            timeout = self.job_timeout
+        results = dict()
+        errors = dict((job_id, 0) for job_id in job_ids)
+        pending = list(job_ids)
+        deadline = time.time() + timeout
+        interval = 1
+        while True:
+            for job_id in list(pending):
+                response, error = self.get('Jobs/%s' % job_id)
+                state = response.get('state') if isinstance(response, dict) else None
+                if error is not None or state is None:
+                    errors[job_id] += 1
+                    if error is None:
+                        error = 'Error: unexpected response for job %s: %s' % (job_id, repr(response))
+                    previous_state = results.get(job_id, (None, None))[0]
+                    results[job_id] = (previous_state, error)
+                    if errors[job_id] >= max_consecutive_errors:
+                        pending.remove(job_id)
+                    continue
+                errors[job_id] = 0
+                state = str(state)
+                if state in JOB_FAILURE_STATES:
+                    results[job_id] = (state, 'Error: job %s failed: %s' % (job_id, response.get('stateDetails', state)))
+                    pending.remove(job_id)
+                elif state in JOB_SUCCESS_STATES:
+                    results[job_id] = (state, None)
+                    pending.remove(job_id)
+                else:
+                    results[job_id] = (state, None)
+            remaining = deadline - time.time()
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+        for job_id in pending:
+            results[job_id] = (results[job_id][0], 'Error: timeout waiting for job %s, last state: %s' % (job_id, results[job_id][0]))
+        return results
@@ -106,6 +106,13 @@ options:
                   description:
                   - Should fileSystem have read write permission or not
                   type: bool
+
+  job_timeout:
+    description:
+    - Maximum time in seconds to wait for a create, update, or delete job to complete.
+    type: int
+    default: 3600
+    version_added: 21.3.0
 '''
 
 EXAMPLES = """
@@ -187,6 +194,7 @@ class AwsCvsNetappFileSystem(object):
             creationToken=dict(required=True, type='str'),
             quotaInBytes=dict(required=False, type='int'),
             serviceLevel=dict(required=False, choices=['standard', 'premium', 'extreme']),
+            job_timeout=dict(required=False, type='int', default=3600),
             exportPolicy=dict(
                 type='dict',
                 options=dict(
@@ -221,7 +229,8 @@ class AwsCvsNetappFileSystem(object):
         self.parameters = self.na_helper.set_parameters(self.module.params)
 
         # Calling generic AWSCVS restApi class
-        self.rest_api = AwsCvsRestAPI(self.module)
+        # job_timeout is not part of the FileSystems request body
+        self.rest_api = AwsCvsRestAPI(self.module, job_timeout=self.parameters.pop('job_timeout'))
 
         self.data = {}
         for key in self.parameters.keys():
@@ -249,27 +258,24 @@ class AwsCvsNetappFileSystem(object):
             return filesystem_info
         return None
 
-    def is_job_done(self, response):
-        # check jobId is present and equal to 'done'
-        # return True on success, False otherwise
+    def wait_for_job(self, response, action):
+        # wait for the job in response to complete
+        # return None on success, an error message if the job failed, timed out, or is not found
         try:
             job_id = response['jobs'][0]['jobId']
-        except TypeError:
-            job_id = None
-
-        if job_id is not None and self.rest_api.get_state(job_id) == 'done':
-            return True
-        return False
+        except (TypeError, KeyError, IndexError):
+            return "Error: unexpected response on FileSystems %s: %s" % (action, str(response))
+        dummy, error = self.rest_api.wait_on_jobs([job_id])[job_id]
+        return error
 
     def create_filesystem(self):
         # Create fileSystem
         api = 'FileSystems'
         response, error = self.rest_api.post(api, self.data)
         if not error:
-            if self.is_job_done(response):
-                return
-            error = "Error: unexpected response on FileSystems create: %s" % str(response)
-        self.module.fail_json(msg=error)
+            error = self.wait_for_job(response, 'create')
+        if error:
+            self.module.fail_json(msg=error)
 
     def delete_filesystem(self, filesystem_id):
         # Delete FileSystem
@@ -277,20 +283,18 @@ class AwsCvsNetappFileSystem(object):
         self.data = None
         response, error = self.rest_api.delete(api, self.data)
         if not error:
-            if self.is_job_done(response):
-                return
-            error = "Error: unexpected response on FileSystems delete: %s" % str(response)
-        self.module.fail_json(msg=error)
+            error = self.wait_for_job(response, 'delete')
+        if error:
+            self.module.fail_json(msg=error)
 
     def update_filesystem(self, filesystem_id):
         # Update FileSystem
         api = 'FileSystems/' + filesystem_id
         response, error = self.rest_api.put(api, self.data)
         if not error:
-            if self.is_job_done(response):
-                return
-            error = "Error: unexpected response on FileSystems update: %s" % str(response)
-        self.module.fail_json(msg=error)
+            error = self.wait_for_job(response, 'update')
+        if error:
+            self.module.fail_json(msg=error)
 
     def apply(self):
         """
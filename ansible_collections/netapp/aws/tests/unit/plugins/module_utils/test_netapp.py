@@ -0,0 +1,120 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils netapp.py - AWS CVS job tracking '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+from ansible_collections.netapp.aws.tests.unit.compat.mock import patch, Mock
+import ansible_collections.netapp.aws.plugins.module_utils.netapp as netapp_utils
+
+
+def set_module_args(args):
+    """prepare arguments so that they will be picked up during module creation"""
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)  # pylint: disable=protected-access
+
+
+def create_restapi_object(**kwargs):
+    set_module_args(dict(api_url='api_url', api_key='api_key', secret_key='secret_key'))
+    module = basic.AnsibleModule(netapp_utils.aws_cvs_host_argument_spec())
+    return netapp_utils.AwsCvsRestAPI(module, **kwargs)
+
+
+def mock_response(status_code, json_dict, headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.json.return_value = json_dict
+    response.headers = headers or dict()
+    return response
+
+
+class JobServer(object):
+    ''' return a sequence of states for each job '''
+
+    def __init__(self, states):
+        self.states = states
+        self.calls = list()
+
+    def get(self, api, params=None):
+        self.calls.append(api)
+        job_id = api.split('/')[1]
+        state = self.states[job_id].pop(0)
+        if isinstance(state, tuple):
+            return state
+        return dict(jobId=job_id, state=state), None
+
+
+@patch('time.sleep')
+def test_get_state_backoff(mock_sleep):
+    rest_api = create_restapi_object()
+    server = JobServer(dict(job1=['ongoing'] * 6 + ['done']))
+    with patch.object(rest_api, 'get', server.get):
+        assert rest_api.get_state('job1') == 'done'
+    assert len(server.calls) == 7
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [1, 2, 4, 8, 16, 30]
+
+
+@patch('time.sleep')
+def test_wait_on_jobs(mock_sleep):
+    rest_api = create_restapi_object()
+    server = JobServer(dict(
+        job1=['ongoing', 'done'],
+        job2=['ongoing', 'ongoing', 'error'],
+        job3=[(None, 'connection error'), 'ongoing', (None, 'error 1'), (None, 'error 2'), (None, 'error 3')],
+    ))
+    with patch.object(rest_api, 'get', server.get):
+        results = rest_api.wait_on_jobs(['job1', 'job2', 'job3'])
+    assert results['job1'] == ('done', None)
+    assert results['job2'] == ('error', 'Error: job job2 failed: error')
+    assert results['job3'] == ('ongoing', 'error 3')
+    # the jobs are polled in the same rounds
+    assert mock_sleep.call_count == 4
+
+
+@patch('time.time')
+@patch('time.sleep')
+def test_wait_on_jobs_timeout(mock_sleep, mock_time):
+    clock = [0]
+
+    def sleep(delay):
+        clock[0] += delay
+
+    mock_sleep.side_effect = sleep
+    mock_time.side_effect = lambda: clock[0]
+    rest_api = create_restapi_object(job_timeout=10)
+    server = JobServer(dict(job1=['ongoing'] * 10))
+    with patch.object(rest_api, 'get', server.get):
+        assert rest_api.get_state('job1') == 'ongoing'
+        results = rest_api.wait_on_jobs(['job1'], timeout=2)
+    assert results['job1'] == ('ongoing', 'Error: timeout waiting for job job1, last state: ongoing')
+    assert clock[0] == 12
+
+
+@patch('time.sleep')
+@patch('requests.request')
+def test_retry_on_429(mock_request, mock_sleep):
+    rest_api = create_restapi_object()
+    mock_request.side_effect = [
+        mock_response(429, dict(message='too many requests'), dict([('Retry-After', '5')])),
+        mock_response(429, dict(message='too many requests')),
+        mock_response(200, dict(state='done')),
+    ]
+    assert rest_api.get('Jobs/job1') == (dict(state='done'), None)
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [5, 2]
+
+
+@patch('time.sleep')
+@patch('requests.request')
+def test_retry_on_429_exhausted(mock_request, mock_sleep):
+    rest_api = create_restapi_object(max_retries=1)
+    mock_request.side_effect = [
+        mock_response(429, dict(message='too many requests')),
+        mock_response(429, dict(message='still too many requests')),
+    ]
+    assert rest_api.get('Jobs/job1') == (dict(message='still too many requests'), 'still too many requests')
+    assert mock_sleep.call_count == 1
@@ -116,13 +116,13 @@ class TestMyModule(unittest.TestCase):
         assert exc.value.args[0]['changed']
 
     @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem_id')
-    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get_state')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.wait_on_jobs')
     @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.post')
-    def test_create_aws_netapp_cvs_snapshots_pass(self, get_post_api, get_state_api, get_filesystem_id):
+    def test_create_aws_netapp_cvs_snapshots_pass(self, get_post_api, wait_on_jobs_api, get_filesystem_id):
         set_module_args(self.set_args_create_aws_netapp_cvs_filesystems())
         my_obj = fileSystem_module()
         get_filesystem_id.return_value = None
-        get_state_api.return_value = 'done'
+        wait_on_jobs_api.return_value = {'dummy': ('done', None)}
         response = {'jobs': [{'jobId': 'dummy'}]}
         get_post_api.return_value = response, None
         with pytest.raises(AnsibleExitJson) as exc:
@@ -132,17 +132,63 @@ class TestMyModule(unittest.TestCase):
 
     @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem_id')
     @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem')
-    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get_state')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.wait_on_jobs')
     @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.delete')
-    def test_delete_aws_netapp_cvs_snapshots_pass(self, get_post_api, get_state_api, get_filesystem, get_filesystem_id):
+    def test_delete_aws_netapp_cvs_snapshots_pass(self, get_post_api, wait_on_jobs_api, get_filesystem, get_filesystem_id):
         set_module_args(self.set_args_delete_aws_netapp_cvs_filesystems())
         my_obj = fileSystem_module()
         get_filesystem_id.return_value = '432-432-532423-4232'
         get_filesystem.return_value = 'dummy'
-        get_state_api.return_value = 'done'
+        wait_on_jobs_api.return_value = {'dummy': ('done', None)}
         response = {'jobs': [{'jobId': 'dummy'}]}
         get_post_api.return_value = response, None
         with pytest.raises(AnsibleExitJson) as exc:
             my_obj.apply()
         print('Info: test_create_aws_netapp_cvs_filesyste_pass: %s' % repr(exc.value.args[0]))
         assert exc.value.args[0]['changed']
+
+    @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem_id')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.wait_on_jobs')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.post')
+    def test_create_aws_netapp_cvs_filesystems_job_failed(self, get_post_api, wait_on_jobs_api, get_filesystem_id):
+        set_module_args(self.set_args_create_aws_netapp_cvs_filesystems())
+        my_obj = fileSystem_module()
+        get_filesystem_id.return_value = None
+        wait_on_jobs_api.return_value = {'dummy': ('error', 'Error: job dummy failed: no space left')}
+        response = {'jobs': [{'jobId': 'dummy'}]}
+        get_post_api.return_value = response, None
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        assert exc.value.args[0]['msg'] == 'Error: job dummy failed: no space left'
+
+    @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem_id')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.post')
+    def test_create_aws_netapp_cvs_filesystems_no_job(self, get_post_api, get_filesystem_id):
+        set_module_args(self.set_args_create_aws_netapp_cvs_filesystems())
+        my_obj = fileSystem_module()
+        get_filesystem_id.return_value = None
+        get_post_api.return_value = {'jobs': []}, None
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        assert exc.value.args[0]['msg'] == "Error: unexpected response on FileSystems create: {'jobs': []}"
+
+    @patch('ansible_collections.netapp.aws.plugins.modules.aws_netapp_cvs_filesystems.AwsCvsNetappFileSystem.get_filesystem_id')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.get')
+    @patch('ansible_collections.netapp.aws.plugins.module_utils.netapp.AwsCvsRestAPI.post')
+    def test_create_aws_netapp_cvs_filesystems_job_timeout(self, get_post_api, get_api, get_filesystem_id):
+        ''' job_timeout is used to wait on the job, and is not sent in the request body '''
+        args = self.set_args_create_aws_netapp_cvs_filesystems()
+        set_module_args(args)
+        assert fileSystem_module().rest_api.job_timeout == 3600
+        args['job_timeout'] = 0
+        set_module_args(args)
+        my_obj = fileSystem_module()
+        assert my_obj.rest_api.job_timeout == 0
+        get_filesystem_id.return_value = None
+        get_post_api.return_value = {'jobs': [{'jobId': 'dummy'}]}, None
+        get_api.return_value = {'state': 'ongoing'}, None
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        assert exc.value.args[0]['msg'] == 'Error: timeout waiting for job dummy, last state: ongoing'
+        assert 'job_timeout' not in get_post_api.call_args[0][1]
+        assert get_api.call_count == 1
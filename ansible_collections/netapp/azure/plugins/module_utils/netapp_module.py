@@ -56,6 +56,36 @@ def cmp(obj1, obj2):
     return (obj1 > obj2) - (obj1 < obj2)
 
 
+# markers for the canonical form of unhashable items, so that they cannot match user data
+_DICT_MARKER = object()
+_LIST_MARKER = object()
+_TUPLE_MARKER = object()
+
+
+def hashable_key(item):
+    """
+    Return a hashable key for item, two items are equal if and only if their keys are equal.
+    Dictionaries, lists, tuples and sets are converted recursively.
+    :param item: item to convert
+    :return: item if it is hashable, or a canonical tuple
+    :raise TypeError: if item contains an unhashable object of another type
+    """
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    if isinstance(item, dict):
+        return (_DICT_MARKER, frozenset((key, hashable_key(value)) for key, value in item.items()))
+    if isinstance(item, list):
+        return (_LIST_MARKER, tuple(hashable_key(value) for value in item))
+    if isinstance(item, tuple):
+        return (_TUPLE_MARKER, tuple(hashable_key(value) for value in item))
+    if isinstance(item, (set, frozenset)):
+        return frozenset(item)
+    raise TypeError('unhashable type: %s' % type(item))
+
+
 class NetAppModule(object):
     '''
     Common class for NetApp modules
@@ -138,8 +168,15 @@ class NetAppModule(object):
             :return: list of attributes to be modified
             :rtype: list
         '''
-        desired_diff_list = [item for item in desired if item not in current]  # get what in desired and not in current
-        current_diff_list = [item for item in current if item not in desired]  # get what in current but not in desired
+        try:
+            current_keys = set(hashable_key(item) for item in current)
+            desired_keys = set(hashable_key(item) for item in desired)
+            desired_diff_list = [item for item in desired if hashable_key(item) not in current_keys]  # get what in desired and not in current
+            current_diff_list = [item for item in current if hashable_key(item) not in desired_keys]  # get what in current but not in desired
+        except TypeError:
+            # some items cannot be hashed, fall back to pairwise comparisons
+            desired_diff_list = [item for item in desired if item not in current]
+            current_diff_list = [item for item in current if item not in desired]
 
         if desired_diff_list or current_diff_list:
             # there are changes
@@ -108,6 +108,14 @@ class TestMyModule(unittest.TestCase):
         result = my_obj.get_modified_attributes(current, desired, True)
         assert result == {'name': ['abc']}
 
+    def test_get_modified_attributes_for_list_of_nested_dicts_diff(self):
+        ''' validate modified attributes for lists of nested dicts with diff '''
+        current = {'qos': [{'name': 'q1', 'curve': {'4096': 100}}, {'name': 'q2', 'curve': {'4096': 200}}]}
+        desired = {'qos': [{'name': 'q2', 'curve': {'4096': 200}}, {'name': 'q1', 'curve': {'4096': 150}}]}
+        my_obj = na_helper()
+        result = my_obj.get_modified_attributes(current, desired, True)
+        assert result == {'qos': [{'name': 'q1', 'curve': {'4096': 150}}]}
+
     def test_get_modified_attributes_for_no_change(self):
         ''' validate modified attributes for same data in current and desired '''
         current = {'name': 'test'}
@@ -0,0 +1,165 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Compact output formats for large info subsets.
+    A columnar subset reports the list of fields once, and a list of values per field.  Columns of strings with
+    repeated values, such as SVM or aggregate names, are dictionary encoded.
+    Alternatively, records are written to a local file as JSON lines, so that they do not go through the result pipeline.
+    JsonLinesWriter keeps the file open, so that records can be written as they are received.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import io
+import json
+import os
+import threading
+
+from ansible.module_utils.six import string_types
+
+
+def flatten_record(record, prefix='', flat=None):
+    ''' return a dict with a single level of keys, nested keys are joined with a dot, eg svm.name
+        lists are kept as values
+    '''
+    if flat is None:
+        flat = dict()
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            flatten_record(value, '%s%s.' % (prefix, key), flat)
+        else:
+            flat['%s%s' % (prefix, key)] = value
+    return flat
+
+
+def encode_column(values):
+    ''' dictionary encode a column of strings if values are repeated
+        a missing value is encoded as None
+    '''
+    present = [value for value in values if value is not None]
+    if not present or not all(isinstance(value, string_types) for value in present):
+        return values
+    dictionary = list()
+    indices = dict()
+    for value in present:
+        if value not in indices:
+            indices[value] = len(dictionary)
+            dictionary.append(value)
+    if len(dictionary) * 2 > len(present):
+        return values
+    return dict(dictionary=dictionary, indices=[None if value is None else indices[value] for value in values])
+
+
+def to_columnar(records, keys=None, encode=True):
+    ''' convert a list of records to a columnar dict
+        keys: optional list of record keys, reported as is
+        fields are listed in the order they are first seen, a value is None if the field is absent from a record
+    '''
+    flat_records = [flatten_record(record) if isinstance(record, dict) else {'': record} for record in records]
+    fields = list()
+    seen = set()
+    for record in flat_records:
+        for field in record:
+            if field not in seen:
+                seen.add(field)
+                fields.append(field)
+    columns = list()
+    for field in fields:
+        values = [record.get(field) for record in flat_records]
+        columns.append(encode_column(values) if encode else values)
+    columnar = dict(num_records=len(flat_records), fields=fields, columns=columns)
+    if keys is not None:
+        columnar['keys'] = list(keys)
+    return columnar
+
+
+class JsonLinesWriter(object):
+    ''' write dicts as JSON lines to a local file, the file is gzip compressed if the name ends with .gz
+        sets and dictionary views are written as lists
+        lines can be written from several threads, the lines passed to a single write call are kept together
+        open, write, and close return an error message or None
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.raw_file = None
+        self.lock = threading.Lock()
+
+    def error(self, exc):
+        return 'Error writing output file %s: %s' % (self.path, repr(exc))
+
+    def open(self):
+        try:
+            dirname = os.path.dirname(self.path)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            if self.path.endswith('.gz'):
+                self.raw_file = gzip.open(self.path, 'wb')
+            else:
+                self.raw_file = io.open(self.path, 'wb')
+        except (IOError, OSError) as exc:
+            return self.error(exc)
+        return None
+
+    def write(self, lines):
+        with self.lock:
+            try:
+                for line in lines:
+                    self.raw_file.write(json.dumps(line, default=list).encode('utf-8') + b'\n')
+                    self.count += 1
+            except (IOError, OSError, TypeError, ValueError) as exc:
+                return self.error(exc)
+        return None
+
+    def close(self):
+        if self.raw_file is None:
+            return None
+        try:
+            self.raw_file.close()
+        except (IOError, OSError) as exc:
+            return self.error(exc)
+        finally:
+            self.raw_file = None
+        return None
+
+
+def write_json_lines(path, lines):
+    ''' write an iterable of dicts as JSON lines, the file is gzip compressed if the name ends with .gz
+        return the number of lines, and an error message or None
+    '''
+    writer = JsonLinesWriter(path)
+    error = writer.open()
+    if error is None:
+        error = writer.write(lines)
+    close_error = writer.close()
+    return writer.count, error or close_error
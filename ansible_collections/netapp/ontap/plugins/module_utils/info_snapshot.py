@@ -0,0 +1,164 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Local snapshots of gathered information, to report what changed since the previous run.
+    Snapshots are stored in a JSON file per cluster, indexed by subset.
+    For some subsets, records are never modified and carry an increasing value, so only newer records are requested.
+    Other subsets are fully read, and compared with the snapshot.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import re
+import tempfile
+import time
+
+# subsets where records are only added, with an increasing value that can be used as a query filter
+CHANGE_FILTERS = {
+    'support/ems/events': 'index',
+}
+
+# field identifying a record, records without this field are identified by their whole content
+RECORD_KEYS = {
+    'support/ems/events': 'index',
+}
+DEFAULT_RECORD_KEY = 'uuid'
+
+
+def get_record_key(record, key_field):
+    ''' return a string identifying the record '''
+    if isinstance(record, dict) and record.get(key_field) is not None:
+        return str(record[key_field])
+    return json.dumps(record, sort_keys=True)
+
+
+def compute_delta(previous, current, key_field=DEFAULT_RECORD_KEY):
+    ''' compare two lists of records
+        return a dict with added, removed, and changed records, changed records are reported with their current value
+    '''
+    previous_records = dict((get_record_key(record, key_field), record) for record in previous)
+    current_keys = set()
+    delta = dict(added=list(), removed=list(), changed=list())
+    for record in current:
+        key = get_record_key(record, key_field)
+        current_keys.add(key)
+        if key not in previous_records:
+            delta['added'].append(record)
+        elif previous_records[key] != record:
+            delta['changed'].append(record)
+    delta['removed'] = [record for key, record in previous_records.items() if key not in current_keys]
+    return delta
+
+
+def merge_records(previous, new, key_field=DEFAULT_RECORD_KEY):
+    ''' add new records to previous records, a new record replaces a previous record with the same key
+        return the merged list, and the delta
+    '''
+    merged = dict((get_record_key(record, key_field), record) for record in previous)
+    delta = dict(added=list(), removed=list(), changed=list())
+    for record in new:
+        key = get_record_key(record, key_field)
+        if key not in merged:
+            delta['added'].append(record)
+        elif merged[key] != record:
+            delta['changed'].append(record)
+        merged[key] = record
+    return list(merged.values()), delta
+
+
+def get_high_water_mark(records, field):
+    ''' return the highest value for field, or None if no record has a numeric value '''
+    values = [record[field] for record in records
+              if isinstance(record, dict) and isinstance(record.get(field), (int, float)) and not isinstance(record.get(field), bool)]
+    return max(values) if values else None
+
+
+class InfoSnapshot(object):
+    ''' snapshot of gathered records for a cluster, indexed by subset
+        each subset records the query used to gather the records, the time of the last full read, and the records
+        a snapshot is ignored if the query changed, or if the last full read is older than full_refresh seconds
+    '''
+
+    def __init__(self, path, cluster, full_refresh):
+        self.path = os.path.join(os.path.expanduser(path), '%s.json' % re.sub(r'[^\w.-]', '_', cluster))
+        self.full_refresh = full_refresh
+        self.subsets = None
+
+    def load(self):
+        ''' read the file, an unreadable file is treated as empty '''
+        try:
+            with open(self.path) as snapshot_file:
+                subsets = json.load(snapshot_file)
+        except (IOError, OSError, ValueError):
+            subsets = dict()
+        self.subsets = subsets if isinstance(subsets, dict) else dict()
+
+    def get(self, subset, query):
+        ''' return the stored records for this subset and query, and the time of the last full read
+            return None, None if there is no valid snapshot
+        '''
+        if self.subsets is None:
+            self.load()
+        entry = self.subsets.get(subset)
+        if not isinstance(entry, dict) or entry.get('query') != query or not isinstance(entry.get('records'), list) \
+                or time.time() - entry.get('full_read', 0) >= self.full_refresh:
+            return None, None
+        return entry['records'], entry['full_read']
+
+    def set(self, subset, query, records, full_read=None):
+        ''' update the snapshot for a subset, full_read defaults to now '''
+        if self.subsets is None:
+            self.load()
+        self.subsets[subset] = dict(query=query, records=records, full_read=full_read or time.time())
+
+    def save(self):
+        ''' write the file atomically, the file is only readable by the current user
+            return an error message, or None
+        '''
+        tmp_path = None
+        try:
+            dirname = os.path.dirname(self.path)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname, 0o700)
+            fdesc, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.netapp_snapshot')
+            with os.fdopen(fdesc, 'w') as snapshot_file:
+                json.dump(self.subsets or dict(), snapshot_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError, TypeError, ValueError) as exc:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+            return 'Error writing snapshot file %s: %s' % (self.path, repr(exc))
+        return None
@@ -37,10 +37,12 @@ __metaclass__ = type
 import base64
 import logging
 import os
+import random
 import ssl
 import time
 from ansible.module_utils.basic import missing_required_lib
 from ansible.module_utils._text import to_native
+from ansible_collections.netapp.ontap.plugins.module_utils.version_cache import VersionCache
 
 try:
     from ansible.module_utils.ansible_release import __version__ as ansible_version
@@ -147,7 +149,15 @@ def get_feature(module, feature_name):
         sanitize_code_points=[8],               # unicode values, 8 is backspace
         show_modified=True,
         always_wrap_zapi=True,                  # for better error reporting
-        trace_apis=False                        # if true, append ZAPI and REST requests/responses to /tmp/ontap_zapi.txt
+        trace_apis=False,                       # if true, append ZAPI and REST requests/responses to /tmp/ontap_zapi.txt
+        rest_pool_maxsize=10,                   # max number of connections kept alive in the REST and ZAPI session pools
+        rest_connect_retries=3,                 # retries on connection errors only, requests are not resent once delivered
+        zapi_keep_alive=True,                   # send ZAPI requests over a keep-alive session, shared by connections to the same host
+        job_return_timeout=True,                # let ONTAP hold a job GET request until the job completes
+        version_cache_ttl=0,                    # in seconds, cache ONTAP version, REST support, and cserver on disk, 0 to disable
+        version_cache_path='~/.ansible/netapp_ontap_version_cache.json',
+        ems_log_ttl=0,                          # in seconds, send an EMS event at most once per module and cluster, 0 to disable
+        zapi_desired_attributes=True,           # only request the attributes used by a module, with desired-attributes
     )
 
     if module.params['feature_flags'] is not None and feature_name in module.params['feature_flags']:
@@ -157,6 +167,73 @@ def get_feature(module, feature_name):
     module.fail_json(msg="Internal error: unexpected feature flag: %s" % feature_name)
 
 
+def get_version_cache(module, ttl_feature='version_cache_ttl', params=None):
+    ''' return a VersionCache for this cluster and user, it is disabled unless the TTL feature flag is set
+        params: connection parameters, module.params is used if None
+    '''
+    if params is None:
+        params = module.params
+    key = '%s:%s:%s' % (params.get('hostname'), params.get('http_port') or '', params.get('username') or '')
+    return VersionCache(get_feature(module, 'version_cache_path'), get_feature(module, ttl_feature), key)
+
+
+def get_connection_version_cache(connection, ttl_feature='version_cache_ttl'):
+    ''' return a VersionCache for the cluster and user of a REST or ZAPI connection, or None if it cannot be keyed
+        a REST connection may target a different host than the module, its own parameters are used
+        a ZAPI connection is only cached if it targets the module host and user
+    '''
+    module = getattr(connection, 'module', None)
+    if module is None:
+        return None
+    if isinstance(getattr(connection, 'params', None), dict):
+        return get_version_cache(module, ttl_feature, connection.params)
+    if getattr(connection, '_host', None) != module.params.get('hostname') or getattr(connection, '_username', None) != module.params.get('username'):
+        return None
+    return get_version_cache(module, ttl_feature)
+
+
+def add_desired_attributes(module, zapi_request, desired_attributes):
+    ''' restrict the attributes returned by a get-iter API to the ones used by the module
+        desired_attributes: nested dict, with lists of attribute names as leaves, as expected by NaElement.translate_struct
+        This can be disabled with the zapi_desired_attributes feature flag, to get all attributes.
+    '''
+    if has_feature(module, 'zapi_desired_attributes'):
+        zapi_request.translate_struct({'desired-attributes': desired_attributes})
+
+
+def iter_zapi_records(server, api, children=None, max_records=None, records_tag='attributes-list', enable_tunneling=True):
+    ''' generator yielding the records of a get-iter API, page by page, following next-tag
+        children: dict, or list of dicts, in NaElement.translate_struct format, added to the request for every page,
+                  eg {'query': {...}, 'desired-attributes': {...}}
+        max_records: number of records per page, the ONTAP default is used if None
+        With a OntapZAPICx connection, each page is parsed incrementally and only the current record is kept in memory.
+        NaApiError is raised on error, possibly after some records were yielded.
+    '''
+    tag = None
+    while True:
+        request = zapi.NaElement(api)
+        if children:
+            request.translate_struct(children)
+        if max_records is not None:
+            request.add_new_child('max-records', str(max_records))
+        if tag is not None:
+            request.add_new_child('tag', tag, True)
+        if isinstance(server, OntapZAPICx):
+            stream = server.invoke_elem_records(request, enable_tunneling, records_tag)
+            for record in stream:
+                yield record
+            results = stream.results
+        else:
+            results = server.invoke_successfully(request, enable_tunneling)
+            records = results.get_child_by_name(records_tag)
+            if records is not None:
+                for record in records.get_children():
+                    yield record
+        tag = results.get_child_content('next-tag')
+        if not tag:
+            return
+
+
 def create_sf_connection(module, port=None):
     hostname = module.params['hostname']
     username = module.params['username']
@@ -284,6 +361,10 @@ def is_zapi_write_access_error(message):
 
 def ems_log_event(source, server, name="Ansible", ident="12345", version=COLLECTION_VERSION,
                   category="Information", event="setup", autosupport="false"):
+    # with ems_log_ttl, the event is only sent once per TTL for a module and cluster
+    cache = get_connection_version_cache(server, 'ems_log_ttl')
+    if cache is not None and cache.get('ems:%s' % source):
+        return
     ems_log = zapi.NaElement('ems-autosupport-log')
     # Host name invoking the API.
     ems_log.add_new_child("computer-name", name)
@@ -308,6 +389,9 @@ def ems_log_event(source, server, name="Ansible", ident="12345", version=COLLECT
         if not is_zapi_connection_error(exc.message) and not is_zapi_write_access_error(exc.message):
             # raise on other errors, as it may be a bug in calling the ZAPI
             raise exc
+        return
+    if cache is not None:
+        cache.set('ems:%s' % source, True)
 
 
 def get_cserver_zapi(server):
@@ -355,6 +439,20 @@ def classify_zapi_exception(error):
 
 
 def get_cserver(connection, is_rest=False):
+    ''' return the admin vserver name, it is read from the version cache if enabled '''
+    cache = get_connection_version_cache(connection)
+    if cache is None:
+        return get_cserver_no_cache(connection, is_rest)
+    section = 'cserver_rest' if is_rest else 'cserver'
+    cserver = cache.get(section)
+    if cserver is None:
+        cserver = get_cserver_no_cache(connection, is_rest)
+        if cserver is not None:
+            cache.set(section, cserver)
+    return cserver
+
+
+def get_cserver_no_cache(connection, is_rest=False):
     if not is_rest:
         return get_cserver_zapi(connection)
 
@@ -375,7 +473,158 @@ def get_cserver(connection, is_rest=False):
     return None
 
 
+def get_connect_retries(module):
+    ''' return the retry policy for the REST and ZAPI keep-alive sessions
+        only connection errors are retried, up to rest_connect_retries times
+        other errors, eg TLS or certificate errors, fail on the first attempt
+    '''
+    connect_retries = get_feature(module, 'rest_connect_retries')
+    kwargs = dict(total=connect_retries, connect=connect_retries, read=0, redirect=0, status=0, backoff_factor=0.5)
+    try:
+        return requests.adapters.Retry(other=0, **kwargs)
+    except TypeError:
+        # other was added in urllib3 1.26, total still bounds the number of retries
+        return requests.adapters.Retry(**kwargs)
+
+
+# keep-alive sessions for ZAPI, indexed by host and credentials, so that vserver and cluster connections share a pool
+ZAPI_SESSIONS = dict()
+
+
+def get_zapi_session(module, key):
+    ''' return a keep-alive session for ZAPI requests, created on first use for this key
+        key: tuple identifying the host and credentials
+    '''
+    if key not in ZAPI_SESSIONS:
+        pool_maxsize = get_feature(module, 'rest_pool_maxsize')
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=get_connect_retries(module))
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        ZAPI_SESSIONS[key] = session
+    return ZAPI_SESSIONS[key]
+
+
+class SanitizedReader(object):
+    ''' file-like wrapper, to sanitize a ZAPI response as it is read, rather than after a parsing error
+        - BEL is removed before a line end, as some ONTAP CLI commands return BEL on error
+        - code points are replaced with '.', eg backspaces sent by 9.7
+        These characters are not valid in XML 1.0, so a valid document is not modified.
+    '''
+    def __init__(self, stream, code_points=None, chunk_size=65536):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.pending = b''
+        table = bytearray(range(256))
+        for code_point in code_points or []:
+            # only single byte code points can be replaced in the raw response
+            if 0 <= code_point < 256:
+                table[code_point] = ord('.')
+        self.table = bytes(table)
+
+    def read(self, size=-1):
+        ''' return sanitized data, an empty string only at the end of the stream '''
+        while True:
+            chunk = self.stream.read(size if size is not None and size > 0 else self.chunk_size)
+            data = self.pending + chunk
+            self.pending = b''
+            if chunk:
+                # a BEL sequence may be split across chunks, keep a partial sequence for the next read
+                for suffix in (b'\x07\r', b'\x07'):
+                    if data.endswith(suffix):
+                        self.pending = suffix
+                        data = data[:-len(suffix)]
+                        break
+            data = data.replace(b'\x07\n', b'').replace(b'\x07\r\n', b'').translate(self.table)
+            if data or not chunk:
+                return data
+
+    def close(self):
+        close = getattr(self.stream, 'close', None)
+        if close is not None:
+            close()
+
+
 if HAS_NETAPP_LIB:
+    class ZAPIRecordStream(object):
+        ''' iterate over the records in a ZAPI response, as they are parsed
+            records are the children of results/<records_tag>, eg attributes-list for a get-iter API
+            A record is detached from the tree once yielded, so memory is bounded by the records kept by the caller.
+            Once the iteration completes, results is the results element, without the records, eg to read next-tag.
+            NaApiError is raised at the end of the iteration if the API failed, as in invoke_successfully.
+        '''
+        def __init__(self, stream, records_tag='attributes-list'):
+            self.stream = stream
+            self.records_tag = records_tag
+            self.results = None
+
+        def __iter__(self):
+            depth = 0
+            results = None
+            records = None
+            try:
+                for event, elem in zapi.etree.iterparse(self.stream, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 2 and zapi.etree.QName(elem.tag).localname == 'results':
+                            results = elem
+                        elif depth == 3 and results is not None and zapi.etree.QName(elem.tag).localname == self.records_tag:
+                            records = elem
+                        continue
+                    if depth == 4 and records is not None and elem.getparent() is records:
+                        yield zapi.NaElement(elem)
+                        # the caller may have moved the record to another tree
+                        if elem.getparent() is records:
+                            records.remove(elem)
+                    depth -= 1
+            finally:
+                # a keep-alive connection is released once the response is fully read
+                # if the iteration is abandoned, the connection is closed rather than reused
+                close = getattr(self.stream, 'close', None)
+                if close is not None:
+                    close()
+            if results is None:
+                raise zapi.NaApiError('No response received')
+            self.results = zapi.NaElement(results)
+            if self.results.get_attr('status') != 'passed':
+                code = self.results.get_attr('errno') or self.results.get_child_content('errorno') or 'ESTATUSFAILED'
+                msg = self.results.get_attr('reason') or self.results.get_child_content('reason') or 'Execution status is failed due to unknown reason'
+                raise zapi.NaApiError(code, msg)
+
+    class ZAPISessionOpener(object):
+        ''' replaces the urllib opener, to send ZAPI requests over a keep-alive requests session
+            errors are reported as urllib errors, as with the urllib opener
+        '''
+        def __init__(self, session, verify=True, cert=None, auth=None):
+            self.session = session
+            self.verify = verify
+            self.cert = cert
+            self.auth = auth
+
+        def open(self, request, timeout=None):
+            ''' send a urllib request, and return the response as a file-like object
+                The connection is returned to the pool once the response is fully read.
+            '''
+            url = request.get_full_url()
+            try:
+                response = self.session.post(url, data=request.data, headers=dict(request.header_items()), stream=True,
+                                             timeout=timeout, verify=self.verify, cert=self.cert, auth=self.auth)
+            except requests.exceptions.ConnectionError as exc:
+                reason = exc
+                try:
+                    # report a refused connection as the urllib opener does
+                    while reason is not None and not isinstance(reason, ConnectionRefusedError):
+                        reason = reason.__context__
+                except (NameError, AttributeError):
+                    # python 2.7
+                    reason = None
+                raise zapi.urllib.error.URLError(reason or exc)
+            if response.status_code >= 400:
+                response.close()
+                raise zapi.urllib.error.HTTPError(url, response.status_code, response.reason, response.headers, None)
+            response.raw.decode_content = True
+            return response.raw
+
     class OntapZAPICx(zapi.NaServer):
         ''' override zapi NaServer class to:
         - enable SSL certificate authentication
@@ -402,6 +651,21 @@ if HAS_NETAPP_LIB:
                 auth = '%s:%s' % (username, password)
                 self.base64_creds = base64.b64encode(auth.encode()).decode()
 
+        def _build_opener(self):
+            ''' use a keep-alive session shared by all connections to the same host, unless disabled '''
+            if not HAS_REQUESTS or self.module is None or not has_feature(self.module, 'zapi_keep_alive'):
+                return super(OntapZAPICx, self)._build_opener()
+            verify = self.validate_certs is not False
+            cert, auth = None, None
+            if self._auth_style == zapi.NaServer.STYLE_CERTIFICATE:
+                cert = self.cert_filepath if self.key_filepath is None else (self.cert_filepath, self.key_filepath)
+            elif self.base64_creds is None:
+                # with requests, credentials are sent preemptively
+                auth = (self._username, self._password)
+            key = (self._protocol, self._host, self._port, self._username, self.cert_filepath, self.key_filepath, verify)
+            self._opener = ZAPISessionOpener(get_zapi_session(self.module, key), verify, cert, auth)
+            self._refresh_conn = False
+
         def _create_certificate_auth_handler(self):
             try:
                 context = ssl.create_default_context()
@@ -465,6 +729,28 @@ if HAS_NETAPP_LIB:
             if not na_element or not isinstance(na_element, zapi.NaElement):
                 raise ValueError('NaElement must be supplied to invoke API')
 
+            response = self._open(na_element, enable_tunneling)
+            response_xml = response.read()
+            response_element = self._get_result(response_xml)
+
+            if self._trace:
+                zapi.LOG.debug("Response: %s", response_element.to_string(pretty=True))
+
+            return response_element
+
+        def invoke_elem_records(self, na_element, enable_tunneling=False, records_tag='attributes-list'):
+            """Invoke the API on the server, and return a ZAPIRecordStream to parse the response incrementally.
+               The response is sanitized as it is read, when sanitize_xml is enabled.
+               The connection is only released once the stream is consumed.
+            """
+            if not na_element or not isinstance(na_element, zapi.NaElement):
+                raise ValueError('NaElement must be supplied to invoke API')
+            response = self._open(na_element, enable_tunneling)
+            code_points = get_feature(self.module, 'sanitize_code_points') if has_feature(self.module, 'sanitize_xml') else None
+            return ZAPIRecordStream(SanitizedReader(response, code_points), records_tag)
+
+        def _open(self, na_element, enable_tunneling):
+            """Send the request, and return the HTTP response."""
             request, request_element = self._create_request(na_element,
                                                             enable_tunneling)
 
@@ -480,6 +766,8 @@ if HAS_NETAPP_LIB:
                 else:
                     response = self._opener.open(request)
             except zapi.urllib.error.HTTPError as exc:
+                if exc.code == 401 and self.module is not None:
+                    get_version_cache(self.module).invalidate()
                 raise zapi.NaApiError(exc.code, exc.reason)
             except zapi.urllib.error.URLError as exc:
                 msg = 'URL error'
@@ -494,29 +782,28 @@ if HAS_NETAPP_LIB:
                 raise zapi.NaApiError(msg, error)
             except Exception as exc:
                 raise zapi.NaApiError('Unexpected error', repr(exc))
-
-            response_xml = response.read()
-            response_element = self._get_result(response_xml)
-
-            if self._trace:
-                zapi.LOG.debug("Response: %s", response_element.to_string(pretty=True))
-
-            return response_element
+            return response
 
 
 class OntapRestAPI(object):
     ''' wrapper to send requests to ONTAP REST APIs '''
-    def __init__(self, module, timeout=60):
+    def __init__(self, module, timeout=60, host_params=None):
+        ''' host_params: optional dict of connection parameters, eg hostname or username, overriding module.params
+                           to connect to another cluster
+        '''
         self.module = module
-        self.username = self.module.params['username']
-        self.password = self.module.params['password']
-        self.hostname = self.module.params['hostname']
-        self.use_rest = self.module.params['use_rest'].lower()
-        self.cert_filepath = self.module.params['cert_filepath']
-        self.key_filepath = self.module.params['key_filepath']
-        self.verify = self.module.params['validate_certs']
+        self.params = dict(module.params)
+        if host_params:
+            self.params.update((key, value) for key, value in host_params.items() if value is not None)
+        self.username = self.params['username']
+        self.password = self.params['password']
+        self.hostname = self.params['hostname']
+        self.use_rest = self.params['use_rest'].lower()
+        self.cert_filepath = self.params['cert_filepath']
+        self.key_filepath = self.params['key_filepath']
+        self.verify = self.params['validate_certs']
         self.timeout = timeout
-        port = self.module.params['http_port']
+        port = self.params['http_port']
         if port is None:
             self.url = 'https://' + self.hostname + '/api/'
         else:
@@ -533,6 +820,7 @@ class OntapRestAPI(object):
         self.debug_logs = list()
         self.auth_method = set_auth_method(self.module, self.username, self.password, self.cert_filepath, self.key_filepath)
         self.check_required_library()
+        self.session = None
         if has_feature(module, 'trace_apis'):
             logging.basicConfig(filename='/tmp/ontap_apis.log', level=logging.DEBUG)
 
@@ -558,6 +846,17 @@ class OntapRestAPI(object):
         if not HAS_REQUESTS:
             self.module.fail_json(msg=missing_required_lib('requests'))
 
+    def get_session(self):
+        ''' return a keep-alive session, created on first use
+            connections are pooled, so the TCP connection and TLS handshake are reused across requests
+        '''
+        if self.session is None:
+            pool_maxsize = get_feature(self.module, 'rest_pool_maxsize')
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=get_connect_retries(self.module))
+            self.session = requests.Session()
+            self.session.mount('https://', adapter)
+        return self.session
+
     def send_request(self, method, api, params, json=None, accept=None,
                      vserver_name=None, vserver_uuid=None):
         ''' send http request and process reponse, including error conditions '''
@@ -601,14 +900,16 @@ class OntapRestAPI(object):
         self.log_debug('sending', repr(dict(method=method, url=url, verify=self.verify, params=params,
                                             timeout=self.timeout, json=json, headers=headers, **kwargs)))
         try:
-            response = requests.request(method, url, verify=self.verify, params=params,
-                                        timeout=self.timeout, json=json, headers=headers, **kwargs)
+            response = self.get_session().request(method, url, verify=self.verify, params=params,
+                                                  timeout=self.timeout, json=json, headers=headers, **kwargs)
             content = response.content  # for debug purposes
             status_code = response.status_code
             # If the response was successful, no Exception will be raised
             response.raise_for_status()
             json_dict, json_error = get_json(response)
         except requests.exceptions.HTTPError as err:
+            if status_code == 401:
+                get_version_cache(self.module, params=self.params).invalidate()
             __, json_error = get_json(response)
             if json_error is None:
                 self.log_error(status_code, 'HTTP error: %s' % err)
@@ -630,10 +931,16 @@ class OntapRestAPI(object):
         return status_code, json_dict, error_details
 
     def wait_on_job(self, job, timeout=600, increment=60):
+        ''' wait for a job to complete, return message and error
+            the job is polled with an exponential backoff and jitter, starting at 1 second, and capped at increment seconds.
+            If supported, return_timeout lets ONTAP hold the request until the job completes.
+        '''
         try:
             url = job['_links']['self']['href'].split('api/')[1]
         except Exception as err:
-            self.log_error(0, 'URL Incorrect format: %s\n Job: %s' % (err, job))
+            error = 'URL Incorrect format: %s\n Job: %s' % (err, job)
+            self.log_error(0, error)
+            return None, error
         # Expecting job to be in the following format
         # {'job':
         #     {'uuid': 'fde79888-692a-11ea-80c2-005056b39fe7',
@@ -643,15 +950,24 @@ class OntapRestAPI(object):
         #         }
         #     }
         # }
-        keep_running = True
         error = None
         message = None
-        runtime = 0
         retries = 0
         max_retries = 3
-        while keep_running:
-            # Will run every every <increment> seconds for <timeout> seconds
-            job_json, job_error = self.get(url, None)
+        delay = 1
+        use_return_timeout = has_feature(self.module, 'job_return_timeout')
+        start_time = time.time()
+        while True:
+            runtime = time.time() - start_time
+            params = None
+            if use_return_timeout:
+                # keep some margin, so that the HTTP request does not time out
+                params = {'return_timeout': int(max(0, min(timeout - runtime, self.timeout / 2, 120)))}
+            job_json, job_error = self.get(url, params)
+            if job_error and use_return_timeout and self.is_unexpected_argument_error(job_error, 'return_timeout'):
+                # older versions of ONTAP, poll without waiting on the server side
+                use_return_timeout = False
+                continue
             if job_error:
                 error = job_error
                 retries += 1
@@ -680,19 +996,25 @@ class OntapRestAPI(object):
                 if job_json['state'] == 'failure':
                     # if the job as failed, return message as error
                     return None, message
-                if job_json['state'] != 'running':
-                    keep_running = False
-                else:
-                    # Would like to post a message to user (not sure how)
-                    if runtime >= timeout:
-                        keep_running = False
-                        if job_json['state'] != 'success':
-                            self.log_error(0, 'Timeout error: Process still running')
-            if keep_running:
-                time.sleep(increment)
-                runtime += increment
+                if job_json['state'] not in ('queued', 'running'):
+                    break
+            if time.time() - start_time >= timeout:
+                if job_error is None:
+                    self.log_error(0, 'Timeout error: Process still running')
+                break
+            # poll fast at first, then back off, with some jitter
+            time.sleep(random.uniform(delay / 2.0, delay))
+            delay = min(delay * 2, increment)
         return message, error
 
+    @staticmethod
+    def is_unexpected_argument_error(error, argument):
+        ''' return True if ONTAP rejected the argument '''
+        try:
+            return str(error['code']) == '262179' and argument in error['message']
+        except (KeyError, TypeError):
+            return False
+
     def get(self, api, params=None):
         method = 'GET'
         dummy, message, error = self.send_request(method, api, params)
@@ -742,6 +1064,12 @@ class OntapRestAPI(object):
         return -1, -1
 
     def get_ontap_version_using_rest(self):
+        cache = get_version_cache(self.module, params=self.params)
+        cached = cache.get('rest')
+        if cached is not None:
+            self.ontap_version.update(cached['version'])
+            self.is_rest_error = cached['error']
+            return cached['status_code']
         # using GET rather than HEAD because the error messages are different,
         # and we need the version as some REST options are not available in earlier versions
         method = 'GET'
@@ -752,6 +1080,9 @@ class OntapRestAPI(object):
         self.is_rest_error = str(error) if error else None
         if error:
             self.log_error(status_code, str(error))
+        # do not cache connection, authentication, or server errors
+        if status_code is not None and status_code != 401 and status_code < 500:
+            cache.set('rest', dict(status_code=status_code, version=self.ontap_version, error=self.is_rest_error))
         return status_code
 
     def _is_rest(self, used_unsupported_rest_properties=None):
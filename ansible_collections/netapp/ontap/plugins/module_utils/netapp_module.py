@@ -58,6 +58,57 @@ def cmp(obj1, obj2):
     return (obj1 > obj2) - (obj1 < obj2)
 
 
+# markers for the canonical form of unhashable items, so that they cannot match user data
+_DICT_MARKER = object()
+_LIST_MARKER = object()
+_TUPLE_MARKER = object()
+
+
+def hashable_key(item):
+    """
+    Return a hashable key for item, two items are equal if and only if their keys are equal.
+    Dictionaries, lists, tuples and sets are converted recursively.
+    :param item: item to convert
+    :return: item if it is hashable, or a canonical tuple
+    :raise TypeError: if item contains an unhashable object of another type
+    """
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    if isinstance(item, dict):
+        return (_DICT_MARKER, frozenset((key, hashable_key(value)) for key, value in item.items()))
+    if isinstance(item, list):
+        return (_LIST_MARKER, tuple(hashable_key(value) for value in item))
+    if isinstance(item, tuple):
+        return (_TUPLE_MARKER, tuple(hashable_key(value) for value in item))
+    if isinstance(item, (set, frozenset)):
+        return frozenset(item)
+    raise TypeError('unhashable type: %s' % type(item))
+
+
+def multiset_difference(items, others):
+    """
+    Return the items that are not in others, in order, counting duplicates.
+    eg [a, a, b] - [a, c] is [a, b].
+    This is linear, using hashable_key to count the items in others.
+    :raise TypeError: if an item cannot be converted by hashable_key
+    """
+    counts = dict()
+    for item in others:
+        key = hashable_key(item)
+        counts[key] = counts.get(key, 0) + 1
+    difference = list()
+    for item in items:
+        key = hashable_key(item)
+        if counts.get(key):
+            counts[key] -= 1
+        else:
+            difference.append(item)
+    return difference
+
+
 class NetAppModule(object):
     '''
     Common class for NetApp modules
@@ -223,24 +274,27 @@ class NetAppModule(object):
             :return: list of attributes to be modified
             :rtype: list
         '''
-        current_copy = deepcopy(current)
-        desired_copy = deepcopy(desired)
-
-        # get what in desired and not in current
-        desired_diff_list = list()
-        for item in desired:
-            if item in current_copy:
-                current_copy.remove(item)
-            else:
-                desired_diff_list.append(item)
-
-        # get what in current but not in desired
-        current_diff_list = list()
-        for item in current:
-            if item in desired_copy:
-                desired_copy.remove(item)
-            else:
-                current_diff_list.append(item)
+        try:
+            # get what in desired and not in current
+            desired_diff_list = multiset_difference(desired, current)
+            # get what in current but not in desired
+            current_diff_list = multiset_difference(current, desired)
+        except TypeError:
+            # some items cannot be hashed, fall back to pairwise comparisons
+            current_copy = deepcopy(current)
+            desired_copy = deepcopy(desired)
+            desired_diff_list = list()
+            for item in desired:
+                if item in current_copy:
+                    current_copy.remove(item)
+                else:
+                    desired_diff_list.append(item)
+            current_diff_list = list()
+            for item in current:
+                if item in desired_copy:
+                    desired_copy.remove(item)
+                else:
+                    current_diff_list.append(item)
 
         if desired_diff_list or current_diff_list:
             # there are changes
@@ -0,0 +1,128 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Poll an API until a job or a resource reaches a terminal state.
+    The interval between polls starts small and doubles up to max_interval, so that short jobs are
+    reported quickly while long jobs are not polled more often than before.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+
+def summarize_states(states):
+    ''' replaces a long list of states with multipliers
+        eg 'false'*5
+        return:
+            state_list as str
+            last_state
+    '''
+    previous_state = None
+    count = 0
+    summary = ''
+    for state in states:
+        if state == previous_state:
+            count += 1
+        else:
+            if previous_state is not None:
+                summary += '%s%s' % (previous_state, '' if count == 1 else '*%d' % count)
+            count = 1
+            previous_state = state
+    if previous_state is not None:
+        summary += '%s%s' % (previous_state, '' if count == 1 else '*%d' % count)
+    last_state = states[-1] if states else ''
+    return summary, last_state
+
+
+class Poller(object):
+    ''' call a function until it reports completion, an error, or the deadline is reached
+
+        poll_function is called without arguments and returns a tuple (state, done, error):
+            error: None if the state was retrieved, or an error message
+            state: recorded in the states history when error is None
+            done: True if state is a terminal state
+        timeout: in seconds, None to wait forever.  The function is always called at least once.
+        max_consecutive_errors: fail after this number of consecutive errors, None to retry until timeout
+        Elapsed time is the larger of wall-clock time and cumulated sleep time.
+    '''
+
+    def __init__(self, timeout, max_interval=10, initial_interval=1, backoff=2, max_consecutive_errors=None):
+        self.timeout = timeout
+        self.max_interval = max_interval
+        self.initial_interval = min(initial_interval, max_interval)
+        self.backoff = backoff
+        self.max_consecutive_errors = max_consecutive_errors
+        self.states = list()
+        self.errors = list()
+        self.elapsed = 0
+        self.timed_out = False
+
+    def poll(self, poll_function):
+        ''' return (state, error)
+                state: last state retrieved without error, or None
+                error: None if a terminal state was reached, or the last error
+            on timeout, self.timed_out is True and error is the last error, which may be None
+        '''
+        self.states = list()
+        self.errors = list()
+        self.elapsed = 0
+        self.timed_out = False
+        start_time = time.time()
+        slept = 0
+        interval = self.initial_interval
+        consecutive_errors = 0
+        last_state = None
+        while True:
+            state, done, error = poll_function()
+            if error is None:
+                consecutive_errors = 0
+                last_state = state
+                self.states.append(state)
+                if done:
+                    return state, None
+            else:
+                consecutive_errors += 1
+                self.errors.append(error)
+                if self.max_consecutive_errors is not None and consecutive_errors >= self.max_consecutive_errors:
+                    return last_state, error
+            self.elapsed = max(time.time() - start_time, slept)
+            if self.timeout is not None and self.elapsed >= self.timeout:
+                self.timed_out = True
+                return last_state, error
+            delay = interval if self.timeout is None else min(interval, self.timeout - self.elapsed)
+            time.sleep(delay)
+            slept += delay
+            interval = min(interval * self.backoff, self.max_interval)
+
+    def summarize_states(self):
+        ''' summary of the states history, see summarize_states '''
+        return summarize_states(self.states)
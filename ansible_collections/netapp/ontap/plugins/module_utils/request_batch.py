@@ -0,0 +1,110 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Collect independent ZAPI or REST mutations, and send them together.
+    Requests are run with task_runner, up to max_concurrency at a time.
+    Errors are collected, and reported together once all requests are complete.
+    When requests are run one at a time, the batch stops at the first error.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import run_tasks, TaskModule
+
+
+class RequestBatch(object):
+    """ a batch of independent requests, indexed by name
+        Requests are started in the order they were added.
+        A request may depend on other requests, it is started once they complete, and skipped if one of them fails.
+        With max_concurrency set to 1, each request depends on the previous ones, and only the first error is reported.
+    """
+    def __init__(self, module, max_concurrency=1):
+        self.module = module
+        self.max_concurrency = max_concurrency
+        self.tasks = list()
+        self.dependencies = dict()
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def serial(self):
+        """ return True if requests are run one at a time """
+        return self.max_concurrency is None or self.max_concurrency <= 1
+
+    def names(self):
+        """ return the names of the requests in the batch, in order """
+        return [name for name, dummy, dummy in self.tasks]
+
+    def add(self, name, function, kwargs=None, depends_on=None):
+        """ add a request, function is called with kwargs when the batch is run
+            function reports an error by calling fail_json on a TaskModule or raising an exception, see task_runner.task_worker
+            depends_on: optional list of names of requests that need to complete first
+        """
+        if name in self.names():
+            self.module.fail_json(msg='Internal error: duplicate request name in batch: %s' % name)
+        self.tasks.append((name, function, kwargs or dict()))
+        if depends_on:
+            self.dependencies[name] = list(depends_on)
+
+    def add_rest_patch(self, name, rest_api, api, body, params=None, depends_on=None):
+        """ add a REST PATCH request """
+        self.add(name, self.rest_patch, dict(rest_api=rest_api, api=api, body=body, params=params), depends_on)
+
+    def rest_patch(self, rest_api, api, body, params=None):
+        response, error = rest_api.patch(api, body, params)
+        if error:
+            TaskModule(self.module).fail_json(msg='Error: calling api: %s: %s' % (api, error))
+        return response
+
+    def run(self):
+        """ run all requests, return two dicts indexed by request name: results, errors
+            failed requests, and requests depending on them, are reported in errors rather than results
+        """
+        dependencies = self.dependencies
+        if self.serial():
+            # stop at the first error: later requests are skipped
+            names = self.names()
+            dependencies = dict((name, names[:index]) for index, name in enumerate(names) if index > 0)
+        errors = dict()
+        results = run_tasks(self.module, self.tasks, self.max_concurrency, dependencies, errors=errors)
+        return results, errors
+
+    def run_or_fail(self):
+        """ run all requests, return results, or fail the module with all errors once all requests are complete
+            when requests are run one at a time, only the first error is reported
+        """
+        results, errors = self.run()
+        if errors:
+            messages = [errors[name] for name in self.names() if name in errors]
+            if self.serial():
+                messages = messages[:1]
+            self.module.fail_json(msg=' --- '.join(messages))
+        return results
@@ -0,0 +1,104 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Provides pagination for REST collections, following _links.next
+    ONTAP returns an opaque start.* cursor in the next link, so pages cannot be requested out of order.
+    Instead, the next page is requested in the background while the current page is processed.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    # python 2.7 - no prefetch
+    HAS_FUTURES = False
+
+
+def get_next_api(response):
+    """return the api for the next page, relative to /api/, or None"""
+    try:
+        href = response['_links']['next']['href']
+    except (KeyError, TypeError):
+        return None
+    if href.startswith('/api/'):
+        return href[len('/api/'):]
+    return href
+
+
+def iter_pages(rest_api, api, query=None, prefetch=True):
+    """generator yielding (response, error) for each page of a collection
+       when prefetch is True, the next page is requested while the caller processes the current one
+       iteration stops after the first error
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch and HAS_FUTURES else None
+    try:
+        response, error = rest_api.get(api, query)
+        while True:
+            if error:
+                yield None, error
+                return
+            next_api = get_next_api(response)
+            future = None
+            if next_api is not None and executor is not None:
+                future = executor.submit(rest_api.get, next_api)
+            yield response, None
+            if next_api is None:
+                return
+            response, error = future.result() if future is not None else rest_api.get(next_api)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def merge_page(response, page):
+    """add records from page to response, response is updated in place"""
+    if response is None:
+        return page
+    if page is not None:
+        response['records'].extend(page.get('records', []))
+        response['_links'] = page.get('_links', dict())
+    return response
+
+
+def get_all_records(rest_api, api, query=None, prefetch=True):
+    """return a single response with all the records from all pages, and an error if any
+       num_records is updated to reflect the total number of records
+    """
+    all_records = None
+    for page, error in iter_pages(rest_api, api, query, prefetch):
+        if error:
+            return None, error
+        all_records = merge_page(all_records, page)
+    if all_records is not None and all_records.get('records') is not None:
+        all_records['num_records'] = len(all_records['records'])
+    return all_records, None
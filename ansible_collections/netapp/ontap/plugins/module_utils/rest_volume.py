@@ -34,6 +34,7 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import ansible_collections.netapp.ontap.plugins.module_utils.rest_pagination as rest_pagination
 import ansible_collections.netapp.ontap.plugins.module_utils.rest_response_helpers as rest_response_helpers
 
 
@@ -46,7 +47,7 @@ def get_volumes(rest_api, vserver=None, name=None):
         query['name'] = name
     if not query:
         query = None
-    response, error = rest_api.get(api, query)
+    response, error = rest_pagination.get_all_records(rest_api, api, query)
     volumes, error = rest_response_helpers.check_for_0_or_more_records(api, response, error)
     return volumes, error
 
@@ -0,0 +1,224 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Run independent tasks (API calls) using a bounded pool of threads.
+    Tasks may depend on other tasks, they are only started when their dependencies are complete.
+    A task reports an error by raising an exception, or by calling fail_json on a TaskModule.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import copy
+
+try:
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    HAS_FUTURES = True
+except ImportError:
+    # python 2.7 - tasks are run one after the other
+    HAS_FUTURES = False
+
+
+class TaskFailure(BaseException):
+    """ raised by TaskModule.fail_json in place of exiting
+        like SystemExit, this is not caught by 'except Exception' handlers in the task
+    """
+    def __init__(self, kwargs):
+        super(TaskFailure, self).__init__(kwargs.get('msg'))
+        self.kwargs = kwargs
+
+
+class TaskModule(object):
+    """ thin proxy for a module, used by a task
+        fail_json raises TaskFailure, so that run_tasks reports the error, other attributes are read from the module
+    """
+    def __init__(self, module):
+        # nested tasks share the same module
+        self._module = module._module if isinstance(module, TaskModule) else module
+
+    def fail_json(self, *args, **kwargs):  # pylint: disable=unused-argument
+        raise TaskFailure(kwargs)
+
+    def __getattr__(self, name):
+        if name == '_module':
+            raise AttributeError(name)
+        return getattr(self._module, name)
+
+
+def task_worker(obj):
+    """ return a shallow copy of obj, whose module attribute is a TaskModule
+        use its methods as tasks, so that errors reported with self.module.fail_json do not exit from a worker thread
+        other attributes are shared with obj
+    """
+    worker = copy.copy(obj)
+    worker.module = TaskModule(obj.module)
+    return worker
+
+
+def ready_tasks(pending, done, dependencies):
+    """ return the pending tasks whose dependencies are met, in order
+        a dependency on a task that is not scheduled is ignored
+    """
+    return [name for name in pending
+            if all(dep in done or dep not in dependencies for dep in dependencies.get(name, ()))]
+
+
+def run_tasks(module, tasks, max_concurrency=1, dependencies=None, results=None, errors=None):
+    """ run a list of tasks and return a dict of results, indexed by task name
+        tasks: list of (name, function, kwargs)
+        dependencies: dict of task name: list of task names that need to complete first
+        results: optional dict to record results, a result is recorded as soon as the task completes
+                 so that it is visible to dependent tasks
+        errors: optional dict to record errors, indexed by task name.  When present, a task that calls TaskModule.fail_json
+                or raises an exception does not fail the module, other tasks keep running, and tasks depending on it
+                are skipped.  Failed and skipped tasks are not present in results.
+        Results are always ordered as the tasks list, whatever the completion order.
+        If a task calls TaskModule.fail_json, module.fail_json is called from the calling thread once running tasks are complete.
+        If several tasks fail, the first one in the tasks list is reported.
+        module itself is not modified, tasks running in threads must not call module.fail_json, see task_worker.
+    """
+    if results is None:
+        results = dict()
+    names = [name for name, dummy, dummy in tasks]
+    # make sure every task is present, so that dependencies on unscheduled tasks can be ignored
+    deps = dict((name, list()) for name in names)
+    if dependencies:
+        deps.update((name, dependencies[name]) for name in names if name in dependencies)
+    functions = dict((name, (function, kwargs)) for name, function, kwargs in tasks)
+    if HAS_FUTURES and max_concurrency is not None and max_concurrency > 1 and len(tasks) > 1:
+        pending = _run_concurrently(module, names, functions, deps, results, max_concurrency, errors)
+    else:
+        pending = _run_serially(module, names, functions, deps, results, errors)
+    if pending:
+        module.fail_json(msg='Internal error: circular dependency between tasks: %s' % pending)
+    for name in names:
+        if name in results:
+            results[name] = results.pop(name)
+    return results
+
+
+def _record_error(errors, name, exc):
+    """ record the error message for a failed task """
+    if isinstance(exc, TaskFailure):
+        errors[name] = exc.kwargs.get('msg')
+    else:
+        errors[name] = 'Error in task %s: %s' % (name, repr(exc))
+
+
+def _skip_dependents(pending, failed, dependencies, errors):
+    """ remove the pending tasks depending on a failed task, directly or not """
+    skipped = True
+    while skipped:
+        skipped = [name for name in pending if any(dep in failed for dep in dependencies.get(name, ()))]
+        for name in skipped:
+            dep = [dep for dep in dependencies[name] if dep in failed][0]
+            errors[name] = 'Skipped task %s as task %s failed' % (name, dep)
+            failed.add(name)
+            pending.remove(name)
+
+
+def _run_serially(module, names, functions, dependencies, results, errors=None):
+    """ run tasks one after the other, in order, unless a dependency is not met
+        return unscheduled tasks, if any
+    """
+    pending = list(names)
+    done = set()
+    failed = set()
+    while pending:
+        if errors is not None:
+            _skip_dependents(pending, failed, dependencies, errors)
+        ready = ready_tasks(pending, done, dependencies)
+        if not ready:
+            break
+        name = ready[0]
+        function, kwargs = functions[name]
+        pending.remove(name)
+        if errors is None:
+            try:
+                results[name] = function(**kwargs)
+            except TaskFailure as exc:
+                module.fail_json(**exc.kwargs)
+        else:
+            try:
+                results[name] = function(**kwargs)
+            except (TaskFailure, Exception) as exc:
+                _record_error(errors, name, exc)
+                failed.add(name)
+                continue
+        done.add(name)
+    return pending
+
+
+def _run_concurrently(module, names, functions, dependencies, results, max_concurrency, errors=None):
+    """ run tasks in a pool of threads
+        return unscheduled tasks, if any
+    """
+    pending = list(names)
+    done = set()
+    running = dict()
+    failures = dict()
+    failed = set()
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        while pending or running:
+            if errors is not None:
+                _skip_dependents(pending, failed, dependencies, errors)
+            if not failures:
+                for name in ready_tasks(pending, done, dependencies):
+                    function, kwargs = functions[name]
+                    running[executor.submit(function, **kwargs)] = name
+                    pending.remove(name)
+            if not running:
+                break
+            completed, dummy = wait(running, return_when=FIRST_COMPLETED)
+            for future in completed:
+                name = running.pop(future)
+                if future.exception() is None:
+                    results[name] = future.result()
+                    done.add(name)
+                elif errors is not None:
+                    _record_error(errors, name, future.exception())
+                    failed.add(name)
+                else:
+                    failures[name] = future.exception()
+            if failures:
+                # do not start queued tasks
+                for future in [future for future in running if future.cancel()]:
+                    pending.append(running.pop(future))
+    finally:
+        executor.shutdown(wait=True)
+
+    if failures:
+        exc = failures[[name for name in names if name in failures][0]]
+        if isinstance(exc, TaskFailure):
+            module.fail_json(**exc.kwargs)
+        raise exc
+    return pending
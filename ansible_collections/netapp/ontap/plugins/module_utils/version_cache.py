@@ -0,0 +1,118 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+""" Support functions for NetApp ansible modules
+
+    Optional on-disk cache for the ONTAP version, REST support, and admin vserver name, shared by modules running
+    against the same cluster.  It also records when an EMS event was last sent.
+    Each module runs in its own process, so without a cache every task probes the cluster again.
+    The cache only holds versions and status codes, no credentials.  It is best effort: any error is ignored.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import tempfile
+import time
+
+
+class VersionCache(object):
+    ''' entries are indexed by cluster key, then by section (eg 'rest', 'ontapi')
+        a TTL of 0 disables the cache
+        entries may be written with different TTLs, each entry records its own expiry time
+    '''
+
+    def __init__(self, path, ttl, key):
+        self.path = os.path.expanduser(path) if path else None
+        self.ttl = ttl or 0
+        self.key = key
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.path is not None
+
+    def load(self):
+        ''' return the whole cache as a dict, or an empty dict if the file is missing or unreadable '''
+        try:
+            with open(self.path) as cache_file:
+                cache = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return dict()
+        return cache if isinstance(cache, dict) else dict()
+
+    def save(self, cache):
+        ''' write the file atomically, so that a concurrent reader never sees a partial file '''
+        try:
+            dirname = os.path.dirname(self.path)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname, 0o700)
+            fdesc, tmp_path = tempfile.mkstemp(dir=dirname or None, prefix='.netapp_cache')
+            with os.fdopen(fdesc, 'w') as cache_file:
+                json.dump(cache, cache_file)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+
+    @staticmethod
+    def is_expired(entry, now):
+        return not isinstance(entry, dict) or now >= entry.get('expires', 0)
+
+    def get(self, section):
+        ''' return the cached value, or None if absent or expired '''
+        if not self.enabled:
+            return None
+        entry = self.load().get(self.key, dict()).get(section)
+        now = time.time()
+        if not self.is_expired(entry, now) and now - entry.get('timestamp', 0) < self.ttl:
+            return entry.get('value')
+        return None
+
+    def set(self, section, value):
+        if not self.enabled:
+            return
+        now = time.time()
+        cache = self.load()
+        # drop expired entries, for any cluster
+        for key in list(cache):
+            sections = cache[key] if isinstance(cache[key], dict) else dict()
+            cache[key] = dict((name, entry) for name, entry in sections.items() if not self.is_expired(entry, now))
+            if not cache[key]:
+                del cache[key]
+        cache.setdefault(self.key, dict())[section] = dict(timestamp=now, expires=now + self.ttl, value=value)
+        self.save(cache)
+
+    def invalidate(self):
+        ''' remove all entries for this cluster, eg on authentication failure '''
+        if not self.enabled:
+            return
+        cache = self.load()
+        if self.key in cache:
+            del cache[self.key]
+            self.save(cache)
@@ -0,0 +1,57 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c) 2021, NetApp, Inc
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+''' Support functions for NetApp ansible modules
+
+    Add or remove initiators to/from an igroup using ZAPI calls, shared by na_ontap_igroup and na_ontap_igroup_initiator
+'''
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from functools import partial
+
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import run_tasks
+
+
+def modify_initiators(module, modify_initiator, initiators, zapi, max_concurrency, initiators_summary):
+    """
+    Add or remove initiators to/from an igroup, with up to max_concurrency ZAPI calls in parallel
+    modify_initiator: function called with (initiator, zapi), calling fail_json on a TaskModule on error, see task_runner.task_worker
+    initiators_summary: dict with igroup, added, removed, and errors keys, updated in place
+    All calls are completed before reporting an error, the error for each initiator is reported in initiators_summary
+    """
+    tasks = [(initiator, partial(modify_initiator, initiator, zapi), dict()) for initiator in initiators]
+    errors = dict()
+    modified = run_tasks(module, tasks, max_concurrency, errors=errors)
+    initiators_summary['added' if zapi == 'igroup-add' else 'removed'].extend(modified)
+    if errors:
+        initiators_summary['errors'].update(errors)
+        module.fail_json(msg='Error modifying initiators in igroup %s: %s'
+                         % (initiators_summary['igroup'], '; '.join(errors[initiator] for initiator in initiators if initiator in errors)),
+                         initiators_summary=initiators_summary)
@@ -247,15 +247,22 @@ EXAMPLES = """
 RETURN = """
 
 """
-import time
 import traceback
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
+# attributes read by get_aggr, other attributes are not requested
+AGGR_DESIRED_ATTRIBUTES = {
+    'aggr-attributes': {
+        'aggregate-name': None,
+        'aggr-raid-attributes': ['disk-count', 'state'],
+    }
+}
 
 
 class NetAppOntapAggregate(object):
@@ -326,6 +333,7 @@ class NetAppOntapAggregate(object):
         query = netapp_utils.zapi.NaElement('query')
         query.add_child_elem(query_details)
         aggr_get_iter.add_child_elem(query)
+        netapp_utils.add_desired_attributes(self.module, aggr_get_iter, AGGR_DESIRED_ATTRIBUTES)
         result = None
         try:
             result = self.server.invoke_successfully(aggr_get_iter, enable_tunneling=False)
@@ -502,6 +510,12 @@ class NetAppOntapAggregate(object):
             disks_obj.add_child_elem(disk_info_obj)
         return disks_obj
 
+    def get_aggr_online_state(self):
+        ''' poll function for Poller: return (current, done, error) '''
+        current = self.get_aggr()
+        status = None if current is None else current['service_state']
+        return current, status == 'online', None
+
     def create_aggr(self):
         """
         Create aggregate
@@ -544,15 +558,7 @@ class NetAppOntapAggregate(object):
         try:
             self.server.invoke_successfully(aggr_create, enable_tunneling=False)
             if self.parameters.get('wait_for_online'):
-                # round off time_out
-                retries = (self.parameters['time_out'] + 5) / 10
-                current = self.get_aggr()
-                status = None if current is None else current['service_state']
-                while status != 'online' and retries > 0:
-                    time.sleep(10)
-                    retries = retries - 1
-                    current = self.get_aggr()
-                    status = None if current is None else current['service_state']
+                current, dummy = Poller(self.parameters['time_out'], max_interval=10).poll(self.get_aggr_online_state)
             else:
                 current = self.get_aggr()
             if current is not None and current.get('disk_count') != self.parameters.get('disk_count'):
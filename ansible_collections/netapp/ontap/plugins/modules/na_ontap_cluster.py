@@ -146,6 +146,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -380,49 +381,76 @@ class NetAppONTAPCluster(object):
                                   exception=traceback.format_exc())
         return True
 
+    def get_cluster_create_state(self, cluster_wait):
+        ''' poll function for Poller: return (state, done, error) '''
+        try:
+            result = self.server.invoke_successfully(cluster_wait, enable_tunneling=True)
+        except netapp_utils.zapi.NaApiError as error:
+            # collecting errors, and retrying
+            return None, False, repr(error)
+
+        clus_progress = result.get_child_by_name('attributes')
+        result = None if clus_progress is None else clus_progress.get_child_by_name('cluster-create-join-progress-info')
+        if result is None:
+            # the progress record may not be present yet, retrying
+            return None, False, 'no status record yet'
+        state = dict(
+            is_complete=self.na_helper.get_value_for_bool(from_zapi=True, value=result.get_child_content('is-complete')),
+            status=result.get_child_content('status'),
+            current_status_message=result.get_child_content('current-status-message')
+        )
+        return state, state['is_complete'] or state['status'] in ('failed', 'success'), None
+
     def cluster_create_wait(self):
         """
         Wait whilst cluster creation completes
         """
+        if self.parameters['time_out'] == 0:
+            return True
 
         cluster_wait = netapp_utils.zapi.NaElement('cluster-create-join-progress-get')
-        is_complete = False
-        status = ''
-        retries = self.parameters['time_out']
-        errors = list()
-        while not is_complete and status not in ('failed', 'success') and retries > 0:
-            retries = retries - 10
-            time.sleep(10)
-            try:
-                result = self.server.invoke_successfully(cluster_wait, enable_tunneling=True)
-            except netapp_utils.zapi.NaApiError as error:
-                # collecting errors, and retrying
-                errors.append(repr(error))
-                continue
-
-            clus_progress = result.get_child_by_name('attributes')
-            result = clus_progress.get_child_by_name('cluster-create-join-progress-info')
-            is_complete = self.na_helper.get_value_for_bool(from_zapi=True,
-                                                            value=result.get_child_content('is-complete'))
-            status = result.get_child_content('status')
-
-        if self.parameters['time_out'] == 0:
-            is_complete = True
-            status = "success"
-        if not is_complete and status != 'success':
-            current_status_message = result.get_child_content('current-status-message')
+        poller = Poller(self.parameters['time_out'], max_interval=10)
+        state, dummy = poller.poll(lambda: self.get_cluster_create_state(cluster_wait))
+        is_complete = state is not None and state['is_complete']
+        if not is_complete and (state is None or state['status'] != 'success'):
+            errors = poller.errors
+            current_status_message = None if state is None else state['current_status_message']
             errors.append('Failed to confirm cluster creation %s: %s' % (self.parameters.get('cluster_name'), current_status_message))
-            if retries <= 0:
+            if poller.timed_out:
                 errors.append("Timeout after %s seconds" % self.parameters['time_out'])
             self.module.fail_json(msg='Error creating cluster %s: %s'
                                   % (self.parameters['cluster_name'], str(errors)))
 
         return is_complete
 
+    def get_node_add_state(self, cluster_node_status):
+        ''' poll function for Poller: return (state, done, error) '''
+        try:
+            result = self.server.invoke_successfully(cluster_node_status, enable_tunneling=True)
+        except netapp_utils.zapi.NaApiError as error:
+            if error.message == "Unable to find API: cluster-add-node-status-get-iter":
+                return dict(status='unsupported', failure_msg=None), True, None
+            # collecting errors, and retrying
+            return None, False, repr(error)
+
+        attributes_list = result.get_child_by_name('attributes-list')
+        join_progress = None if attributes_list is None else attributes_list.get_child_by_name('cluster-create-add-node-status-info')
+        if join_progress is None:
+            # the progress record may not be present yet, retrying
+            return None, False, 'no status record yet'
+        state = dict(
+            status=join_progress.get_child_content('status'),
+            failure_msg=join_progress.get_child_content('failure-msg')
+        )
+        return state, state['status'] in ('success', 'failure'), None
+
     def node_add_wait(self):
         """
         Wait whilst node is being added to the existing cluster
         """
+        if self.parameters['time_out'] == 0:
+            return
+
         cluster_node_status = netapp_utils.zapi.NaElement('cluster-add-node-status-get-iter')
         node_status_info = netapp_utils.zapi.NaElement('cluster-create-add-node-status-info')
         node_status_info.add_new_child('cluster-ip', self.parameters.get('cluster_ip_address'))
@@ -430,35 +458,17 @@ class NetAppONTAPCluster(object):
         query.add_child_elem(node_status_info)
         cluster_node_status.add_child_elem(query)
 
-        is_complete = None
-        failure_msg = None
-        retries = self.parameters['time_out']
-        errors = list()
-        while is_complete != 'success' and is_complete != 'failure' and retries > 0:
-            retries = retries - 10
-            time.sleep(10)
-            try:
-                result = self.server.invoke_successfully(cluster_node_status, enable_tunneling=True)
-            except netapp_utils.zapi.NaApiError as error:
-                if error.message == "Unable to find API: cluster-add-node-status-get-iter":
-                    # This API is not supported for 9.3 or earlier releases, just wait a bit
-                    time.sleep(60)
-                    return
-                # collecting errors, and retrying
-                errors.append(repr(error))
-                continue
-
-            attributes_list = result.get_child_by_name('attributes-list')
-            join_progress = attributes_list.get_child_by_name('cluster-create-add-node-status-info')
-            is_complete = join_progress.get_child_content('status')
-            failure_msg = join_progress.get_child_content('failure-msg')
-
-        if self.parameters['time_out'] == 0:
-            is_complete = 'success'
-        if is_complete != 'success':
-            if 'Node is already in a cluster' in failure_msg:
+        poller = Poller(self.parameters['time_out'], max_interval=10)
+        state, dummy = poller.poll(lambda: self.get_node_add_state(cluster_node_status))
+        if state is not None and state['status'] == 'unsupported':
+            # This API is not supported for 9.3 or earlier releases, just wait a bit
+            time.sleep(60)
+            return
+        if state is None or state['status'] != 'success':
+            errors = poller.errors
+            if state is not None and 'Node is already in a cluster' in (state['failure_msg'] or ''):
                 return
-            elif retries <= 0:
+            elif poller.timed_out:
                 errors.append("Timeout after %s seconds" % self.parameters['time_out'])
             self.module.fail_json(msg='Error adding node with ip address %s: %s'
                                   % (self.parameters['cluster_ip_address'], str(errors)))
@@ -467,15 +477,15 @@ class NetAppONTAPCluster(object):
         ''' wait for node name or clister IP address to disappear '''
         node_name = self.parameters.get('node_name')
         node_ip = self.parameters.get('cluster_ip_address')
-        retries = self.parameters['time_out']
-        while retries > 0:
-            retries = retries - 10
-            if node_name is not None and node_name not in self.get_cluster_nodes():
-                return
-            if node_ip is not None and self.get_cluster_ip_address(node_ip) is None:
-                return
-            time.sleep(10)
-        self.module.fail_json(msg='Timeout waiting for node to be removed from cluster.')
+
+        def is_node_removed():
+            removed = (node_name is not None and node_name not in self.get_cluster_nodes()) or \
+                      (node_ip is not None and self.get_cluster_ip_address(node_ip) is None)
+            return removed, removed, None
+
+        removed, dummy = Poller(self.parameters['time_out'], max_interval=10).poll(is_node_removed)
+        if not removed:
+            self.module.fail_json(msg='Timeout waiting for node to be removed from cluster.')
 
     def autosupport_log(self):
         """
@@ -237,7 +237,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
-import time
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
@@ -634,6 +634,16 @@ class NetAppONTAPFirmwareUpgrade(object):
                                       % (to_native(error)),
                                   exception=traceback.format_exc())
 
+    def get_download_sp_image_state(self):
+        ''' poll function for Poller: return (progress, done, error) '''
+        progress = self.download_sp_image_progress()
+        return progress, progress['run_status'] is None or progress['run_status'] == 'Exited', None
+
+    def get_sp_firmware_image_update_state(self):
+        ''' poll function for Poller: return (progress, done, error) '''
+        progress = self.sp_firmware_image_update_progress_get(self.parameters['node'])
+        return progress, progress.get('is-in-progress') != 'true', None
+
     def download_sp_firmware(self):
         if self.parameters.get('reboot_sp'):
             self.reboot_sp()
@@ -641,9 +651,8 @@ class NetAppONTAPFirmwareUpgrade(object):
         progress = self.download_sp_image_progress()
         # progress only show the current or most recent update/install operation.
         if progress['phase'] == 'Download':
-            while progress['run_status'] is not None and progress['run_status'] != 'Exited':
-                time.sleep(10)
-                progress = self.download_sp_image_progress()
+            if progress['run_status'] is not None and progress['run_status'] != 'Exited':
+                progress, dummy = Poller(None, max_interval=10).poll(self.get_download_sp_image_state)
             if progress['exit_status'] != 'Success':
                 self.module.fail_json(msg=progress['exit_message'], exception=traceback.format_exc())
             return MSGS['dl_completed']
@@ -688,10 +697,7 @@ class NetAppONTAPFirmwareUpgrade(object):
                 if not self.module.check_mode:
                     if self.sp_firmware_image_update():
                         changed = True
-                    firmware_update_progress = self.sp_firmware_image_update_progress_get(self.parameters['node'])
-                    while firmware_update_progress.get('is-in-progress') == 'true':
-                        time.sleep(25)
-                        firmware_update_progress = self.sp_firmware_image_update_progress_get(self.parameters['node'])
+                    firmware_update_progress, dummy = Poller(None, max_interval=25).poll(self.get_sp_firmware_image_update_state)
                 else:
                     # we don't know until we try the upgrade
                     changed = True
@@ -90,6 +90,14 @@ options:
     required: true
     type: str
 
+  max_concurrency:
+    description:
+    - Maximum number of initiators added or removed in parallel with ZAPI, one initiator per call.
+    - With REST, initiators are added with a single call, and removed with a single call.
+    type: int
+    default: 1
+    version_added: '21.3.0'
+
 '''
 
 EXAMPLES = '''
@@ -153,6 +161,13 @@ EXAMPLES = '''
 '''
 
 RETURN = '''
+initiators_summary:
+    description:
+    - Initiators added to and removed from the igroup.
+    - On failure, C(errors) reports the error for each initiator that could not be added or removed.
+    returned: always
+    type: dict
+    sample: {"igroup": "ansibleIgroup3", "added": ["iqn.1994-05.com.redhat:abc"], "removed": [], "errors": {}}
 '''
 
 import traceback
@@ -163,6 +178,8 @@ import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_ut
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp import OntapRestAPI
 import ansible_collections.netapp.ontap.plugins.module_utils.rest_response_helpers as rrh
+import ansible_collections.netapp.ontap.plugins.module_utils.zapis_igroup as zapis_igroup
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import task_worker
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -183,7 +200,8 @@ class NetAppOntapIgroup(object):
             initiators=dict(required=False, type='list', elements='str', aliases=['initiator']),
             vserver=dict(required=True, type='str'),
             force_remove_initiator=dict(required=False, type='bool', default=False, aliases=['allow_delete_while_mapped']),
-            bind_portset=dict(required=False, type='str')
+            bind_portset=dict(required=False, type='str'),
+            max_concurrency=dict(required=False, type='int', default=1)
         ))
 
         self.module = AnsibleModule(
@@ -203,6 +221,7 @@ class NetAppOntapIgroup(object):
         if self.module.params.get('initiators') is not None:
             self.parameters['initiators'] = [self.na_helper.sanitize_wwn(initiator)
                                              for initiator in self.module.params['initiators']]
+        self.initiators_summary = dict(igroup=self.parameters['name'], added=list(), removed=list(), errors=dict())
 
         self.rest_api = OntapRestAPI(self.module)
         self.use_rest = self.rest_api.is_rest()
@@ -307,6 +326,7 @@ class NetAppOntapIgroup(object):
         body = dict(records=records)
         dummy, error = self.rest_api.post(api, body)
         self.fail_on_error(error)
+        self.initiators_summary['added'].extend(initiators)
 
     def add_initiators(self, uuid, current_initiators):
         """
@@ -320,25 +340,36 @@ class NetAppOntapIgroup(object):
         if self.use_rest and uuid is not None and initiators_to_add:
             self.add_initiators_rest(uuid, initiators_to_add)
         else:
-            for initiator in initiators_to_add:
-                self.modify_initiator(initiator, 'igroup-add')
+            self.modify_initiators(initiators_to_add, 'igroup-add')
 
-    def delete_initiator_rest(self, uuid, initiator):
-        api = "protocols/san/igroups/%s/initiators/%s" % (uuid, initiator)
-        dummy, error = self.rest_api.delete(api)
+    def delete_initiators_rest(self, uuid, initiators):
+        """
+        Remove several initiators with a single DELETE, using a query on the initiator names
+        """
+        api = "protocols/san/igroups/%s/initiators" % uuid
+        query = dict(name='|'.join(initiators))
+        dummy, error = self.rest_api.delete(api, params=query)
         self.fail_on_error(error)
+        self.initiators_summary['removed'].extend(initiators)
 
     def remove_initiators(self, uuid, current_initiators):
         """
         Removes current initiators from igroup unless they are still desired
         :return: None
         """
-        for initiator in current_initiators:
-            if initiator not in self.parameters.get('initiators', list()):
-                if self.use_rest:
-                    self.delete_initiator_rest(uuid, initiator)
-                else:
-                    self.modify_initiator(initiator, 'igroup-remove')
+        initiators_to_remove = [initiator for initiator in current_initiators
+                                if initiator not in self.parameters.get('initiators', list())]
+        if self.use_rest and initiators_to_remove:
+            self.delete_initiators_rest(uuid, initiators_to_remove)
+        elif not self.use_rest:
+            self.modify_initiators(initiators_to_remove, 'igroup-remove')
+
+    def modify_initiators(self, initiators, zapi):
+        """
+        Add or remove initiators to/from an igroup, with up to max_concurrency ZAPI calls in parallel
+        """
+        zapis_igroup.modify_initiators(self.module, task_worker(self).modify_initiator, initiators, zapi, self.parameters['max_concurrency'],
+                                       self.initiators_summary)
 
     def modify_initiator(self, initiator, zapi):
         """
@@ -352,8 +383,8 @@ class NetAppOntapIgroup(object):
         try:
             self.server.invoke_successfully(igroup_modify, enable_tunneling=True)
         except netapp_utils.zapi.NaApiError as error:
-            self.module.fail_json(msg='Error modifying igroup initiator %s: %s' % (self.parameters['name'],
-                                                                                   to_native(error)),
+            self.module.fail_json(msg='Error modifying igroup initiator %s in %s: %s' % (initiator, self.parameters['name'],
+                                                                                         to_native(error)),
                                   exception=traceback.format_exc())
 
     def create_igroup_rest(self):
@@ -530,7 +561,7 @@ class NetAppOntapIgroup(object):
                 modify.pop('initiators', None)
                 if modify:
                     self.modify_igroup_rest(uuid, modify)
-        self.module.exit_json(changed=self.na_helper.changed, current=current, modify=modify)
+        self.module.exit_json(changed=self.na_helper.changed, current=current, modify=modify, initiators_summary=self.initiators_summary)
 
 
 def main():
@@ -62,6 +62,13 @@ options:
     required: true
     type: str
 
+  max_concurrency:
+    description:
+    - Maximum number of initiators added or removed in parallel, one initiator per ZAPI call.
+    type: int
+    default: 1
+    version_added: '21.3.0'
+
 '''
 
 EXAMPLES = '''
@@ -87,6 +94,13 @@ EXAMPLES = '''
 '''
 
 RETURN = '''
+initiators_summary:
+    description:
+    - Initiators added to and removed from the igroup.
+    - On failure, C(errors) reports the error for each initiator that could not be added or removed.
+    returned: always
+    type: dict
+    sample: {"igroup": "test_group", "added": ["abc.test:def.com"], "removed": [], "errors": {}}
 '''
 
 import traceback
@@ -95,6 +109,8 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+import ansible_collections.netapp.ontap.plugins.module_utils.zapis_igroup as zapis_igroup
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import task_worker
 
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
@@ -111,6 +127,7 @@ class NetAppOntapIgroupInitiator(object):
             initiator_group=dict(required=True, type='str'),
             force_remove=dict(required=False, type='bool', default=False),
             vserver=dict(required=True, type='str'),
+            max_concurrency=dict(required=False, type='int', default=1),
         ))
 
         self.module = AnsibleModule(
@@ -120,6 +137,7 @@ class NetAppOntapIgroupInitiator(object):
 
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.set_parameters(self.module.params)
+        self.initiators_summary = dict(igroup=self.parameters['initiator_group'], added=list(), removed=list(), errors=dict())
 
         if HAS_NETAPP_LIB is False:
             self.module.fail_json(msg="the python NetApp-Lib module is required")
@@ -166,27 +184,34 @@ class NetAppOntapIgroupInitiator(object):
                                                                                    to_native(error)),
                                   exception=traceback.format_exc())
 
+    def modify_initiators(self, initiators, zapi):
+        """
+        Add or remove initiators to/from an igroup, with up to max_concurrency ZAPI calls in parallel
+        """
+        zapis_igroup.modify_initiators(self.module, task_worker(self).modify_initiator, initiators, zapi, self.parameters['max_concurrency'],
+                                       self.initiators_summary)
+
     def autosupport_log(self):
         netapp_utils.ems_log_event("na_ontap_igroup_initiator", self.server)
 
     def apply(self):
         self.autosupport_log()
         initiators = self.get_initiators()
+        initiators_to_add, initiators_to_remove = list(), list()
         for initiator in self.parameters['names']:
             present = None
             initiator = self.na_helper.sanitize_wwn(initiator)
             if initiator in initiators:
                 present = True
             cd_action = self.na_helper.get_cd_action(present, self.parameters)
-            if self.na_helper.changed:
-                if self.module.check_mode:
-                    pass
-                else:
-                    if cd_action == 'create':
-                        self.modify_initiator(initiator, 'igroup-add')
-                    elif cd_action == 'delete':
-                        self.modify_initiator(initiator, 'igroup-remove')
-        self.module.exit_json(changed=self.na_helper.changed)
+            if cd_action == 'create' and initiator not in initiators_to_add:
+                initiators_to_add.append(initiator)
+            elif cd_action == 'delete' and initiator not in initiators_to_remove:
+                initiators_to_remove.append(initiator)
+        if self.na_helper.changed and not self.module.check_mode:
+            self.modify_initiators(initiators_to_add, 'igroup-add')
+            self.modify_initiators(initiators_to_remove, 'igroup-remove')
+        self.module.exit_json(changed=self.na_helper.changed, initiators_summary=self.initiators_summary)
 
 
 def main():
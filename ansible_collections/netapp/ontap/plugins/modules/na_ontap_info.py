@@ -157,6 +157,29 @@ options:
         default: false
         type: bool
         version_added: '20.4.0'
+    output_format:
+        description:
+        - With C(dict), records are reported as dictionaries, indexed by key for most subsets.
+        - With C(columnar), records for each subset are replaced with C(fields), the list of fields with nested fields
+          joined with a dot, eg C(volume_id_attributes.name), C(columns), a list of values for each field, and C(keys),
+          the list of record keys if records are indexed.  A column of strings with repeated values is reported as a
+          dictionary with C(dictionary), the list of unique values, and C(indices).
+        - Ignored when C(output_file) is set.
+        type: str
+        choices: ['dict', 'columnar']
+        default: 'dict'
+        version_added: '21.3.0'
+    output_file:
+        description:
+        - Write gathered information to this local file, as JSON lines, rather than returning it in C(ontap_info).
+        - Each line is a dictionary with C(subset), and C(record) for each record, or C(info) for a subset without records.
+          C(key) is added when records are indexed.
+        - The file is gzip compressed if the name ends with C(.gz).
+        - C(ontap_info) only reports the number of records for each subset.
+        - Each subset is written as soon as it is gathered, and its records are then released.  The records of a single
+          subset are kept in memory until the subset is complete, as records may be indexed by key.
+        type: path
+        version_added: '21.3.0'
     volume_move_target_aggr_info:
         description:
         - Required options for volume_move_target_aggr_info
@@ -221,6 +244,14 @@ options:
         type: list
         elements: str
         default: never
+    max_concurrency:
+        description:
+        - Maximum number of subsets gathered in parallel, using separate ZAPI calls.
+        - By default, subsets are gathered one after the other.
+        - Subsets that depend on another subset, like net_ifgrp_info on net_port_info, are gathered after it.
+        type: int
+        default: 1
+        version_added: '21.3.0'
 '''
 
 EXAMPLES = '''
@@ -251,6 +282,14 @@ EXAMPLES = '''
       - missing_vserver_api_error
       - rpc_error
 
+- name: Gather all subsets, using up to 8 parallel ZAPI calls
+  na_ontap_info:
+    hostname: "na-vsim"
+    username: "admin"
+    password: "admins_password"
+    max_concurrency: 8
+  register: ontap_info
+
 - name: Limit Info Gathering to Aggregate Information as Cluster Admin
   na_ontap_info:
     hostname: "na-vsim"
@@ -371,23 +410,12 @@ ontap_info:
     }'
 '''
 
-import copy
 import traceback
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
-
-try:
-    import xmltodict
-    HAS_XMLTODICT = True
-except ImportError:
-    HAS_XMLTODICT = False
-
-try:
-    import json
-    HAS_JSON = True
-except ImportError:
-    HAS_JSON = False
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import run_tasks, task_worker
+from ansible_collections.netapp.ontap.plugins.module_utils.info_output import to_columnar, JsonLinesWriter
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -406,6 +434,9 @@ class NetAppONTAPGatherInfo(object):
         self.query = module.params['query']
         self.translate_keys = not module.params['use_native_zapi_tags']
         self.warnings = list()  # warnings will be added to the info results, if any
+        # with output_file, each subset is written as soon as it is gathered
+        self.writer = None
+        self.output_summary = dict()
         self.set_error_flags()
 
         # thanks to coreywan (https://github.com/ansible/ansible/pull/47016)
@@ -653,6 +684,7 @@ class NetAppONTAPGatherInfo(object):
                 'method': self.get_ifgrp_info,
                 'kwargs': {},
                 'min_version': '0',
+                'depends_on': ['net_port_info'],
             },
             'ontap_system_version': {
                 'method': self.get_generic_get_iter,
@@ -1362,62 +1394,56 @@ class NetAppONTAPGatherInfo(object):
     def ontapi(self):
         '''Method to get ontapi version'''
 
+        cache = netapp_utils.get_version_cache(self.module)
+        ontapi_version = cache.get('ontapi')
+        if ontapi_version is not None:
+            return ontapi_version
         api = 'system-get-ontapi-version'
         api_call = netapp_utils.zapi.NaElement(api)
         try:
             results = self.server.invoke_successfully(api_call, enable_tunneling=True)
-            ontapi_version = results.get_child_content('minor-version')
-            return ontapi_version if ontapi_version is not None else '0'
         except netapp_utils.zapi.NaApiError as error:
             self.module.fail_json(msg="Error calling API %s: %s" %
                                   (api, to_native(error)), exception=traceback.format_exc())
-
-    def call_api(self, call, attributes_list_tag='attributes-list', query=None, fail_on_error=True):
-        '''Main method to run an API call'''
-
+        ontapi_version = results.get_child_content('minor-version')
+        ontapi_version = ontapi_version if ontapi_version is not None else '0'
+        cache.set('ontapi', ontapi_version)
+        return ontapi_version
+
+    def iter_api_records(self, call, attributes_list_tag='attributes-list', query=None):
+        '''Generator yielding the records of an API call, following next-tag
+           desired_attributes and query are applied to every page
+           When attributes_list_tag is None, the children of the results element are yielded.
+        '''
+        children = [struct for struct in (query, self.desired_attributes, self.query) if struct]
+        if attributes_list_tag is not None:
+            for record in netapp_utils.iter_zapi_records(self.server, call, children, records_tag=attributes_list_tag):
+                yield record
+            return
         api_call = netapp_utils.zapi.NaElement(call)
-        initial_result = None
-        result = None
-
-        if query:
-            for key, val in query.items():
-                # Can val be nested?
-                api_call.add_new_child(key, val)
-
-        if self.desired_attributes is not None:
-            api_call.translate_struct(self.desired_attributes)
-        if self.query is not None:
-            api_call.translate_struct(self.query)
+        if children:
+            api_call.translate_struct(children)
+        result = self.server.invoke_successfully(api_call, enable_tunneling=True)
+        if result.get_child_by_name('next-tag'):
+            self.module.fail_json(msg="Error calling API %s: %s" %
+                                  (api_call.to_string(), "'next-tag' is not expected for this API"))
+        for record in result.get_children():
+            yield record
+
+    def call_api(self, call, attributes_list_tag='attributes-list', query=None, fail_on_error=True, convert=None):
+        '''Main method to run an API call
+           convert: optional function applied to each record as it is received, so that pages are not kept in memory
+           return a list of records, or converted records, and an error message or None
+        '''
+        records = list()
         try:
-            initial_result = self.server.invoke_successfully(api_call, enable_tunneling=True)
-            next_tag = initial_result.get_child_by_name('next-tag')
-            result = copy.copy(initial_result)
-
-            while next_tag:
-                next_tag_call = netapp_utils.zapi.NaElement(call)
-                if query:
-                    for key, val in query.items():
-                        next_tag_call.add_new_child(key, val)
-
-                next_tag_call.add_new_child("tag", next_tag.get_content(), True)
-                next_result = self.server.invoke_successfully(next_tag_call, enable_tunneling=True)
-
-                next_tag = next_result.get_child_by_name('next-tag')
-                if attributes_list_tag is None:
-                    self.module.fail_json(msg="Error calling API %s: %s" %
-                                          (api_call.to_string(), "'next-tag' is not expected for this API"))
-
-                result_attr = result.get_child_by_name(attributes_list_tag)
-                new_records = next_result.get_child_by_name(attributes_list_tag)
-                if new_records:
-                    for record in new_records.get_children():
-                        result_attr.add_child_elem(record)
-
-            return result, None
+            for record in self.iter_api_records(call, attributes_list_tag, query):
+                records.append(record if convert is None else convert(record))
+            return records, None
 
         except netapp_utils.zapi.NaApiError as error:
             if call in ['security-key-manager-key-get-iter']:
-                return result, None
+                return records or None, None
             kind, error_message = netapp_utils.classify_zapi_exception(error)
             if kind == 'missing_vserver_api_error':
                 # for missing_vserver_api_error, the API is already in error_message
@@ -1451,27 +1477,25 @@ class NetAppONTAPGatherInfo(object):
             tmp = self.get_generic_get_iter('net-port-ifgrp-get', key_fields=('node', 'ifgrp-name'),
                                             attribute='net-ifgrp-info', query=query,
                                             attributes_list_tag='attributes')
-            net_ifgrp_info = net_ifgrp_info.copy()
             net_ifgrp_info.update(tmp)
         return net_ifgrp_info
 
     def get_generic_get_iter(self, call, attribute=None, key_fields=None, query=None, attributes_list_tag='attributes-list', fail_on_error=True):
         '''Method to run a generic get-iter call'''
 
-        generic_call, error = self.call_api(call, attributes_list_tag, query, fail_on_error=fail_on_error)
+        def convert(record):
+            return zapi_tag(record), zapi_to_dict(record, self.translate_keys)
+
+        records, error = self.call_api(call, attributes_list_tag, query, fail_on_error=fail_on_error, convert=convert)
 
         if error is not None:
             return {'error': error}
 
-        if generic_call is None:
+        if records is None:
             return None
 
-        if attributes_list_tag is None:
-            attributes_list = generic_call
-        else:
-            attributes_list = generic_call.get_child_by_name(attributes_list_tag)
-
-        if attributes_list is None:
+        if not records and attributes_list_tag is not None:
+            # attributes-list is not present when there is no record
             return None
 
         if key_fields is None:
@@ -1479,38 +1503,46 @@ class NetAppONTAPGatherInfo(object):
         else:
             out = {}
 
+        # key lookups are done on the converted record
+        lookup_fields = key_fields
+        if self.translate_keys and isinstance(key_fields, str):
+            lookup_fields = key_fields.replace('-', '_')
+        elif self.translate_keys and isinstance(key_fields, tuple):
+            lookup_fields = tuple(key.replace('-', '_') for key in key_fields)
+
         iteration = 0
-        for child in attributes_list.get_children():
+        for tag, info in records:
             iteration += 1
-            dic = xmltodict.parse(child.to_string(), xml_attribs=False)
-
-            if attribute is not None:
-                dic = dic[attribute]
+            if attribute is None:
+                info = {tag.replace('-', '_') if self.translate_keys else tag: info}
+            elif tag != attribute:
+                raise KeyError(attribute)
 
-            info = json.loads(json.dumps(dic))
-            if self.translate_keys:
-                info = convert_keys(info)
             if isinstance(key_fields, str):
                 try:
-                    unique_key = _finditem(dic, key_fields)
-                except KeyError as exc:
-                    error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
+                    unique_key = _finditem(info, lookup_fields)
+                except KeyError:
+                    error_message = 'Error: key %s not found for %s, got: %s' % (repr(key_fields), call, repr(info))
                     if self.error_flags['key_error']:
                         self.module.fail_json(msg=error_message, exception=traceback.format_exc())
-                    unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
+                    unique_key = 'Error_%d_key_not_found_%s' % (iteration, key_fields)
             elif isinstance(key_fields, tuple):
-                try:
-                    unique_key = ':'.join([_finditem(dic, el) for el in key_fields])
-                except KeyError as exc:
-                    error_message = 'Error: key %s not found for %s, got: %s' % (str(exc), call, repr(info))
-                    if self.error_flags['key_error']:
-                        self.module.fail_json(msg=error_message, exception=traceback.format_exc())
-                    unique_key = 'Error_%d_key_not_found_%s' % (iteration, exc.args[0])
+                keys = list()
+                for key, lookup_key in zip(key_fields, lookup_fields):
+                    try:
+                        keys.append(_finditem(info, lookup_key))
+                    except KeyError:
+                        error_message = 'Error: key %s not found for %s, got: %s' % (repr(key), call, repr(info))
+                        if self.error_flags['key_error']:
+                            self.module.fail_json(msg=error_message, exception=traceback.format_exc())
+                        unique_key = 'Error_%d_key_not_found_%s' % (iteration, key)
+                        break
+                else:
+                    unique_key = ':'.join(keys)
             else:
                 unique_key = None
             if unique_key is not None:
-                out = out.copy()
-                out.update({unique_key: info})
+                out[unique_key] = info
             else:
                 out.append(info)
 
@@ -1553,6 +1585,8 @@ class NetAppONTAPGatherInfo(object):
         '''Method to get all subsets'''
 
         self.send_ems_event()
+        if self.module.params.get('output_file'):
+            self.open_output_file()
 
         self.netapp_info['ontapi_version'] = self.ontapi()
         self.netapp_info['ontap_version'] = self.netapp_info['ontapi_version']
@@ -1572,9 +1606,22 @@ class NetAppONTAPGatherInfo(object):
                 if len(run_subset) > 1:
                     self.module.fail_json(msg="query option is only supported with a single subset")
                 self.sanitize_query()
-            for subset in run_subset:
+            tasks = list()
+            dependencies = dict((subset, self.info_subsets[subset]['depends_on'])
+                                for subset in run_subset if 'depends_on' in self.info_subsets[subset])
+            needed = set(dep for deps in dependencies.values() for dep in deps)
+            worker = task_worker(self)
+            for subset in sorted(run_subset):
                 call = self.info_subsets[subset]
-                self.netapp_info[subset] = call['method'](**call['kwargs'])
+                # info_subsets methods are bound to self, use the worker methods
+                method = getattr(worker, call['method'].__name__)
+                if self.writer is None:
+                    tasks.append((subset, method, call['kwargs']))
+                else:
+                    tasks.append((subset, worker.gather_and_write_subset,
+                                  dict(subset=subset, method=method, kwargs=call['kwargs'], keep=subset in needed)))
+            # results are recorded in netapp_info as soon as available, as some subsets depend on others
+            run_tasks(self.module, tasks, self.module.params['max_concurrency'], dependencies, self.netapp_info)
 
         if self.warnings:
             self.netapp_info['module_warnings'] = self.warnings
@@ -1619,12 +1666,92 @@ class NetAppONTAPGatherInfo(object):
 
         return runable_subsets
 
+    @staticmethod
+    def get_records(subset_info):
+        ''' return a list of records and a list of keys or None, or None, None if the subset does not have records '''
+        if isinstance(subset_info, list) and subset_info and all(isinstance(record, dict) for record in subset_info):
+            return subset_info, None
+        if isinstance(subset_info, dict) and subset_info and 'error' not in subset_info \
+                and all(isinstance(record, dict) for record in subset_info.values()):
+            return list(subset_info.values()), list(subset_info.keys())
+        return None, None
+
+    def to_columnar(self, ontap_info):
+        ''' replace records with fields and columns, for each subset with records '''
+        columnar_info = dict()
+        for subset, subset_info in ontap_info.items():
+            records, keys = self.get_records(subset_info)
+            columnar_info[subset] = subset_info if records is None else to_columnar(records, keys)
+        return columnar_info
+
+    def open_output_file(self):
+        ''' open output_file, so that each subset can be written as soon as it is gathered '''
+        self.writer = JsonLinesWriter(self.module.params['output_file'])
+        error = self.writer.open()
+        if error:
+            self.module.fail_json(msg=error)
+
+    def write_subset(self, subset, subset_info):
+        ''' write a subset to output_file, return a summary with the number of records '''
+        if self.module.params.get('summary'):
+            subset_info = self.summarize_subset(subset, subset_info)
+        error = self.writer.write(self.iter_output_lines({subset: subset_info}))
+        if error:
+            self.module.fail_json(msg=error)
+        records, dummy = self.get_records(subset_info)
+        self.output_summary[subset] = dict() if records is None else dict(num_records=len(records))
+        return self.output_summary[subset]
+
+    def gather_and_write_subset(self, subset, method, kwargs, keep):
+        ''' gather a subset and write it to output_file, so that its records are not kept in memory
+            keep: return the gathered information rather than a summary, as other subsets depend on it
+        '''
+        subset_info = method(**kwargs)
+        summary = self.write_subset(subset, subset_info)
+        return subset_info if keep else summary
+
+    def iter_output_lines(self, ontap_info):
+        ''' generator yielding a line for each record, or for each subset without records '''
+        for subset, subset_info in ontap_info.items():
+            records, keys = self.get_records(subset_info)
+            if records is None:
+                yield dict(subset=subset, info=subset_info)
+            elif keys is None:
+                for record in records:
+                    yield dict(subset=subset, record=record)
+            else:
+                for key, record in zip(keys, records):
+                    yield dict(subset=subset, key=key, record=record)
+
+    def format_output(self, ontap_info):
+        ''' apply output_file or output_format, return the information to report in ontap_info '''
+        if self.writer is not None:
+            # write the remaining entries, such as ontapi_version
+            for subset, subset_info in ontap_info.items():
+                if subset not in self.output_summary:
+                    self.write_subset(subset, subset_info)
+            error = self.writer.close()
+            if error:
+                self.module.fail_json(msg=error)
+            return dict((subset, self.output_summary[subset]) for subset in ontap_info)
+        if self.module.params['output_format'] == 'columnar':
+            return self.to_columnar(ontap_info)
+        return ontap_info
+
+    @staticmethod
+    def summarize_subset(subset, subset_info):
+        ''' return the keys for a subset with indexed records, subset_info otherwise '''
+        if '_info' in subset and subset_info is not None and isinstance(subset_info, dict):
+            # don't summarize errors
+            if 'error' not in subset_info:
+                return subset_info.keys()
+        return subset_info
+
     def get_summary(self, ontap_info):
         for info in ontap_info:
-            if '_info' in info and ontap_info[info] is not None and isinstance(ontap_info[info], dict):
-                # don't summarize errors
-                if 'error' not in ontap_info[info]:
-                    ontap_info[info] = ontap_info[info].keys()
+            # subsets written to output_file are already summarized
+            if info not in self.output_summary:
+                ontap_info[info] = self.summarize_subset(info, ontap_info[info])
         return ontap_info
 
     def sanitize_desired_attributes(self):
@@ -1712,18 +1839,38 @@ def _finditem(obj, keys):
     raise KeyError(str(keys))
 
 
-def convert_keys(d_param):
-    '''Method to convert hyphen to underscore'''
-
-    if isinstance(d_param, dict):
-        out = {}
-        for key, val in d_param.items():
-            val = convert_keys(val)
-            out[key.replace('-', '_')] = val
-        return out
-    elif isinstance(d_param, list):
-        return [convert_keys(val) for val in d_param]
-    return d_param
+def zapi_tag(element):
+    '''Method to return the tag name of a NaElement, without the XML namespace'''
+    return element.get_name().rpartition('}')[2]
+
+
+def zapi_to_dict(element, translate_keys=False):
+    '''Method to convert a NaElement tree into a dict, without going through a string representation
+       This matches xmltodict.parse(element.to_string(), xml_attribs=False):
+       - a leaf element is converted to its text content, or None if empty,
+       - repeated tags are collected into a list.
+       Optionally, hyphens in keys are converted to underscores.
+    '''
+    children = element.get_children()
+    text = element.get_content()
+    text = text.strip() if text else None
+    if not children:
+        return text or None
+    out = dict()
+    for child in children:
+        tag = zapi_tag(child)
+        if translate_keys:
+            tag = tag.replace('-', '_')
+        value = zapi_to_dict(child, translate_keys)
+        if tag not in out:
+            out[tag] = value
+        elif isinstance(out[tag], list):
+            out[tag].append(value)
+        else:
+            out[tag] = [out[tag], value]
+    if text:
+        out['#text'] = text
+    return out
 
 
 def main():
@@ -1748,6 +1895,9 @@ def main():
         use_native_zapi_tags=dict(type='bool', required=False, default=False),
         continue_on_error=dict(type='list', required=False, elements='str', default=['never']),
         query=dict(type='dict', required=False),
+        max_concurrency=dict(type='int', default=1, required=False),
+        output_format=dict(type='str', choices=['dict', 'columnar'], default='dict', required=False),
+        output_file=dict(type='path', required=False),
     ))
 
     module = AnsibleModule(
@@ -1757,10 +1907,6 @@ def main():
 
     if not HAS_NETAPP_LIB:
         module.fail_json(msg="the python NetApp-Lib module is required")
-    if not HAS_XMLTODICT:
-        module.fail_json(msg="the python xmltodict module is required")
-    if not HAS_JSON:
-        module.fail_json(msg="the python json module is required")
 
     gather_subset = module.params['gather_subset']
     summary = module.params['summary']
@@ -1771,7 +1917,10 @@ def main():
     gf_all = gf_obj.get_all(gather_subset)
     if summary:
         gf_all = gf_obj.get_summary(gf_all)
+    gf_all = gf_obj.format_output(gf_all)
     results = {'changed': False}
+    if module.params['output_file']:
+        results['output_file'] = module.params['output_file']
     if module.params['state'] is not None:
         results['state'] = module.params['state']
         results['warnings'] = "option 'state' is deprecated."
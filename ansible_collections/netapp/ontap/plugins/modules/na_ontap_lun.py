@@ -407,40 +407,43 @@ class NetAppOntapLUN(object):
 
     def get_luns(self, lun_path=None):
         """
-        Return list of LUNs matching vserver and volume names.
+        Return list of LUNs matching vserver and volume names, or matching lun_path.
 
         :return: list of LUNs in XML format.
         :rtype: list
         """
         luns = []
-        tag = None
         if lun_path is None and self.parameters.get('flexvol_name') is None:
             return luns
 
-        query_details = netapp_utils.zapi.NaElement('lun-info')
-        query_details.add_new_child('vserver', self.parameters['vserver'])
+        query_details = {'vserver': self.parameters['vserver']}
         if lun_path is not None:
-            query_details.add_new_child('lun_path', lun_path)
+            query_details['path'] = lun_path
         else:
-            query_details.add_new_child('volume', self.parameters['flexvol_name'])
-        query = netapp_utils.zapi.NaElement('query')
-        query.add_child_elem(query_details)
-
-        while True:
-            lun_info = netapp_utils.zapi.NaElement('lun-get-iter')
-            lun_info.add_child_elem(query)
-            if tag:
-                lun_info.add_new_child('tag', tag, True)
-
-            result = self.server.invoke_successfully(lun_info, True)
-            if result.get_child_by_name('num-records') and int(result.get_child_content('num-records')) >= 1:
-                attr_list = result.get_child_by_name('attributes-list')
-                luns.extend(attr_list.get_children())
-            tag = result.get_child_content('next-tag')
-            if tag is None:
-                break
+            query_details['volume'] = self.parameters['flexvol_name']
+        query = {'query': {'lun-info': query_details}}
+        try:
+            luns.extend(netapp_utils.iter_zapi_records(self.server, 'lun-get-iter', query))
+        except netapp_utils.zapi.NaApiError as exc:
+            self.module.fail_json(msg="Error getting LUN info for %s: %s" % (lun_path or self.parameters['flexvol_name'], to_native(exc)),
+                                  exception=traceback.format_exc())
         return luns
 
+    def get_lun_maps(self, path):
+        """
+        Return the igroups and LUN ids for a LUN, with a lun-map-get-iter query
+
+        :return: list of (igroup, lun_id)
+        :rtype: list
+        """
+        query = {'query': {'lun-map-info': {'path': path, 'vserver': self.parameters['vserver']}}}
+        try:
+            return [(lun_map.get_child_content('initiator-group'), lun_map.get_child_content('lun-id'))
+                    for lun_map in netapp_utils.iter_zapi_records(self.server, 'lun-map-get-iter', query)]
+        except netapp_utils.zapi.NaApiError as exc:
+            self.module.fail_json(msg="Error getting LUN maps for %s: %s" % (path, to_native(exc)),
+                                  exception=traceback.format_exc())
+
     def get_lun_details(self, lun):
         """
         Extract LUN details, from XML to python dict
@@ -477,17 +480,10 @@ class NetAppOntapLUN(object):
         attached_to = None
         lun_id = None
         if lun.get_child_content('mapped') == 'true':
-            lun_map_list = netapp_utils.zapi.NaElement.create_node_with_children(
-                'lun-map-list-info', **{'path': lun.get_child_content('path')})
-            result = self.server.invoke_successfully(
-                lun_map_list, enable_tunneling=True)
-            igroups = result.get_child_by_name('initiator-groups')
-            if igroups:
-                for igroup_info in igroups.get_children():
-                    igroup = igroup_info.get_child_content(
-                        'initiator-group-name')
-                    attached_to = igroup
-                    lun_id = igroup_info.get_child_content('lun-id')
+            maps = self.get_lun_maps(lun.get_child_content('path'))
+            if maps:
+                # report the last map, when the LUN is mapped to several igroups
+                attached_to, lun_id = maps[-1]
 
         return_value.update({
             'attached_to': attached_to,
@@ -515,15 +511,36 @@ class NetAppOntapLUN(object):
                     return lun
         return None
 
+    def get_lun_path_query(self, name):
+        """
+        Return a query on the path of a LUN, matching the LUN by name at the root of the volume or in a qtree,
+        or the name if it is already a path
+
+        :return: query on LUN path, or None if flexvol_name is not set
+        :rtype: str
+        """
+        if name.startswith('/'):
+            return name
+        if self.parameters.get('flexvol_name') is not None:
+            volume_path = '/vol/%s' % self.parameters['flexvol_name']
+            return '%s/%s|%s/*/%s' % (volume_path, name, volume_path, name)
+        return None
+
     def get_lun(self, name, lun_path=None):
         """
         Return details about the LUN
+        The LUN is looked up with a single query on its path, or on a path pattern to match a LUN in a qtree by name.
 
         :return: Details about the lun
         :rtype: dict
         """
-        luns = self.get_luns(lun_path)
-        lun = self.find_lun(luns, name, lun_path)
+        if lun_path is None:
+            query_path = self.get_lun_path_query(name)
+            if query_path is None:
+                return None
+        else:
+            query_path = lun_path
+        lun = self.find_lun(self.get_luns(query_path), name, lun_path)
         if lun is not None:
             return self.get_lun_details(lun)
         return None
@@ -179,12 +179,12 @@ RETURN = """
 
 """
 
-import time
 import traceback
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -262,6 +262,17 @@ class NetAppONTAPQuotas(object):
             return result['status']
         return None
 
+    def wait_for_quota_status(self, expected, timeout=60):
+        """
+        Wait until quota status switches to the expected value.
+        If it does not, the next quota-on or quota-off request reports the error.
+        """
+        def get_status():
+            status = self.get_quota_status()
+            return status, status == expected, None
+
+        Poller(timeout, max_interval=10).poll(get_status)
+
     def get_quotas(self):
         """
         Get quota details
@@ -269,29 +280,19 @@ class NetAppONTAPQuotas(object):
         """
         if self.parameters.get('type') is None:
             return None
-        quota_get = netapp_utils.zapi.NaElement('quota-list-entries-iter')
-        query = {
-            'query': {
-                'quota-entry': {
-                    'volume': self.parameters['volume'],
-                    'quota-target': self.parameters['quota_target'],
-                    'quota-type': self.parameters['type'],
-                    'vserver': self.parameters['vserver']
-                }
-            }
+        entry_query = {
+            'volume': self.parameters['volume'],
+            'quota-target': self.parameters['quota_target'],
+            'quota-type': self.parameters['type'],
+            'vserver': self.parameters['vserver']
         }
-        quota_get.translate_struct(query)
         if self.parameters.get('policy'):
-            quota_get['query']['quota-entry'].add_new_child('policy', self.parameters['policy'])
+            entry_query['policy'] = self.parameters['policy']
         try:
-            result = self.server.invoke_successfully(quota_get, enable_tunneling=True)
-        except netapp_utils.zapi.NaApiError as error:
-            self.module.fail_json(msg='Error fetching quotas info: %s' % to_native(error),
-                                  exception=traceback.format_exc())
-        if result.get_child_by_name('num-records') and int(result.get_child_content('num-records')) >= 1:
             # if quota-target is '*', the query treats it as a wildcard. But a blank entry is represented as '*'.
-            # Hence the need to loop through all records to find a match.
-            for quota_entry in result.get_child_by_name('attributes-list').get_children():
+            # Hence the need to loop through all records, on all pages, to find a match.
+            for quota_entry in netapp_utils.iter_zapi_records(self.server, 'quota-list-entries-iter',
+                                                              {'query': {'quota-entry': entry_query}}):
                 quota_target = quota_entry.get_child_content('quota-target')
                 if quota_target == self.parameters['quota_target']:
                     return_values = {'volume': quota_entry.get_child_content('volume'),
@@ -304,6 +305,9 @@ class NetAppONTAPQuotas(object):
                     if value is not None:
                         return_values['perform_user_mapping'] = self.na_helper.get_value_for_bool(True, value)
                     return return_values
+        except netapp_utils.zapi.NaApiError as error:
+            self.module.fail_json(msg='Error fetching quotas info: %s' % to_native(error),
+                                  exception=traceback.format_exc())
         return None
 
     def quota_entry_set(self):
@@ -460,7 +464,7 @@ class NetAppONTAPQuotas(object):
                     self.resize_quota()
                 elif modify_quota_status == 'reinitialize':
                     self.on_or_off_quota('quota-off')
-                    time.sleep(10)  # status switch interval
+                    self.wait_for_quota_status('off')
                     self.on_or_off_quota('quota-on')
 
         self.module.exit_json(changed=self.na_helper.changed)
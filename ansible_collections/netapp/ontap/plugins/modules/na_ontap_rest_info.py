@@ -118,6 +118,139 @@ options:
         - Allows for any rest option to be passed in
         type: dict
         version_added: '20.7.0'
+    max_concurrency:
+        description:
+        - Maximum number of subsets gathered in parallel, using separate REST calls.
+        - By default, subsets are gathered one after the other.
+        type: int
+        default: 1
+        version_added: '21.3.0'
+    query:
+        description:
+        - Query parameters for one or more subsets, to filter records on the cluster rather than in the playbook.
+        - A dictionary indexed by subset, using the info name or the REST API.  Each value is a dictionary of
+          REST query parameters, passed as is, eg C(svm.name) or C(state).
+        - If C(max_records) is present for a subset, the number of records returned for this subset is limited
+          to this value, across pages.
+        - These parameters take precedence over C(parameters) for this subset.
+        type: dict
+        version_added: '21.3.0'
+    subset_fields:
+        description:
+        - Fields to return for one or more subsets.
+        - A dictionary indexed by subset, using the info name or the REST API.  Each value is a list of fields.
+        - Unlike C(fields), this option is compatible with several subsets, and takes precedence over C(fields) for these subsets.
+        type: dict
+        version_added: '21.3.0'
+    hostname:
+        description:
+        - The hostname or IP address of the ONTAP instance.
+        - Required, unless C(hosts) is set.
+        type: str
+    hosts:
+        description:
+        - Gather the same subsets from several clusters, concurrently, in a single task.
+        - Each entry requires a C(hostname), other connection options default to the module options.
+        - C(ontap_info) is then a dictionary indexed by hostname, and errors are reported per cluster in C(host_errors),
+          rather than failing the module.  The module only fails if no information could be gathered from any cluster.
+        - Mutually exclusive with C(hostname).
+        type: list
+        elements: dict
+        suboptions:
+            hostname:
+                description:
+                - The hostname or IP address of the ONTAP instance.
+                type: str
+                required: true
+            username:
+                description:
+                - User name for this cluster.
+                type: str
+                aliases: [ user ]
+            password:
+                description:
+                - Password for this cluster.
+                type: str
+                aliases: [ pass ]
+            http_port:
+                description:
+                - Port for this cluster.
+                type: int
+            validate_certs:
+                description:
+                - Whether to validate the SSL certificate of this cluster.
+                type: bool
+            cert_filepath:
+                description:
+                - Path to a SSL client cert file for this cluster.
+                type: str
+            key_filepath:
+                description:
+                - Path to a SSL client key file for this cluster.
+                type: str
+        version_added: '21.3.0'
+    max_hosts_concurrency:
+        description:
+        - Maximum number of clusters queried in parallel when C(hosts) is set.
+        - C(max_concurrency) still applies to the subsets gathered for each cluster.
+        type: int
+        default: 10
+        version_added: '21.3.0'
+    host_timeout:
+        description:
+        - Time budget in seconds to gather information from a cluster.
+        - Each REST call is limited to this duration, and no new call is issued for a cluster once the duration has elapsed.
+        - By default, each REST call is limited to 60 seconds, and there is no global limit.
+        type: int
+        version_added: '21.3.0'
+    incremental:
+        description:
+        - Keep a local snapshot of gathered records, per cluster and subset, and report changes since the previous run
+          in C(ontap_info_delta), as lists of C(added), C(removed), and C(changed) records for each subset.
+        - C(ontap_info) still reports all the records.
+        - For C(support/ems/events), only events with a higher C(index) than the snapshot are requested, and merged with
+          the snapshot.  Removed events are only detected on a full refresh.
+        - Other subsets are fully read, as ONTAP does not report a modification time for most objects.
+          Records are matched using C(uuid) when present, or their whole content.
+        - The snapshot is ignored if C(query), C(fields), C(subset_fields), or C(parameters) change.
+        - The snapshot is not updated in check mode.
+        type: dict
+        suboptions:
+            path:
+                description:
+                - Directory where snapshots are stored, in a JSON file per cluster, only readable by the current user.
+                type: path
+                required: true
+            full_refresh:
+                description:
+                - Maximum age in seconds of a snapshot before all records are read again.
+                type: int
+                default: 86400
+        version_added: '21.3.0'
+    output_format:
+        description:
+        - With C(dict), records are reported as a list of dictionaries, as returned by ONTAP.
+        - With C(columnar), records for each subset are replaced with C(fields), the list of fields with nested fields
+          joined with a dot, eg C(svm.name), and C(columns), a list of values for each field.  A column of strings with
+          repeated values is reported as a dictionary with C(dictionary), the list of unique values, and C(indices).
+        - Ignored when C(output_file) is set.
+        type: str
+        choices: ['dict', 'columnar']
+        default: 'dict'
+        version_added: '21.3.0'
+    output_file:
+        description:
+        - Write gathered information to this local file, as JSON lines, rather than returning it in C(ontap_info).
+        - Each line is a dictionary with C(subset), and C(record) for each record, or C(info) for a subset without records.
+          C(hostname) is added when C(hosts) is set.
+        - Records are written as each page is received, and are not kept in memory.  With C(max_concurrency) or C(hosts),
+          pages for different subsets or clusters may be interleaved.  Lines already written for a cluster in C(hosts) are kept
+          if the cluster fails later on.
+        - With C(incremental), records for a subset are kept until the subset is complete, as they update the local snapshot.
+        - The file is gzip compressed if the name ends with C(.gz).
+        - C(ontap_info) only reports the number of records for each subset.
+        type: path
+        version_added: '21.3.0'
 '''
 
 EXAMPLES = '''
@@ -179,12 +312,154 @@ EXAMPLES = '''
       use_rest: Always
       gather_subset:
       - aggregate_info
+- name: run ONTAP gather facts for all subsets, using up to 8 parallel REST calls
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      max_concurrency: 8
+      gather_subset:
+      - all
+- name: run ONTAP gather facts for offline volumes in a SVM, and aggregate names
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      gather_subset:
+      - aggregate_info
+      - volume_info
+      query:
+        volume_info:
+          svm.name: svm1
+          state: offline
+          max_records: 100
+      subset_fields:
+        aggregate_info:
+        - name
+        volume_info:
+        - name
+        - state
+- name: run ONTAP gather facts for volume info on several clusters, in a single task
+  na_ontap_info_rest:
+      hosts:
+      - hostname: "1.2.3.4"
+      - hostname: "1.2.3.5"
+        username: "otheruser"
+        password: "other-password"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      max_hosts_concurrency: 20
+      host_timeout: 120
+      gather_subset:
+      - volume_info
+- name: report EMS events and volumes changes since the previous run
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      gather_subset:
+      - support_ems_events
+      - volume_info
+      incremental:
+        path: ~/.netapp/ontap_info
+- name: write all volumes to a local file, rather than returning them
+  na_ontap_info_rest:
+      hostname: "1.2.3.4"
+      username: "testuser"
+      password: "test-password"
+      https: true
+      validate_certs: false
+      use_rest: Always
+      gather_subset:
+      - volume_info
+      output_file: /tmp/{{ inventory_hostname }}_volumes.json.gz
 '''
 
+import time
+
 from ansible.module_utils.basic import AnsibleModule
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp import OntapRestAPI
+from ansible_collections.netapp.ontap.plugins.module_utils import info_output
+from ansible_collections.netapp.ontap.plugins.module_utils import info_snapshot
+from ansible_collections.netapp.ontap.plugins.module_utils import rest_pagination
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import run_tasks, task_worker
+
+INFO_TO_REST_MAPPING = {
+    "aggregate_info": "storage/aggregates",
+    "application_info": "application/applications",
+    "application_template_info": "application/templates",
+    "autosupport_config_info": "support/autosupport",
+    "autosupport_messages_history": "support/autosupport/messages",
+    "broadcast_domains_info": "network/ethernet/broadcast-domains",
+    "cifs_home_directory_info": "protocols/cifs/home-directory/search-paths",
+    "cifs_services_info": "protocols/cifs/services",
+    "cifs_share_info": "protocols/cifs/shares",
+    "cloud_targets_info": "cloud/targets",
+    "cluster_chassis_info": "cluster/chassis",
+    "cluster_jobs_info": "cluster/jobs",
+    "cluster_metrocluster_diagnostics": "cluster/metrocluster/diagnostics",
+    "cluster_metrics_info": "cluster/metrics",
+    "cluster_node_info": "cluster/nodes",
+    "cluster_peer_info": "cluster/peers",
+    "cluster_schedules": "cluster/schedules",
+    "cluster_software_download": "cluster/software/download",
+    "cluster_software_history": "cluster/software/history",
+    "cluster_software_packages": "cluster/software/packages",
+    "disk_info": "storage/disks",
+    "event_notification_info": "support/ems/destinations",
+    "event_notification_destination_info": "support/ems/destinations",
+    "initiator_groups_info": "protocols/san/igroups",
+    "ip_interfaces_info": "network/ip/interfaces",
+    "ip_routes_info": "network/ip/routes",
+    "ip_service_policies": "network/ip/service-policies",
+    "network_ipspaces_info": "network/ipspaces",
+    "network_ports_info": "network/ethernet/ports",
+    "ontap_system_version": "cluster/software",
+    "san_fc_logins_info": "network/fc/logins",
+    "san_fc_wppn-aliases": "network/fc/wwpn-aliases",
+    "san_fcp_services": "protocols/san/fcp/services",
+    "san_iscsi_credentials": "protocols/san/iscsi/credentials",
+    "san_iscsi_services": "protocols/san/iscsi/services",
+    "san_lun_maps": "protocols/san/lun-maps",
+    "security_login_info": "security/accounts",
+    "security_login_rest_role_info": "security/roles",
+    "storage_flexcaches_info": "storage/flexcache/flexcaches",
+    "storage_flexcaches_origin_info": "storage/flexcache/origins",
+    "storage_luns_info": "storage/luns",
+    "storage_NVMe_namespaces": "storage/namespaces",
+    "storage_ports_info": "storage/ports",
+    "storage_qos_policies": "storage/qos/policies",
+    "storage_qtrees_config": "storage/qtrees",
+    "storage_quota_reports": "storage/quota/reports",
+    "storage_quota_policy_rules": "storage/quota/rules",
+    "storage_shelves_config": "storage/shelves",
+    "storage_snapshot_policies": "storage/snapshot-policies",
+    "support_ems_config": "support/ems",
+    "support_ems_events": "support/ems/events",
+    "support_ems_filters": "support/ems/filters",
+    "svm_dns_config_info": "name-services/dns",
+    "svm_ldap_config_info": "name-services/ldap",
+    "svm_name_mapping_config_info": "name-services/name-mappings",
+    "svm_nis_config_info": "name-services/nis",
+    "svm_peers_info": "svm/peers",
+    "svm_peer-permissions_info": "svm/peer-permissions",
+    "vserver_info": "svm/svms",
+    "volume_info": "storage/volumes"
+}
 
 
 class NetAppONTAPGatherInfo(object):
@@ -201,11 +476,34 @@ class NetAppONTAPGatherInfo(object):
             gather_subset=dict(default=['all'], type='list', elements='str', required=False),
             max_records=dict(type='int', default=1024, required=False),
             fields=dict(type='list', elements='str', required=False),
-            parameters=dict(type='dict', required=False)
+            parameters=dict(type='dict', required=False),
+            max_concurrency=dict(type='int', default=1, required=False),
+            query=dict(type='dict', required=False),
+            subset_fields=dict(type='dict', required=False),
+            hosts=dict(type='list', elements='dict', required=False, options=dict(
+                hostname=dict(required=True, type='str'),
+                username=dict(required=False, type='str', aliases=['user']),
+                password=dict(required=False, type='str', aliases=['pass'], no_log=True),
+                http_port=dict(required=False, type='int'),
+                validate_certs=dict(required=False, type='bool'),
+                cert_filepath=dict(required=False, type='str'),
+                key_filepath=dict(required=False, type='str'),
+            )),
+            max_hosts_concurrency=dict(type='int', default=10, required=False),
+            host_timeout=dict(type='int', required=False),
+            incremental=dict(type='dict', required=False, options=dict(
+                path=dict(required=True, type='path'),
+                full_refresh=dict(required=False, type='int', default=86400),
+            )),
+            output_format=dict(type='str', choices=['dict', 'columnar'], default='dict', required=False),
+            output_file=dict(type='path', required=False),
         ))
+        self.argument_spec['hostname']['required'] = False
 
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
+            mutually_exclusive=[('hostname', 'hosts')],
+            required_one_of=[('hostname', 'hosts')],
             supports_check_mode=True
         )
 
@@ -213,8 +511,33 @@ class NetAppONTAPGatherInfo(object):
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.set_parameters(self.module.params)
         self.fields = list()
+        self.deadline = None
+        # with output_file, records are written as they are received
+        self.writer = None
+        self.output_line = dict()
 
-        self.rest_api = OntapRestAPI(self.module)
+        self.rest_api = None
+        if self.parameters.get('hostname') is not None:
+            self.rest_api = self.create_rest_api()
+
+    def create_rest_api(self, host_params=None):
+        """
+            Create a REST connection, to hostname, or to a cluster in hosts
+            Start the time budget for this cluster, if host_timeout is set
+        """
+        timeout = self.parameters.get('host_timeout')
+        if timeout is not None:
+            self.deadline = time.time() + timeout
+            return OntapRestAPI(self.module, timeout=timeout, host_params=host_params)
+        return OntapRestAPI(self.module, host_params=host_params)
+
+    def check_deadline(self):
+        """
+            Fail if the time budget for this cluster is exhausted
+        """
+        if self.deadline is not None and time.time() > self.deadline:
+            self.module.fail_json(msg="Error: host_timeout: no response from %s in %d seconds."
+                                  % (self.rest_api.hostname, self.parameters['host_timeout']))
 
     def validate_ontap_version(self):
         """
@@ -231,10 +554,15 @@ class NetAppONTAPGatherInfo(object):
 
         return ontap_version
 
-    def get_subset_info(self, gather_subset_info):
+    def get_subset_info(self, gather_subset_info, query=None, fields=None, output=None):
         """
             Gather ONTAP information for the given subset using REST APIs
             Input for REST APIs call : (api, data)
+            query: optional dict of query parameters for this subset, max_records limits the total number of records
+            fields: optional list of fields for this subset, overriding the fields option
+            output: optional dict of keys identifying the subset in output_file, records in each page are written
+                    to output_file as soon as the page is received, and are not kept in gathered_ontap_info
+            Follow next links to get all the records, the next page is requested while the current page is processed
             return gathered_ontap_info
         """
 
@@ -242,28 +570,62 @@ class NetAppONTAPGatherInfo(object):
         if gather_subset_info.pop('post', False):
             self.run_post(gather_subset_info)
         data = {'max_records': self.parameters['max_records'], 'fields': self.fields}
+        if fields is not None:
+            data['fields'] = ','.join(fields)
         # allow for passing in any additional rest api fields
         if self.parameters.get('parameters'):
             for each in self.parameters['parameters']:
                 data[each] = self.parameters['parameters'][each]
+        max_records = None
+        if query:
+            data.update(query)
+            max_records = query.get('max_records')
 
-        gathered_ontap_info, error = self.rest_api.get(api, data)
-
-        if error:
-            # Fail the module if error occurs from REST APIs call
-            if int(error.get('code', 0)) == 6:
-                self.module.fail_json(msg="%s user is not authorized to make %s api call" % (self.parameters.get('username'), api))
-            # if Aggr recommender can't make a recommendation it will fail with the following error code.
-            # We don't want to fail
-            elif int(error.get('code', 0)) == 19726344 and "No recommendation can be made for this cluster" in error.get('message'):
-                return error.get('message')
-            # If the API doesn't exist (using an older system) we don't want to fail
-            elif int(error.get('code', 0)) == 3:
-                return error.get('message')
-            else:
+        gathered_ontap_info = None
+        num_records = 0
+        self.check_deadline()
+        # no need to prefetch the next page when the first page may be the only one used
+        for page, error in rest_pagination.iter_pages(self.rest_api, api, data, prefetch=max_records is None):
+            self.check_deadline()
+            if error and gathered_ontap_info is None:
+                return self.check_for_subset_error(api, error)
+            if error:
                 self.module.fail_json(msg=error)
+            records = page.get('records') if isinstance(page, dict) else None
+            if isinstance(records, list):
+                if max_records is not None:
+                    del records[int(max_records) - num_records:]
+                num_records += len(records)
+                if output is not None:
+                    self.write_output(dict(output, record=record) for record in records)
+                    page['records'] = list()
+            gathered_ontap_info = rest_pagination.merge_page(gathered_ontap_info, page)
+            if max_records is not None and num_records >= int(max_records):
+                break
+
+        # metrocluster doesn't have a records field, so we need to skip this
+        if isinstance(gathered_ontap_info, dict) and gathered_ontap_info.get('records') is not None:
+            # Getting total number of records
+            gathered_ontap_info['num_records'] = num_records
+
+        return gathered_ontap_info
+
+    def check_for_subset_error(self, api, error):
+        """
+            Fail the module if error occurs from REST APIs call, unless the error is expected
+            return error message for expected errors
+        """
+        if int(error.get('code', 0)) == 6:
+            self.module.fail_json(msg="%s user is not authorized to make %s api call" % (self.parameters.get('username'), api))
+        # if Aggr recommender can't make a recommendation it will fail with the following error code.
+        # We don't want to fail
+        elif int(error.get('code', 0)) == 19726344 and "No recommendation can be made for this cluster" in error.get('message'):
+            return error.get('message')
+        # If the API doesn't exist (using an older system) we don't want to fail
+        elif int(error.get('code', 0)) == 3:
+            return error.get('message')
         else:
-            return gathered_ontap_info
+            self.module.fail_json(msg=error)
 
         return None
 
@@ -276,108 +638,219 @@ class NetAppONTAPGatherInfo(object):
         if error:
             self.module.fail_json(msg="%s" % error)
 
-    def get_next_records(self, api):
-        """
-            Gather next set of ONTAP information for the specified api
-            Input for REST APIs call : (api, data)
-            return gather_subset_info
-        """
-
-        data = {}
-        gather_subset_info, error = self.rest_api.get(api, data)
-
-        if error:
-            self.module.fail_json(msg=error)
-
-        return gather_subset_info
-
     def convert_subsets(self):
         """
         Convert an info to the REST API
         """
-        info_to_rest_mapping = {
-            "aggregate_info": "storage/aggregates",
-            "application_info": "application/applications",
-            "application_template_info": "application/templates",
-            "autosupport_config_info": "support/autosupport",
-            "autosupport_messages_history": "support/autosupport/messages",
-            "broadcast_domains_info": "network/ethernet/broadcast-domains",
-            "cifs_home_directory_info": "protocols/cifs/home-directory/search-paths",
-            "cifs_services_info": "protocols/cifs/services",
-            "cifs_share_info": "protocols/cifs/shares",
-            "cloud_targets_info": "cloud/targets",
-            "cluster_chassis_info": "cluster/chassis",
-            "cluster_jobs_info": "cluster/jobs",
-            "cluster_metrocluster_diagnostics": "cluster/metrocluster/diagnostics",
-            "cluster_metrics_info": "cluster/metrics",
-            "cluster_node_info": "cluster/nodes",
-            "cluster_peer_info": "cluster/peers",
-            "cluster_schedules": "cluster/schedules",
-            "cluster_software_download": "cluster/software/download",
-            "cluster_software_history": "cluster/software/history",
-            "cluster_software_packages": "cluster/software/packages",
-            "disk_info": "storage/disks",
-            "event_notification_info": "support/ems/destinations",
-            "event_notification_destination_info": "support/ems/destinations",
-            "initiator_groups_info": "protocols/san/igroups",
-            "ip_interfaces_info": "network/ip/interfaces",
-            "ip_routes_info": "network/ip/routes",
-            "ip_service_policies": "network/ip/service-policies",
-            "network_ipspaces_info": "network/ipspaces",
-            "network_ports_info": "network/ethernet/ports",
-            "ontap_system_version": "cluster/software",
-            "san_fc_logins_info": "network/fc/logins",
-            "san_fc_wppn-aliases": "network/fc/wwpn-aliases",
-            "san_fcp_services": "protocols/san/fcp/services",
-            "san_iscsi_credentials": "protocols/san/iscsi/credentials",
-            "san_iscsi_services": "protocols/san/iscsi/services",
-            "san_lun_maps": "protocols/san/lun-maps",
-            "security_login_info": "security/accounts",
-            "security_login_rest_role_info": "security/roles",
-            "storage_flexcaches_info": "storage/flexcache/flexcaches",
-            "storage_flexcaches_origin_info": "storage/flexcache/origins",
-            "storage_luns_info": "storage/luns",
-            "storage_NVMe_namespaces": "storage/namespaces",
-            "storage_ports_info": "storage/ports",
-            "storage_qos_policies": "storage/qos/policies",
-            "storage_qtrees_config": "storage/qtrees",
-            "storage_quota_reports": "storage/quota/reports",
-            "storage_quota_policy_rules": "storage/quota/rules",
-            "storage_shelves_config": "storage/shelves",
-            "storage_snapshot_policies": "storage/snapshot-policies",
-            "support_ems_config": "support/ems",
-            "support_ems_events": "support/ems/events",
-            "support_ems_filters": "support/ems/filters",
-            "svm_dns_config_info": "name-services/dns",
-            "svm_ldap_config_info": "name-services/ldap",
-            "svm_name_mapping_config_info": "name-services/name-mappings",
-            "svm_nis_config_info": "name-services/nis",
-            "svm_peers_info": "svm/peers",
-            "svm_peer-permissions_info": "svm/peer-permissions",
-            "vserver_info": "svm/svms",
-            "volume_info": "storage/volumes"
-        }
         # Add rest API names as there info version, also make sure we don't add a duplicate
         subsets = []
         for subset in self.parameters['gather_subset']:
-            if subset in info_to_rest_mapping:
-                if info_to_rest_mapping[subset] not in subsets:
-                    subsets.append(info_to_rest_mapping[subset])
+            if subset in INFO_TO_REST_MAPPING:
+                if INFO_TO_REST_MAPPING[subset] not in subsets:
+                    subsets.append(INFO_TO_REST_MAPPING[subset])
             else:
                 if subset not in subsets:
                     subsets.append(subset)
         return subsets
 
-    def apply(self):
+    def get_options_per_subset(self, option, subsets):
         """
-        Perform pre-checks, call functions and exit
+        Index the values of a per subset option by REST API
+        Fail if a subset is not gathered, as the option would be silently ignored
         """
+        options = dict()
+        for subset, value in (self.parameters.get(option) or dict()).items():
+            api = INFO_TO_REST_MAPPING.get(subset, subset)
+            if api not in subsets:
+                self.module.fail_json(msg="Error: %s: subset %s is not present in gather_subset: %s" % (option, subset, subsets))
+            if option == 'subset_fields' and not isinstance(value, list):
+                value = [value]
+            if option == 'query' and not isinstance(value, dict):
+                self.module.fail_json(msg="Error: query: expecting a dictionary of query parameters for %s, got: %s" % (subset, value))
+            options[api] = value
+        return options
 
-        result_message = dict()
+    def get_subset_delta(self, snapshot, subset, gather_subset_info, query=None, fields=None):
+        """
+            Gather ONTAP information for the given subset, and compare it with the local snapshot
+            When records are only added, only records newer than the snapshot are requested, and merged with the snapshot
+            return gathered_ontap_info, including all records, and the delta, or None if the subset has no records
+        """
+        change_field = info_snapshot.CHANGE_FILTERS.get(subset)
+        key_field = info_snapshot.RECORD_KEYS.get(subset, info_snapshot.DEFAULT_RECORD_KEY)
+        if fields is None and self.fields and self.fields != '*':
+            fields = self.fields.split(',')
+        if change_field is not None and fields is not None and '*' not in fields and change_field not in fields:
+            # the field is needed to filter records on the next run
+            fields = fields + [change_field]
+        snapshot_query = dict(query=query, fields=fields, parameters=self.parameters.get('parameters'))
+        previous, full_read = snapshot.get(subset, snapshot_query)
+        mark = None
+        if previous is not None and change_field is not None:
+            mark = info_snapshot.get_high_water_mark(previous, change_field)
+            if mark is not None:
+                query = dict(query or dict())
+                query[change_field] = '>%s' % mark
+
+        gathered_ontap_info = self.get_subset_info(gather_subset_info, query, fields)
+        if not isinstance(gathered_ontap_info, dict) or not isinstance(gathered_ontap_info.get('records'), list):
+            return gathered_ontap_info, None
+
+        if mark is not None:
+            records, delta = info_snapshot.merge_records(previous, gathered_ontap_info['records'], key_field)
+        else:
+            records = gathered_ontap_info['records']
+            delta = info_snapshot.compute_delta(previous or list(), records, key_field)
+            full_read = None
+        gathered_ontap_info['records'] = records
+        gathered_ontap_info['num_records'] = len(records)
+        if not self.module.check_mode:
+            snapshot.set(subset, snapshot_query, records, full_read)
+        return gathered_ontap_info, delta
 
+    def gather_info(self, subsets):
+        """
+            Gather ONTAP information for a list of subsets, with up to max_concurrency subsets in parallel
+            subsets: list of (subset, kwargs for get_subset_info)
+            return a dict of gathered information, indexed by subset
+                   and a dict of deltas indexed by subset, or None if incremental is not set
+        """
         # Validating ONTAP version
         self.validate_ontap_version()
 
+        snapshot = None
+        if self.parameters.get('incremental'):
+            cluster = self.rest_api.hostname
+            if self.rest_api.params.get('http_port') is not None:
+                cluster += ':%d' % self.rest_api.params['http_port']
+            snapshot = info_snapshot.InfoSnapshot(self.parameters['incremental']['path'], cluster,
+                                                  self.parameters['incremental']['full_refresh'])
+
+        # get_subset_info updates gather_subset_info, so that a POST is only run once
+        worker = task_worker(self)
+        tasks = list()
+        for subset, kwargs in subsets:
+            kwargs = dict(kwargs, gather_subset_info=dict(kwargs['gather_subset_info']))
+            if snapshot is None:
+                if self.writer is not None:
+                    kwargs['output'] = dict(self.output_line, subset=subset)
+                tasks.append((subset, worker.get_subset_info, kwargs))
+            else:
+                tasks.append((subset, worker.get_subset_delta, dict(kwargs, snapshot=snapshot, subset=subset)))
+        info = run_tasks(self.module, tasks, self.parameters['max_concurrency'])
+        deltas = None
+        if snapshot is not None:
+            # the snapshot is saved once, as subsets may be gathered in parallel
+            if not self.module.check_mode:
+                error = snapshot.save()
+                if error:
+                    self.module.warn(error)
+            deltas = dict((subset, delta) for subset, (dummy, delta) in info.items() if delta is not None)
+            info = dict((subset, subset_info) for subset, (subset_info, dummy) in info.items())
+        if self.writer is not None:
+            info = dict((subset, self.write_subset(dict(self.output_line, subset=subset), subset_info)) for subset, subset_info in info.items())
+        return info, deltas
+
+    def gather_host_info(self, host, subsets):
+        """
+            Gather ONTAP information from a cluster in hosts, using a separate connection
+            return a dict of gathered information, indexed by subset, and a dict of deltas or None
+        """
+        gatherer = task_worker(self)
+        gatherer.rest_api = gatherer.create_rest_api(host)
+        gatherer.output_line = dict(hostname=host['hostname'])
+        return gatherer.gather_info(subsets)
+
+    def gather_hosts_info(self, subsets):
+        """
+            Gather ONTAP information from all clusters in hosts, with up to max_hosts_concurrency clusters in parallel
+            A failure for a cluster is recorded, and does not prevent gathering information from other clusters
+            return dicts of gathered information, deltas, and errors, indexed by hostname
+        """
+        hostnames = [host['hostname'] for host in self.parameters['hosts']]
+        duplicates = sorted(set(hostname for hostname in hostnames if hostnames.count(hostname) > 1))
+        if duplicates:
+            self.module.fail_json(msg="Error: hosts: duplicate hostname(s): %s" % duplicates)
+        tasks = [(host['hostname'], self.gather_host_info, dict(host=host, subsets=subsets)) for host in self.parameters['hosts']]
+        errors = dict()
+        results = run_tasks(self.module, tasks, self.parameters['max_hosts_concurrency'], errors=errors)
+        # report errors in hosts order, whatever the completion order
+        errors = dict((hostname, errors[hostname]) for hostname in hostnames if hostname in errors)
+        if not results:
+            self.module.fail_json(msg="Error: failed to gather information from all hosts: %s" % errors)
+        info = dict((hostname, host_info) for hostname, (host_info, dummy) in results.items())
+        deltas = None
+        if self.parameters.get('incremental'):
+            deltas = dict((hostname, host_deltas) for hostname, (dummy, host_deltas) in results.items())
+        return info, deltas, errors
+
+    @staticmethod
+    def has_records(subset_info):
+        return isinstance(subset_info, dict) and isinstance(subset_info.get('records'), list)
+
+    def to_columnar(self, ontap_info):
+        """
+            Replace records with fields and columns, for each subset with records
+        """
+        columnar_info = dict()
+        for subset, subset_info in ontap_info.items():
+            if self.has_records(subset_info):
+                columnar = dict((key, value) for key, value in subset_info.items() if key not in ('records', 'num_records', '_links'))
+                columnar.update(info_output.to_columnar(subset_info['records']))
+                subset_info = columnar
+            columnar_info[subset] = subset_info
+        return columnar_info
+
+    def open_output_file(self):
+        """
+            Open output_file, so that records can be written as they are received
+        """
+        self.writer = info_output.JsonLinesWriter(self.parameters['output_file'])
+        error = self.writer.open()
+        if error:
+            self.module.fail_json(msg=error)
+
+    def write_output(self, lines):
+        """
+            Write lines to output_file, as JSON lines
+        """
+        error = self.writer.write(lines)
+        if error:
+            self.module.fail_json(msg=error)
+
+    def write_subset(self, line, subset_info):
+        """
+            Write the records still present in subset_info to output_file, or subset_info for a subset without records
+            line: dict of keys identifying the subset
+            return a summary with the number of records
+        """
+        if self.has_records(subset_info):
+            self.write_output(dict(line, record=record) for record in subset_info['records'])
+            return dict(num_records=subset_info['num_records'])
+        self.write_output([dict(line, info=subset_info)])
+        return dict()
+
+    def format_output(self, ontap_info):
+        """
+            Apply output_file or output_format, return the information to report in ontap_info
+        """
+        if self.writer is not None:
+            # records were written as they were gathered, ontap_info is already a summary
+            error = self.writer.close()
+            if error:
+                self.module.fail_json(msg=error)
+            return ontap_info
+        if self.parameters['output_format'] == 'columnar':
+            if self.parameters.get('hosts'):
+                return dict((hostname, self.to_columnar(host_info)) for hostname, host_info in ontap_info.items())
+            return self.to_columnar(ontap_info)
+        return ontap_info
+
+    def apply(self):
+        """
+        Perform pre-checks, call functions and exit
+        """
+
         # Defining gather_subset and appropriate api_call
         get_ontap_subset_info = {
             'application/applications': {
@@ -575,6 +1048,10 @@ class NetAppONTAPGatherInfo(object):
                 self.module.fail_json(msg="Error: fields: %s, only one subset will be allowed." % self.parameters.get('fields'))
         converted_subsets = self.convert_subsets()
 
+        queries = self.get_options_per_subset('query', converted_subsets)
+        subset_fields = self.get_options_per_subset('subset_fields', converted_subsets)
+
+        subsets = list()
         for subset in converted_subsets:
             try:
                 # Verify whether the supported subset passed
@@ -582,26 +1059,23 @@ class NetAppONTAPGatherInfo(object):
             except KeyError:
                 self.module.fail_json(msg="Specified subset %s is not found, supported subsets are %s" %
                                       (subset, list(get_ontap_subset_info.keys())))
-
-            result_message[subset] = self.get_subset_info(specified_subset)
-
-            if result_message[subset] is not None:
-                if isinstance(result_message[subset], dict):
-                    while result_message[subset]['_links'].get('next'):
-                        # Get all the set of records if next link found in subset_info for the specified subset
-                        next_api = result_message[subset]['_links']['next']['href']
-                        gathered_subset_info = self.get_next_records(next_api.replace('/api', ''))
-
-                        # Update the subset info for the specified subset
-                        result_message[subset]['_links'] = gathered_subset_info['_links']
-                        result_message[subset]['records'].extend(gathered_subset_info['records'])
-
-                    # metrocluster doesn't have a records field, so we need to skip this
-                    if result_message[subset].get('records') is not None:
-                        # Getting total number of records
-                        result_message[subset]['num_records'] = len(result_message[subset]['records'])
+            subsets.append((subset, dict(gather_subset_info=specified_subset,
+                                         query=queries.get(subset),
+                                         fields=subset_fields.get(subset))))
 
         results = {'changed': False}
+        if self.parameters.get('output_file'):
+            self.open_output_file()
+        if self.parameters.get('hosts'):
+            result_message, deltas, results['host_errors'] = self.gather_hosts_info(subsets)
+        else:
+            result_message, deltas = self.gather_info(subsets)
+        if deltas is not None:
+            results['ontap_info_delta'] = deltas
+        result_message = self.format_output(result_message)
+        if self.parameters.get('output_file'):
+            results['output_file'] = self.parameters['output_file']
+
         if self.parameters.get('state') is not None:
             results['state'] = self.parameters['state']
             results['warnings'] = "option 'state' is deprecated."
@@ -96,7 +96,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
-import time
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -186,6 +186,11 @@ class NetAppOntapServiceProcessorNetwork(object):
             return sp_attr_info.get_child_content('setup-status')
         return None
 
+    def get_sp_network_state(self):
+        ''' poll function for Poller: return (status, done, error) '''
+        status = self.get_sp_network_status()
+        return status, status != 'in_progress', None
+
     def get_service_processor_network(self):
         """
         Return details about service processor network
@@ -249,10 +254,7 @@ class NetAppOntapServiceProcessorNetwork(object):
         try:
             self.server.invoke_successfully(sp_modify, enable_tunneling=True)
             if self.parameters.get('wait_for_completion'):
-                retries = 10
-                while self.get_sp_network_status() == 'in_progress' and retries > 0:
-                    time.sleep(10)
-                    retries = retries - 1
+                Poller(100, max_interval=10).poll(self.get_sp_network_state)
         except netapp_utils.zapi.NaApiError as error:
             self.module.fail_json(msg='Error modifying service processor network: %s' % (to_native(error)),
                                   exception=traceback.format_exc())
@@ -439,13 +439,13 @@ RETURN = """
 """
 
 import re
-import time
 import traceback
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_elementsw_module import NaElementSWModule
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 import ansible_collections.netapp.ontap.plugins.module_utils.rest_response_helpers as rrh
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
@@ -456,6 +456,12 @@ try:
 except ImportError:
     HAS_SF_SDK = False
 
+# attributes read by snapmirror_get, other attributes are not requested
+SNAPMIRROR_DESIRED_ATTRIBUTES = {
+    'snapmirror-info': ['current-transfer-type', 'is-healthy', 'last-transfer-error', 'max-transfer-rate', 'mirror-state', 'policy',
+                        'relationship-status', 'relationship-type', 'schedule', 'unhealthy-reason']
+}
+
 
 class NetAppONTAPSnapmirror(object):
     """
@@ -609,6 +615,7 @@ class NetAppONTAPSnapmirror(object):
         snapmirror_info.add_new_child('destination-location', destination)
         query.add_child_elem(snapmirror_info)
         snapmirror_get_iter.add_child_elem(query)
+        netapp_utils.add_desired_attributes(self.module, snapmirror_get_iter, SNAPMIRROR_DESIRED_ATTRIBUTES)
         return snapmirror_get_iter
 
     def snapmirror_get(self, destination=None):
@@ -646,15 +653,21 @@ class NetAppONTAPSnapmirror(object):
             return snap_info
         return None
 
+    def get_transfer_state(self):
+        ''' poll function for Poller: return (status, done, error)
+            done when the relationship is gone or not transferring, transient states such as aborting are not terminal
+        '''
+        current = self.snapmirror_get()
+        if current is None:
+            return None, True, None
+        status = current['status']
+        return status, status not in ('transferring', 'aborting', 'finalizing'), None
+
     def wait_for_status(self):
-        timeout = 300       # 5 minutes
-        while timeout > 0:
-            time.sleep(30)
-            current = self.snapmirror_get()
-            if current['status'] != 'transferring':
-                return True
-            timeout -= 30
-        return False
+        # 5 minutes
+        poller = Poller(300, max_interval=30)
+        poller.poll(self.get_transfer_state)
+        return not poller.timed_out
 
     def check_if_remote_volume_exists(self):
         """
@@ -673,6 +686,8 @@ class NetAppONTAPSnapmirror(object):
         query = netapp_utils.zapi.NaElement('query')
         query.add_child_elem(volume_attributes)
         volume_info.add_child_elem(query)
+        # only the number of records is used
+        netapp_utils.add_desired_attributes(self.module, volume_info, {'volume-attributes': {'volume-id-attributes': ['name']}})
         try:
             result = self.source_server.invoke_successfully(volume_info, True)
         except netapp_utils.zapi.NaApiError as error:
@@ -851,14 +866,12 @@ class NetAppONTAPSnapmirror(object):
         if result is not None and result['status'] == 'passed':
             return
         elif result is not None and result['status'] != 'passed':
-            retries = 5
-            while retries > 0:
-                time.sleep(5)
-                retries = retries - 1
-                status = self.snapmirror_get()
-                if status['status'] == 'quiesced':
-                    return
-            if retries == 0:
+            def get_quiesce_state():
+                status = self.snapmirror_get()['status']
+                return status, status == 'quiesced', None
+
+            status, dummy = Poller(25, max_interval=5).poll(get_quiesce_state)
+            if status != 'quiesced':
                 self.module.fail_json(msg='Taking a long time to Quiescing SnapMirror, try again later')
 
     def snapmirror_delete(self):
@@ -41,8 +41,8 @@ options:
   name:
     description:
     - The name of the volume to manage.
+    - Required, unless C(volumes) is set.
     type: str
-    required: true
 
   vserver:
     description:
@@ -518,6 +518,31 @@ options:
     - Whether to enable inline compression for the volume (HDD and Flash Pool aggregates, AFF platforms).
     type: bool
     version_added: '20.12.0'
+
+  volumes:
+    description:
+    - Manage several volumes in a single task, mutually exclusive with C(name).
+    - Each entry requires C(name), and accepts the volume options of this module, except connection options, C(vserver),
+      C(nas_application_template) and C(max_concurrency).
+    - Options set at the module level apply to every volume, unless overridden in an entry.
+    - The current state of all volumes is read with a single volume-get-iter query.
+    - Results are reported for each volume in C(volumes).
+    - If a volume fails, the other volumes are still managed, and the module fails once all volumes are processed,
+      reporting an error for each failed volume.
+    type: list
+    elements: dict
+    version_added: '21.3.0'
+
+  max_concurrency:
+    description:
+    - Maximum number of volumes managed in parallel, when C(volumes) is set.
+    - Otherwise, maximum number of independent modify calls sent in parallel for the volume, for instance to change
+      attributes, efficiency settings, snapshot autodelete options, and size.
+    - With a value greater than 1, if a modify call fails, the other independent calls are still sent, and all errors are reported together.
+    - With the default value of 1, modify calls are sent one at a time, and the module stops at the first error.
+    type: int
+    default: 1
+    version_added: '21.3.0'
 '''
 
 EXAMPLES = """
@@ -723,22 +748,78 @@ EXAMPLES = """
         password: "{{ netapp_password }}"
         https: true
         validate_certs: false
+
+    - name: Create or update several volumes, 4 at a time
+      na_ontap_volume:
+        state: present
+        vserver: ansibleSVM
+        aggregate_name: ansible_aggr
+        size_unit: gb
+        volumes:
+          - name: ansibleVolume1
+            size: 10
+          - name: ansibleVolume2
+            size: 20
+            junction_path: /ansibleVolume2
+        max_concurrency: 4
+        hostname: "{{ netapp_hostname }}"
+        username: "{{ netapp_username }}"
+        password: "{{ netapp_password }}"
+        https: true
+        validate_certs: false
 """
 
 RETURN = """
+volumes:
+  description:
+    - results for each volume, when C(volumes) is set.
+    - each entry includes name and changed, and modify, response, warnings when applicable.
+    - each entry includes error if the volume failed, the list is also returned on failure.
+  returned: when volumes is set
+  type: list
 """
 
-import time
 import traceback
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
+from ansible.module_utils.common.validation import check_type_bool, check_type_dict, check_type_int, check_type_list, check_type_str
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller
 from ansible_collections.netapp.ontap.plugins.module_utils.rest_application import RestApplication
+from ansible_collections.netapp.ontap.plugins.module_utils.request_batch import RequestBatch
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import run_tasks, task_worker
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
 
+MUTUALLY_EXCLUSIVE = [['space_guarantee', 'space_slo'], ['auto_remap_luns', 'force_unmap_luns']]
+# options that cannot be set for an individual volume in volumes
+BULK_EXCLUDED_OPTIONS = list(netapp_utils.na_ontap_host_argument_spec()) + ['vserver', 'volumes', 'max_concurrency', 'nas_application_template']
+# attributes read by get_volume, other attributes are not requested
+VOLUME_DESIRED_ATTRIBUTES = {
+    'volume-attributes': {
+        'encrypt': None,
+        'volume-comp-aggr-attributes': ['tiering-policy'],
+        'volume-export-attributes': ['policy'],
+        'volume-id-attributes': ['comment', 'containing-aggregate-name', 'flexgroup-uuid', 'instance-uuid', 'junction-path',
+                                 'name', 'style-extended', 'type'],
+        'volume-performance-attributes': ['is-atime-update-enabled'],
+        'volume-qos-attributes': ['adaptive-policy-group-name', 'policy-group-name'],
+        'volume-security-attributes': {
+            'style': None,
+            'volume-security-unix-attributes': ['group-id', 'permissions', 'user-id'],
+        },
+        'volume-snapshot-attributes': ['snapdir-access-enabled', 'snapshot-policy'],
+        'volume-snapshot-autodelete-attributes': ['commitment', 'defer-delete', 'delete-order', 'destroy-list', 'is-autodelete-enabled',
+                                                  'prefix', 'target-free-space', 'trigger'],
+        'volume-space-attributes': ['percentage-snapshot-reserve', 'size', 'space-guarantee', 'space-slo'],
+        'volume-state-attributes': ['is-nvfail-enabled', 'state'],
+        'volume-vserver-dr-protection-attributes': ['vserver-dr-protection'],
+    }
+}
+
+
 class NetAppOntapVolume(object):
     '''Class with volume operations'''
 
@@ -760,7 +841,7 @@ class NetAppOntapVolume(object):
         self.argument_spec = netapp_utils.na_ontap_host_argument_spec()
         self.argument_spec.update(dict(
             state=dict(required=False, type='str', choices=['present', 'absent'], default='present'),
-            name=dict(required=True, type='str'),
+            name=dict(required=False, type='str'),
             vserver=dict(required=True, type='str'),
             from_name=dict(required=False, type='str'),
             is_infinite=dict(required=False, type='bool', default=False),
@@ -829,19 +910,22 @@ class NetAppOntapVolume(object):
                 ))
             )),
             size_change_threshold=dict(type='int', default=10),
+            volumes=dict(required=False, type='list', elements='dict'),
+            max_concurrency=dict(required=False, type='int', default=1),
         ))
 
         self.module = AnsibleModule(
             argument_spec=self.argument_spec,
-            mutually_exclusive=[
-                ['space_guarantee', 'space_slo'], ['auto_remap_luns', 'force_unmap_luns']
-            ],
+            mutually_exclusive=MUTUALLY_EXCLUSIVE + [['name', 'volumes']],
+            required_one_of=[['name', 'volumes']],
             supports_check_mode=True
         )
         self.na_helper = NetAppModule()
         self.parameters = self.na_helper.check_and_set_parameters(self.module)
         self.volume_style = None
         self.warnings = list()
+        # volume-attributes read ahead of time, indexed by volume name
+        self.prefetched_volumes = None
         self.sis_keys2zapi_get = dict(
             efficiency_policy='policy',
             compression='is-compression-enabled',
@@ -851,14 +935,10 @@ class NetAppOntapVolume(object):
             compression='enable-compression',
             inline_compression='enable-inline-compression')
 
-        if self.parameters.get('size'):
-            self.parameters['size'] = self.parameters['size'] * \
-                self._size_unit_map[self.parameters['size_unit']]
-        if 'snapshot_auto_delete' in self.parameters:
-            for key in self.parameters['snapshot_auto_delete']:
-                if key not in ['commitment', 'trigger', 'target_free_space', 'delete_order', 'defer_delete',
-                               'prefix', 'destroy_list', 'state']:
-                    self.module.fail_json(msg="snapshot_auto_delete option '%s' is not valid." % key)
+        if 'volumes' in self.parameters:
+            self.volumes = [self.get_volume_parameters(entry) for entry in self.parameters['volumes']]
+        else:
+            self.check_volume_parameters(self.parameters)
 
         if HAS_NETAPP_LIB is False:
             self.module.fail_json(
@@ -875,7 +955,51 @@ class NetAppOntapVolume(object):
         if error is not None:
             self.module.fail_json(msg=error)
         # REST API for application/applications if needed
-        self.rest_app = self.setup_rest_application()
+        self.rest_app = None if 'volumes' in self.parameters else self.setup_rest_application()
+
+    def check_volume_parameters(self, parameters):
+        ''' convert size to bytes, and validate snapshot_auto_delete options '''
+        if parameters.get('size'):
+            parameters['size'] = parameters['size'] * \
+                self._size_unit_map[parameters['size_unit']]
+        if 'snapshot_auto_delete' in parameters:
+            for key in parameters['snapshot_auto_delete']:
+                if key not in ['commitment', 'trigger', 'target_free_space', 'delete_order', 'defer_delete',
+                               'prefix', 'destroy_list', 'state']:
+                    self.module.fail_json(msg="snapshot_auto_delete option '%s' is not valid." % key)
+
+    def check_option_type(self, key, value):
+        ''' validate and convert a value in a volumes entry, based on the argument spec '''
+        spec = self.argument_spec[key]
+        checkers = dict(str=check_type_str, int=check_type_int, bool=check_type_bool, list=check_type_list, dict=check_type_dict)
+        try:
+            value = checkers[spec.get('type', 'str')](value)
+            if spec.get('elements') == 'str':
+                value = [check_type_str(item) for item in value]
+        except (TypeError, ValueError) as exc:
+            self.module.fail_json(msg="Error: invalid value for %s in volumes entry: %s" % (key, to_native(exc)))
+        if 'choices' in spec and value not in spec['choices']:
+            self.module.fail_json(msg="Error: value of %s must be one of: %s, got: %s in volumes entry"
+                                  % (key, ', '.join(spec['choices']), value))
+        return value
+
+    def get_volume_parameters(self, entry):
+        ''' merge a volumes entry with module level options '''
+        aliases = dict((alias, key) for key, spec in self.argument_spec.items() for alias in spec.get('aliases', []))
+        parameters = dict((key, value) for key, value in self.parameters.items() if key not in ('volumes', 'max_concurrency'))
+        for key, value in entry.items():
+            key = aliases.get(key, key)
+            if key not in self.argument_spec or key in BULK_EXCLUDED_OPTIONS:
+                self.module.fail_json(msg="Error: option %s is not supported in volumes entry: %s" % (key, entry))
+            if value is not None:
+                parameters[key] = self.check_option_type(key, value)
+        if 'name' not in parameters:
+            self.module.fail_json(msg="Error: name is required in volumes entry: %s" % entry)
+        for options in MUTUALLY_EXCLUSIVE:
+            if all(option in parameters for option in options):
+                self.module.fail_json(msg="Error: parameters are mutually exclusive: %s, for volume %s" % ('|'.join(options), parameters['name']))
+        self.check_volume_parameters(parameters)
+        return parameters
 
     def setup_rest_application(self):
         use_application_template = self.na_helper.safe_get(self.parameters, ['nas_application_template', 'use_nas_application'])
@@ -916,6 +1040,7 @@ class NetAppOntapVolume(object):
         query = netapp_utils.zapi.NaElement('query')
         query.add_child_elem(volume_attributes)
         volume_info.add_child_elem(query)
+        netapp_utils.add_desired_attributes(self.module, volume_info, VOLUME_DESIRED_ATTRIBUTES)
 
         try:
             result = self.server.invoke_successfully(volume_info, True)
@@ -925,6 +1050,42 @@ class NetAppOntapVolume(object):
                                   exception=traceback.format_exc())
         return result
 
+    def get_volume_attributes(self, vol_name):
+        """
+        Return volume-attributes, or None if the volume is not found
+        A prefetched record is only used once, so that a later call reads the current state.
+        """
+        if self.prefetched_volumes is not None and vol_name in self.prefetched_volumes:
+            return self.prefetched_volumes.pop(vol_name)
+        volume_get_iter = self.volume_get_iter(vol_name)
+        if volume_get_iter.get_child_by_name('num-records') and \
+                int(volume_get_iter.get_child_content('num-records')) > 0:
+            return volume_get_iter['attributes-list']['volume-attributes']
+        return None
+
+    def prefetch_volumes(self, vol_names):
+        """
+        Read volume-attributes for several volumes with a single volume-get-iter query
+        :return: dict indexed by volume name, value is None if the volume is not found
+        """
+        records = dict((vol_name, None) for vol_name in vol_names)
+        query = {'query': {'volume-attributes': {'volume-id-attributes': {'name': '|'.join(records),
+                                                                          'vserver': self.parameters['vserver']}}}}
+        children = [query]
+        if netapp_utils.has_feature(self.module, 'zapi_desired_attributes'):
+            children.append({'desired-attributes': VOLUME_DESIRED_ATTRIBUTES})
+        try:
+            for volume_attributes in netapp_utils.iter_zapi_records(self.server, 'volume-get-iter', children,
+                                                                    max_records=max(len(records), 20)):
+                vol_name = volume_attributes['volume-id-attributes']['name']
+                if vol_name in records:
+                    records[vol_name] = volume_attributes
+        except netapp_utils.zapi.NaApiError as error:
+            self.module.fail_json(msg='Error fetching volumes %s : %s'
+                                  % (', '.join(records), to_native(error)),
+                                  exception=traceback.format_exc())
+        return records
+
     def get_volume(self, vol_name=None):
         """
         Return details about the volume
@@ -935,12 +1096,9 @@ class NetAppOntapVolume(object):
         """
         if vol_name is None:
             vol_name = self.parameters['name']
-        volume_get_iter = self.volume_get_iter(vol_name)
+        volume_attributes = self.get_volume_attributes(vol_name)
         return_value = None
-        if volume_get_iter.get_child_by_name('num-records') and \
-                int(volume_get_iter.get_child_content('num-records')) > 0:
-
-            volume_attributes = volume_get_iter['attributes-list']['volume-attributes']
+        if volume_attributes is not None:
             volume_space_attributes = volume_attributes['volume-space-attributes']
             volume_state_attributes = volume_attributes['volume-state-attributes']
             volume_id_attributes = volume_attributes['volume-id-attributes']
@@ -1199,26 +1357,25 @@ class NetAppOntapVolume(object):
         self.ems_log_event("volume-create")
 
         if self.parameters.get('wait_for_completion'):
-            # round off time_out
-            retries = (self.parameters['time_out'] + 5) // 10
-            is_online = None
-            errors = list()
-            while not is_online and retries > 0:
-                try:
-                    current = self.get_volume()
-                    is_online = None if current is None else current['is_online']
-                except KeyError as err:
-                    # get_volume may receive incomplete data as the volume is being created
-                    errors.append(repr(err))
-                if not is_online:
-                    time.sleep(10)
-                retries = retries - 1
+            poller = Poller(self.parameters['time_out'], max_interval=10)
+            is_online, dummy = poller.poll(self.get_volume_online_state)
             if not is_online:
+                errors = poller.errors
                 errors.append("Timeout after %s seconds" % self.parameters['time_out'])
                 self.module.fail_json(msg='Error waiting for volume %s to come online: %s'
                                       % (self.parameters['name'], str(errors)))
         return None
 
+    def get_volume_online_state(self):
+        ''' poll function for Poller: return (is_online, done, error) '''
+        try:
+            current = self.get_volume()
+        except KeyError as err:
+            # get_volume may receive incomplete data as the volume is being created
+            return None, False, repr(err)
+        is_online = None if current is None else current['is_online']
+        return is_online, bool(is_online), None
+
     def create_volume_async(self):
         '''
         create volume async.
@@ -1377,38 +1534,35 @@ class NetAppOntapVolume(object):
         dummy, error = self.rest_api.patch(api, data, query)
         return error
 
+    def get_volume_move_state(self):
+        ''' poll function for Poller: return (state, done, error) '''
+        volume_move_iter = netapp_utils.zapi.NaElement('volume-move-get-iter')
+        volume_move_info = netapp_utils.zapi.NaElement('volume-move-info')
+        volume_move_info.add_new_child('volume', self.parameters['name'])
+        query = netapp_utils.zapi.NaElement('query')
+        query.add_child_elem(volume_move_info)
+        volume_move_iter.add_child_elem(query)
+        try:
+            result = self.cluster.invoke_successfully(volume_move_iter, enable_tunneling=True)
+        except netapp_utils.zapi.NaApiError as error:
+            return None, False, to_native(error)
+        volume_move_status = result.get_child_by_name('attributes-list').get_child_by_name('volume-move-info').\
+            get_child_content('state')
+        # We have 5 states that can be returned.
+        # warning and healthy are state where the move is still going so we don't need to do anything for thouse.
+        if volume_move_status in ['failed', 'alert']:
+            self.module.fail_json(msg='Error moving volume %s: %s' %
+                                  (self.parameters['name'],
+                                   result.get_child_by_name('attributes-list')[0].get_child_by_name('details')))
+        return volume_move_status, volume_move_status == 'done', None
+
     def wait_for_volume_move(self):
-        waiting = True
-        fail_count = 0
-        while waiting:
-            volume_move_iter = netapp_utils.zapi.NaElement('volume-move-get-iter')
-            volume_move_info = netapp_utils.zapi.NaElement('volume-move-info')
-            volume_move_info.add_new_child('volume', self.parameters['name'])
-            query = netapp_utils.zapi.NaElement('query')
-            query.add_child_elem(volume_move_info)
-            volume_move_iter.add_child_elem(query)
-            try:
-                result = self.cluster.invoke_successfully(volume_move_iter, enable_tunneling=True)
-            except netapp_utils.zapi.NaApiError as error:
-                if fail_count < 3:
-                    fail_count += 1
-                    time.sleep(self.parameters['check_interval'])
-                    continue
-                self.module.fail_json(msg='Error getting volume move status: %s' % (to_native(error)),
-                                      exception=traceback.format_exc())
-            # reset fail count to 0
-            fail_count = 0
-            volume_move_status = result.get_child_by_name('attributes-list').get_child_by_name('volume-move-info').\
-                get_child_content('state')
-            # We have 5 states that can be returned.
-            # warning and healthy are state where the move is still going so we don't need to do anything for thouse.
-            if volume_move_status == 'done':
-                waiting = False
-            if volume_move_status in ['failed', 'alert']:
-                self.module.fail_json(msg='Error moving volume %s: %s' %
-                                      (self.parameters['name'],
-                                       result.get_child_by_name('attributes-list')[0].get_child_by_name('details')))
-            time.sleep(self.parameters['check_interval'])
+        # the user selected interval is used as is, errors are retried 3 times
+        interval = self.parameters['check_interval']
+        poller = Poller(None, max_interval=interval, initial_interval=interval, max_consecutive_errors=4)
+        dummy, error = poller.poll(self.get_volume_move_state)
+        if error is not None:
+            self.module.fail_json(msg='Error getting volume move status: %s' % error)
 
     def rename_volume(self):
         """
@@ -1432,9 +1586,9 @@ class NetAppOntapVolume(object):
                                   % (self.parameters['name'], to_native(error)),
                                   exception=traceback.format_exc())
 
-    def rest_resize_volume(self):
+    def rest_resize_volume_request(self):
         """
-        Re-size the volume using REST PATCH method.
+        Return api, body, and query to re-size the volume using REST PATCH method.
         """
         uuid = self.parameters['uuid']
         if uuid is None:
@@ -1442,6 +1596,13 @@ class NetAppOntapVolume(object):
         api = '/storage/volumes/%s' % uuid
         body = dict(size=self.parameters['size'])
         query = dict(sizing_method=self.parameters['sizing_method'])
+        return api, body, query
+
+    def rest_resize_volume(self):
+        """
+        Re-size the volume using REST PATCH method.
+        """
+        api, body, query = self.rest_resize_volume_request()
         response, error = self.rest_api.patch(api, body, query)
         self.fail_on_error(error, api)
         return response
@@ -1678,32 +1839,56 @@ class NetAppOntapVolume(object):
             self.module.fail_json(msg='Error unmounting volume %s: %s'
                                   % (self.parameters['name'], to_native(error)), exception=traceback.format_exc())
 
-    def modify_volume(self, modify):
-        '''Modify volume action'''
+    def new_request_batch(self):
+        '''Return a batch for independent modify calls, max_concurrency only applies to a single volume'''
+        return RequestBatch(self.module, self.parameters.get('max_concurrency', 1) if 'volumes' not in self.parameters else 1)
+
+    def modify_volume(self, modify, batch):
+        '''Modify volume action
+           independent calls are added to batch, a volume move depends on all of them,
+           and efficiency settings depend on the volume move
+        '''
         attributes = modify.keys()
         # order matters here, if both is_online and mount in modify, must bring the volume online first.
         if 'is_online' in attributes:
             self.change_volume_state()
+        # batched calls report errors to the batch rather than exiting
+        worker = task_worker(self)
         for attribute in attributes:
             if attribute in ['space_guarantee', 'export_policy', 'unix_permissions', 'group_id', 'user_id', 'tiering_policy',
                              'snapshot_policy', 'percent_snapshot_space', 'snapdir_access', 'atime_update', 'volume_security_style',
                              'nvfail_enabled', 'space_slo', 'qos_policy_group', 'qos_adaptive_policy_group', 'vserver_dr_protection', 'comment']:
-                self.volume_modify_attributes(modify)
+                batch.add('volume_modify_attributes', worker.volume_modify_attributes, dict(params=modify))
                 break
         if 'snapshot_auto_delete' in attributes:
-            self.set_snapshot_auto_delete()
+            # one call per option
+            for key, value in self.parameters['snapshot_auto_delete'].items():
+                batch.add('snapshot_auto_delete_%s' % key, worker.set_snapshot_auto_delete_option, dict(key=key, value=value))
         if 'junction_path' in attributes:
             if modify.get('junction_path') == '':
-                self.volume_unmount()
+                batch.add('volume_unmount', worker.volume_unmount)
             else:
-                self.volume_mount()
+                batch.add('volume_mount', worker.volume_mount)
         if 'size' in attributes:
-            self.resize_volume()
+            if self.parameters.get('sizing_method') is not None:
+                api, body, query = self.rest_resize_volume_request()
+                batch.add_rest_patch('resize_volume', self.rest_api, api, body, query)
+            else:
+                batch.add('resize_volume', worker.resize_volume)
         if 'aggregate_name' in attributes:
-            # keep it last, as it may take some time
-            self.move_volume()
+            # start it once the other calls are complete, as it may take some time
+            batch.add('move_volume', worker.move_volume, depends_on=batch.names())
             if self.parameters.get('wait_for_completion'):
-                self.wait_for_volume_move()
+                batch.add('wait_for_volume_move', worker.wait_for_volume_move, depends_on=['move_volume'])
+        if any([modify.get(key) is not None for key in self.sis_keys2zapi_get]):
+            if self.parameters.get('is_infinite') or self.volume_style == 'flexgroup':
+                efficiency_config_modify = 'async'
+            else:
+                efficiency_config_modify = 'sync'
+            # efficiency is changed once the volume move is complete
+            depends_on = [name for name in ('move_volume', 'wait_for_volume_move') if name in batch.names()]
+            batch.add('modify_volume_efficiency_config', worker.modify_volume_efficiency_config,
+                      dict(efficiency_config_modify_value=efficiency_config_modify), depends_on=depends_on)
 
     def compare_chmod_value(self, current):
         """
@@ -1781,33 +1966,29 @@ class NetAppOntapVolume(object):
         """
         Loop until job is complete
         """
-        server = self.server
-        sleep_time = 5
-        time_out = self.parameters['time_out']
-        results = self.get_job(jobid, server)
-        error = 'timeout'
-
-        while time_out > 0:
-            results = self.get_job(jobid, server)
+        # a list, so that the poll function can switch to the cluster vserver
+        servers = [self.server]
+
+        def get_job_state():
+            results = self.get_job(jobid, servers[0])
             # If running as cluster admin, the job is owned by cluster vserver
             # rather than the target vserver.
-            if results is None and server == self.server:
-                results = netapp_utils.get_cserver(self.server)
-                server = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=results)
-                continue
+            if results is None and servers[0] == self.server:
+                cserver = netapp_utils.get_cserver(self.server)
+                servers[0] = netapp_utils.setup_na_ontap_zapi(module=self.module, vserver=cserver)
+                results = self.get_job(jobid, servers[0])
             if results is None:
-                error = 'cannot locate job with id: %d' % int(jobid)
-                break
+                return None, True, 'cannot locate job with id: %d' % int(jobid)
             if results['job-state'] in ('queued', 'running'):
-                time.sleep(sleep_time)
-                time_out -= sleep_time
-                continue
+                return results, False, None
             if results['job-state'] in ('success', 'failure'):
-                break
-            else:
-                self.module.fail_json(msg='Unexpected job status in: %s' % repr(results))
+                return results, True, None
+            self.module.fail_json(msg='Unexpected job status in: %s' % repr(results))
 
-        if results is not None:
+        poller = Poller(self.parameters['time_out'], max_interval=5, max_consecutive_errors=1)
+        results, error = poller.poll(get_job_state)
+
+        if results is not None and error is None:
             if results['job-state'] == 'success':
                 error = None
             elif results['job-state'] in ('queued', 'running'):
@@ -1931,19 +2112,17 @@ class NetAppOntapVolume(object):
         else:
             self.set_efficiency_config()
 
-    def set_snapshot_auto_delete(self):
-        options = {'volume': self.parameters['name']}
-        desired_options = self.parameters['snapshot_auto_delete']
-        for key, value in desired_options.items():
-            options['option-name'] = key
-            options['option-value'] = str(value)
-            snapshot_auto_delete = netapp_utils.zapi.NaElement.create_node_with_children('snapshot-autodelete-set-option', **options)
-            try:
-                self.server.invoke_successfully(snapshot_auto_delete, enable_tunneling=True)
-            except netapp_utils.zapi.NaApiError as error:
-                self.module.fail_json(msg='Error setting snapshot auto delete options for volume %s: %s'
-                                      % (self.parameters['name'], to_native(error)),
-                                      exception=traceback.format_exc())
+    def set_snapshot_auto_delete_option(self, key, value):
+        options = {'volume': self.parameters['name'],
+                   'option-name': key,
+                   'option-value': str(value)}
+        snapshot_auto_delete = netapp_utils.zapi.NaElement.create_node_with_children('snapshot-autodelete-set-option', **options)
+        try:
+            self.server.invoke_successfully(snapshot_auto_delete, enable_tunneling=True)
+        except netapp_utils.zapi.NaApiError as error:
+            self.module.fail_json(msg='Error setting snapshot auto delete options for volume %s: %s'
+                                  % (self.parameters['name'], to_native(error)),
+                                  exception=traceback.format_exc())
 
     def rehost_volume(self):
         volume_rehost = netapp_utils.zapi.NaElement.create_node_with_children(
@@ -2020,17 +2199,66 @@ class NetAppOntapVolume(object):
             for field in ['volume_security_style', 'group_id', 'user_id', 'percent_snapshot_space']:
                 if self.parameters.get(field) is not None:
                     modify[field] = self.parameters[field]
-        self.modify_volume(modify)
-
-        if any([modify.get(key) is not None for key in self.sis_keys2zapi_get]):
-            if self.parameters.get('is_infinite') or self.volume_style == 'flexgroup':
-                efficiency_config_modify = 'async'
+        # independent calls are sent together, and errors are reported once all of them are complete
+        batch = self.new_request_batch()
+        self.modify_volume(modify, batch)
+        batch.run_or_fail()
+
+    def get_volume_worker(self, parameters, prefetched_volumes):
+        ''' return a copy of this object, to manage the volume described by parameters
+            connections are shared, state is not
+        '''
+        worker = task_worker(self)
+        worker.parameters = parameters
+        worker.na_helper = NetAppModule()
+        worker.volume_style = None
+        worker.warnings = list()
+        worker.prefetched_volumes = dict((vol_name, prefetched_volumes[vol_name])
+                                         for vol_name in (parameters['name'], parameters.get('from_name'))
+                                         if vol_name in prefetched_volumes)
+        worker.rest_app = worker.setup_rest_application()
+        return worker
+
+    def apply_volumes(self):
+        '''Call create/modify/delete operations for each volume in volumes'''
+        vol_names = [parameters['name'] for parameters in self.volumes]
+        duplicates = sorted(set(vol_name for vol_name in vol_names if vol_names.count(vol_name) > 1))
+        if duplicates:
+            self.module.fail_json(msg='Error: duplicate volume names in volumes: %s' % ', '.join(duplicates))
+        from_names = [parameters['from_name'] for parameters in self.volumes if parameters.get('from_name')]
+        prefetched_volumes = self.prefetch_volumes(vol_names + from_names)
+        workers = dict((parameters['name'], self.get_volume_worker(parameters, prefetched_volumes)) for parameters in self.volumes)
+        tasks = [(vol_name, workers[vol_name].apply_volume, dict()) for vol_name in vol_names]
+        errors = dict()
+        results = run_tasks(self.module, tasks, self.parameters['max_concurrency'], errors=errors)
+        volumes = list()
+        for vol_name in vol_names:
+            volume = dict(name=vol_name)
+            if vol_name in results:
+                volume.update(results[vol_name])
             else:
-                efficiency_config_modify = 'sync'
-            self.modify_volume_efficiency_config(efficiency_config_modify)
+                # a failed volume may have been partially changed
+                volume.update(changed=workers[vol_name].na_helper.changed, error=errors[vol_name])
+            volumes.append(volume)
+        result = dict(
+            changed=any(volume['changed'] for volume in volumes),
+            volumes=volumes
+        )
+        if errors:
+            msgs = ['%s: %s' % (vol_name, errors[vol_name]) for vol_name in vol_names if vol_name in errors]
+            self.module.fail_json(msg='Error managing volumes: %s' % ' --- '.join(msgs), **result)
+        return result
 
     def apply(self):
-        '''Call create/modify/delete operations'''
+        '''Call create/modify/delete operations, for a single volume or for each volume in volumes'''
+        if 'volumes' in self.parameters:
+            result = self.apply_volumes()
+        else:
+            result = self.apply_volume()
+        self.module.exit_json(**result)
+
+    def apply_volume(self):
+        '''Call create/modify/delete operations, return results'''
         response = None
         modify_after_create = None
         current = self.get_volume()
@@ -2099,7 +2327,7 @@ class NetAppOntapVolume(object):
             result['modify_after_create'] = modify_after_create
         if self.warnings:
             result['warnings'] = self.warnings
-        self.module.exit_json(**result)
+        return result
 
     def ems_log_event(self, state):
         '''Autosupport log event'''
@@ -121,11 +121,11 @@ last_state:
   type: str
 """
 
-import time
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils._text import to_native
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp_module import NetAppModule
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller, summarize_states
 
 HAS_NETAPP_LIB = netapp_utils.has_netapp_lib()
 
@@ -258,39 +258,25 @@ class NetAppONTAPWFC(object):
                 state_list as str
                 last_state
         '''
-        previous_state = None
-        count = 0
-        summary = ''
-        for state in self.states:
-            if state == previous_state:
-                count += 1
-            else:
-                if previous_state is not None:
-                    summary += '%s%s' % (previous_state, '' if count == 1 else '*%d' % count)
-                count = 1
-                previous_state = state
-        if previous_state is not None:
-            summary += '%s%s' % (previous_state, '' if count == 1 else '*%d' % count)
-        last_state = self.states[-1] if self.states else ''
-        return summary, last_state
+        return summarize_states(self.states)
 
     def wait_for_condition(self, name):
         ''' calls the ZAPI and extract condition value - loop until found '''
-        time_left = self.parameters['timeout']
         max_consecutive_error_count = 3
-        error_count = 0
         zapi_obj = self.build_zapi(name)
 
-        while time_left > 0:
+        def get_condition():
             condition, error = self.get_condition(name, zapi_obj)
+            return condition, condition is not None, error
+
+        # the user selected polling interval is used as is
+        poller = Poller(self.parameters['timeout'], max_interval=self.parameters['polling_interval'],
+                        initial_interval=self.parameters['polling_interval'], max_consecutive_errors=max_consecutive_error_count)
+        condition, error = poller.poll(get_condition)
+        if not poller.timed_out:
             if error is not None:
-                error_count += 1
-                if error_count >= max_consecutive_error_count:
-                    self.module.fail_json(msg='Error: %s - count: %d' % (error, error_count))
-            elif condition is not None:
-                return condition
-            time.sleep(self.parameters['polling_interval'])
-            time_left -= self.parameters['polling_interval']
+                self.module.fail_json(msg='Error: %s - count: %d' % (error, max_consecutive_error_count))
+            return condition
 
         error = 'Error: timeout waiting for condition%s: %s.' %\
                 ('s' if len(self.parameters['conditions']) > 1 else '',
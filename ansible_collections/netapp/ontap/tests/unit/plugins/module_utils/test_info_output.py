@@ -0,0 +1,68 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils info_output.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import gzip
+import json
+import os
+import tempfile
+
+from ansible_collections.netapp.ontap.plugins.module_utils import info_output
+
+
+def test_flatten_record():
+    ''' nested keys are joined with a dot, lists and empty dicts are kept '''
+    record = dict(name='vol1', svm=dict(name='svm1', uuid='u1'), space=dict(size=10, snapshot=dict(used=1)), tags=['a'], empty=dict())
+    assert info_output.flatten_record(record) == {
+        'name': 'vol1', 'svm.name': 'svm1', 'svm.uuid': 'u1', 'space.size': 10, 'space.snapshot.used': 1, 'tags': ['a'], 'empty': dict()}
+
+
+def test_to_columnar():
+    ''' repeated strings are dictionary encoded, missing fields are None '''
+    records = [dict(name='vol%d' % index, svm=dict(name='svm%d' % (index % 2)), size=index) for index in range(4)]
+    records.append(dict(name='vol4', comment='only one'))
+    columnar = info_output.to_columnar(records, keys=['k%d' % index for index in range(5)])
+    assert columnar['num_records'] == 5
+    assert columnar['fields'] == ['name', 'svm.name', 'size', 'comment']
+    assert columnar['keys'] == ['k0', 'k1', 'k2', 'k3', 'k4']
+    assert columnar['columns'][0] == ['vol0', 'vol1', 'vol2', 'vol3', 'vol4']
+    assert columnar['columns'][1] == dict(dictionary=['svm0', 'svm1'], indices=[0, 1, 0, 1, None])
+    assert columnar['columns'][2] == [0, 1, 2, 3, None]
+    assert columnar['columns'][3] == [None, None, None, None, 'only one']
+    assert info_output.to_columnar(records, encode=False)['columns'][1] == ['svm0', 'svm1', 'svm0', 'svm1', None]
+
+
+def test_write_json_lines():
+    ''' plain and gzip files '''
+    lines = [dict(subset='storage/volumes', record=dict(name='vol1')), dict(subset='cluster', info=set(['a']))]
+    for name, opener in (('info.json', open), ('info.json.gz', gzip.open)):
+        path = os.path.join(tempfile.mkdtemp(), 'subdir', name)
+        assert info_output.write_json_lines(path, iter(lines)) == (2, None)
+        with opener(path, 'rb') as output_file:
+            assert [json.loads(line.decode('utf-8')) for line in output_file] == [lines[0], dict(subset='cluster', info=['a'])]
+
+
+def test_write_json_lines_error():
+    ''' an error is reported, not raised '''
+    path = tempfile.mkdtemp()
+    count, error = info_output.write_json_lines(path, [dict()])
+    assert count == 0
+    assert error.startswith('Error writing output file %s: ' % path)
+
+
+def test_json_lines_writer():
+    ''' lines are written as they are received, the file is kept open '''
+    path = os.path.join(tempfile.mkdtemp(), 'info.json')
+    writer = info_output.JsonLinesWriter(path)
+    assert writer.open() is None
+    assert writer.write(dict(subset='storage/volumes', record=dict(name='vol%d' % index)) for index in range(2)) is None
+    assert writer.write([dict(subset='cluster', info=dict(name='c1'))]) is None
+    assert writer.count == 3
+    assert writer.write([dict(value=object())]).startswith('Error writing output file %s: ' % path)
+    assert writer.close() is None
+    assert writer.close() is None
+    with open(path, 'rb') as output_file:
+        assert [json.loads(line.decode('utf-8'))['subset'] for line in output_file] == ['storage/volumes', 'storage/volumes', 'cluster']
@@ -0,0 +1,72 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils info_snapshot.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import stat
+import tempfile
+import time
+
+from ansible_collections.netapp.ontap.plugins.module_utils import info_snapshot
+
+
+def test_compute_delta():
+    ''' records are matched by uuid, or by content '''
+    previous = [dict(uuid='1', name='vol1'), dict(uuid='2', name='vol2'), dict(name='no_uuid')]
+    current = [dict(uuid='1', name='vol1'), dict(uuid='2', name='vol2_renamed'), dict(uuid='3', name='vol3')]
+    delta = info_snapshot.compute_delta(previous, current)
+    assert delta == dict(added=[dict(uuid='3', name='vol3')],
+                         removed=[dict(name='no_uuid')],
+                         changed=[dict(uuid='2', name='vol2_renamed')])
+
+
+def test_merge_records():
+    ''' new records are added, or replace a record with the same key '''
+    previous = [dict(index=1, message='m1'), dict(index=2, message='m2')]
+    records, delta = info_snapshot.merge_records(previous, [dict(index=2, message='m2'), dict(index=3, message='m3')], 'index')
+    assert records == previous + [dict(index=3, message='m3')]
+    assert delta == dict(added=[dict(index=3, message='m3')], removed=list(), changed=list())
+    assert info_snapshot.get_high_water_mark(records, 'index') == 3
+    assert info_snapshot.get_high_water_mark([dict(name='x')], 'index') is None
+
+
+def test_snapshot_save_and_get():
+    ''' a snapshot is only valid for the same query, and until full_refresh '''
+    path = tempfile.mkdtemp()
+    snapshot = info_snapshot.InfoSnapshot(path, 'cluster1:8443', 60)
+    assert snapshot.get('storage/volumes', dict(fields=None)) == (None, None)
+    snapshot.set('storage/volumes', dict(fields=None), [dict(uuid='1')])
+    assert snapshot.save() is None
+    assert os.path.basename(snapshot.path) == 'cluster1_8443.json'
+    assert stat.S_IMODE(os.stat(snapshot.path).st_mode) == 0o600
+
+    snapshot = info_snapshot.InfoSnapshot(path, 'cluster1:8443', 60)
+    records, full_read = snapshot.get('storage/volumes', dict(fields=None))
+    assert records == [dict(uuid='1')]
+    assert time.time() - full_read < 60
+    assert snapshot.get('storage/volumes', dict(fields=['name'])) == (None, None)
+    assert snapshot.get('svm/svms', dict(fields=None)) == (None, None)
+    snapshot = info_snapshot.InfoSnapshot(path, 'cluster1:8443', 0)
+    assert snapshot.get('storage/volumes', dict(fields=None)) == (None, None)
+
+
+def test_snapshot_save_error():
+    ''' an error is reported, not raised '''
+    path = tempfile.mkdtemp()
+    blocker = os.path.join(path, 'file')
+    open(blocker, 'w').close()
+    snapshot = info_snapshot.InfoSnapshot(blocker, 'cluster1', 60)
+    snapshot.set('storage/volumes', None, list())
+    assert snapshot.save().startswith('Error writing snapshot file %s' % os.path.join(blocker, 'cluster1.json'))
+
+
+def test_snapshot_save_error_removes_temporary_file():
+    ''' the temporary file is removed when the snapshot cannot be written '''
+    path = tempfile.mkdtemp()
+    snapshot = info_snapshot.InfoSnapshot(path, 'cluster1', 60)
+    snapshot.set('storage/volumes', None, [dict(uuid=object())])
+    assert snapshot.save().startswith('Error writing snapshot file %s' % snapshot.path)
+    assert os.listdir(path) == []
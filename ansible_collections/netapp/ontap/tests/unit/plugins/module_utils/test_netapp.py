@@ -5,17 +5,21 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import io
 import json
 import os.path
+import socket
 import tempfile
+import threading
 
 import pytest
 
 from ansible.module_utils.ansible_release import __version__ as ansible_version
 from ansible.module_utils import basic
 from ansible.module_utils._text import to_bytes
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
 from ansible_collections.netapp.ontap.plugins.module_utils.netapp import COLLECTION_VERSION
-from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
+from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch, Mock
 
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
 
@@ -466,3 +470,458 @@ def test_zapi_cx_no_auth_header():
     assert not isinstance(zapi_cx, netapp_utils.OntapZAPICx)
     request, dummy = zapi_cx._create_request(netapp_utils.zapi.NaElement('dummy_tag'))
     assert "Authorization" not in [x[0] for x in request.header_items()]
+
+
+@patch('requests.Session.request')
+def test_rest_session_is_reused(mock_request):
+    ''' a single keep-alive session is used for all requests '''
+    mock_request.return_value.status_code = 200
+    mock_request.return_value.json.return_value = dict(records=[])
+    rest_api = create_restapi_object(mock_args())
+    assert rest_api.session is None
+    rest_api.get('cluster')
+    session = rest_api.session
+    assert session is not None
+    rest_api.patch('storage/volumes/1234', dict(name='vol1'))
+    assert rest_api.session is session
+    assert mock_request.call_count == 2
+    adapter = session.get_adapter('https://test/api/')
+    assert adapter._pool_maxsize == 10
+    assert adapter.max_retries.connect == 3
+    assert adapter.max_retries.read == 0
+
+
+def test_rest_session_pool_options():
+    ''' pool size and retries can be tuned with feature flags '''
+    rest_api = create_restapi_object(mock_args(dict(rest_pool_maxsize=2, rest_connect_retries=0)))
+    adapter = rest_api.get_session().get_adapter('https://test/api/')
+    assert adapter._pool_maxsize == 2
+    assert adapter.max_retries.connect == 0
+
+
+def test_rest_session_tls_error_is_not_retried(zapi_stub):
+    ''' only connection errors are retried, a TLS error fails on the first attempt '''
+    args = mock_args(dict(rest_connect_retries=3))
+    args.update(hostname='127.0.0.1', http_port=zapi_stub.server_port, validate_certs=True)
+    rest_api = create_restapi_object(args)
+    adapter = rest_api.get_session().get_adapter('https://127.0.0.1/api/')
+    assert adapter.max_retries.total == 3
+    # the stub server does not speak TLS, the handshake fails
+    message, error = rest_api.get('cluster')
+    assert message is None
+    assert 'SSL' in error
+    assert zapi_stub.connections == 1
+    assert not zapi_stub.requests
+
+
+JOB = {'_links': {'self': {'href': '/api/cluster/jobs/1234'}}}
+JOB_RUNNING = (200, {'state': 'running', 'message': 'in progress'}, None)
+JOB_SUCCESS = (200, {'state': 'success', 'message': 'done'}, None)
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_backoff(mock_request, mock_sleep):
+    ''' poll with increasing delays, capped by increment, and use return_timeout '''
+    mock_request.side_effect = [JOB_RUNNING] * 5 + [JOB_SUCCESS]
+    rest_api = create_restapi_object(mock_args())
+    message, error = rest_api.wait_on_job(JOB, increment=4)
+    assert error is None
+    assert message == 'done'
+    assert mock_request.call_count == 6
+    delays = [call[0][0] for call in mock_sleep.call_args_list]
+    for delay, max_delay in zip(delays, [1, 2, 4, 4, 4]):
+        assert max_delay / 2.0 <= delay <= max_delay
+    assert mock_request.call_args[0][1] == 'cluster/jobs/1234'
+    assert mock_request.call_args[0][2] == {'return_timeout': 30}
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_return_timeout_not_supported(mock_request, mock_sleep):
+    ''' fall back to polling if return_timeout is rejected '''
+    mock_request.side_effect = [
+        (400, None, {'code': '262179', 'message': 'Unexpected argument "return_timeout".'}),
+        JOB_SUCCESS
+    ]
+    rest_api = create_restapi_object(mock_args())
+    message, error = rest_api.wait_on_job(JOB)
+    assert error is None
+    assert message == 'done'
+    assert mock_request.call_args[0][2] is None
+    mock_sleep.assert_not_called()
+
+
+@patch('time.sleep')
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_wait_on_job_failure(mock_request, mock_sleep):
+    ''' job error is reported, return_timeout can be disabled '''
+    mock_request.side_effect = [
+        (200, {'state': 'failure', 'message': 'not enough disks'}, None),
+    ]
+    rest_api = create_restapi_object(mock_args(dict(job_return_timeout=False)))
+    message, error = rest_api.wait_on_job(JOB)
+    assert message is None
+    assert error == 'not enough disks'
+    assert mock_request.call_args[0][2] is None
+
+
+def test_wait_on_job_bad_url():
+    ''' report error on badly formatted job '''
+    rest_api = create_restapi_object(mock_args())
+    message, error = rest_api.wait_on_job({'_links': {}})
+    assert message is None
+    assert error.startswith('URL Incorrect format:')
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_uses_version_cache(mock_request):
+    ''' second module run skips the version probe '''
+    mock_request.side_effect = [
+        (200, {'version': {'full': 'NetApp Release 9.8', 'generation': 9, 'major': 8, 'minor': 0}}, None),
+    ]
+    cache_path = os.path.join(tempfile.mkdtemp(), 'cache.json')
+    flags = dict(version_cache_ttl=60, version_cache_path=cache_path)
+    assert create_restapi_object(mock_args(flags)).is_rest()
+    rest_api = create_restapi_object(mock_args(flags))
+    assert rest_api.is_rest()
+    assert rest_api.get_ontap_version() == (9, 8)
+    assert mock_request.call_count == 1
+    # the cache is keyed by host and user
+    mock_request.side_effect = [SRR['is_zapi']]
+    args = mock_args(flags)
+    args['username'] = 'other_user'
+    assert not create_restapi_object(args).is_rest()
+    assert mock_request.call_count == 2
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_is_rest_version_cache_disabled_by_default(mock_request):
+    mock_request.side_effect = [SRR['is_rest'], SRR['is_rest']]
+    assert create_restapi_object(mock_args()).is_rest()
+    assert create_restapi_object(mock_args()).is_rest()
+    assert mock_request.call_count == 2
+
+
+@patch('requests.Session.request')
+def test_version_cache_invalidated_on_auth_failure(mock_request):
+    ''' a 401 removes cached entries for this cluster and user '''
+    cache_path = os.path.join(tempfile.mkdtemp(), 'cache.json')
+    rest_api = create_restapi_object(mock_args(dict(version_cache_ttl=60, version_cache_path=cache_path)))
+    cache = netapp_utils.get_version_cache(rest_api.module)
+    cache.set('ontapi', '170')
+    assert cache.get('ontapi') == '170'
+    mock_request.return_value.status_code = 401
+    mock_request.return_value.raise_for_status.side_effect = netapp_utils.requests.exceptions.HTTPError('401 Unauthorized')
+    mock_request.return_value.json.return_value = dict()
+    dummy, error = rest_api.get('cluster')
+    assert error == '401 Unauthorized'
+    assert cache.get('ontapi') is None
+
+
+def zapi_connection(module, kind=None, parm1=None, hostname='test', username='test_user'):
+    ''' a mock ZAPI connection, with the host and user attributes of a NaServer '''
+    server = MockONTAPConnection(kind, parm1)
+    server.module = module
+    server._host = hostname
+    server._username = username
+    return server
+
+
+def test_get_cserver_cached():
+    ''' with the version cache, the admin vserver name is only read once per cluster '''
+    flags = dict(version_cache_ttl=60, version_cache_path=os.path.join(tempfile.mkdtemp(), 'cache.json'))
+    server = zapi_connection(create_module(mock_args(flags)), 'vserver', 'svm1')
+    assert netapp_utils.get_cserver(server) == 'svm1'
+    server = zapi_connection(create_module(mock_args(flags)), 'vserver', 'svm2')
+    assert netapp_utils.get_cserver(server) == 'svm1'
+    assert server.xml_in is None
+
+
+def test_get_cserver_cache_other_zapi_host():
+    ''' a ZAPI connection to a host other than the module host does not use the cache '''
+    flags = dict(version_cache_ttl=60, version_cache_path=os.path.join(tempfile.mkdtemp(), 'cache.json'))
+    module = create_module(mock_args(flags))
+    assert netapp_utils.get_cserver(zapi_connection(module, 'vserver', 'svm1')) == 'svm1'
+    assert netapp_utils.get_cserver(zapi_connection(module, 'vserver', 'svm2', hostname='other')) == 'svm2'
+    assert netapp_utils.get_cserver(zapi_connection(module, 'vserver', 'svm3', username='other_user')) == 'svm3'
+    assert netapp_utils.get_version_cache(module).get('cserver') == 'svm1'
+
+
+@patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+def test_get_cserver_cache_rest_hosts(mock_request):
+    ''' the cache is keyed by the REST connection host, not the module host '''
+    mock_request.side_effect = [
+        (200, dict(records=[dict(vserver='svm1', type='admin')]), None),
+        (200, dict(records=[dict(vserver='svm2', type='admin')]), None),
+    ]
+    flags = dict(version_cache_ttl=60, version_cache_path=os.path.join(tempfile.mkdtemp(), 'cache.json'))
+    module = create_module(mock_args(flags))
+    rest_api = netapp_utils.OntapRestAPI(module)
+    other_rest_api = netapp_utils.OntapRestAPI(module, host_params=dict(hostname='other'))
+    assert netapp_utils.get_cserver(rest_api, is_rest=True) == 'svm1'
+    assert netapp_utils.get_cserver(other_rest_api, is_rest=True) == 'svm2'
+    assert netapp_utils.get_cserver(rest_api, is_rest=True) == 'svm1'
+    assert netapp_utils.get_cserver(other_rest_api, is_rest=True) == 'svm2'
+    assert mock_request.call_count == 2
+
+
+def test_ems_log_event_once_per_ttl():
+    ''' with ems_log_ttl, an event is sent once per module and cluster '''
+    flags = dict(ems_log_ttl=60, version_cache_path=os.path.join(tempfile.mkdtemp(), 'cache.json'))
+    module = create_module(mock_args(flags))
+    for source, expected_call in (('unittest', True), ('unittest', False), ('other_module', True)):
+        server = zapi_connection(module)
+        netapp_utils.ems_log_event(source, server)
+        assert (server.xml_in is not None) == expected_call
+    # the event is sent to a different cluster
+    server = zapi_connection(module, hostname='other')
+    netapp_utils.ems_log_event('unittest', server)
+    assert server.xml_in is not None
+
+
+def test_add_desired_attributes():
+    ''' desired-attributes is added unless disabled with the feature flag '''
+    desired_attributes = {'volume-attributes': {'volume-id-attributes': ['name', 'type'], 'encrypt': None}}
+    for flags, expected in ((None, True), (dict(zapi_desired_attributes=False), False)):
+        zapi = netapp_utils.zapi.NaElement('volume-get-iter')
+        netapp_utils.add_desired_attributes(create_module(mock_args(flags)), zapi, desired_attributes)
+        request = zapi.to_string().decode('utf-8')
+        assert ('<desired-attributes><volume-attributes>' in request) == expected
+        assert ('<volume-id-attributes><name/><type/></volume-id-attributes>' in request) == expected
+        assert ('<encrypt/>' in request) == expected
+
+
+ZAPI_RECORDS = b'''<?xml version='1.0' encoding='UTF-8' ?>
+<netapp version='1.160' xmlns='http://www.netapp.com/filer/admin'>
+<results status="passed"><attributes-list>
+<volume-attributes><volume-id-attributes><name>vol1</name></volume-id-attributes></volume-attributes>
+<volume-attributes><volume-id-attributes><name>vol\x08\x082</name></volume-id-attributes></volume-attributes>
+</attributes-list><next-tag>tag1</next-tag><num-records>2</num-records></results></netapp>
+'''
+
+ZAPI_FAILURE = b'''<?xml version='1.0' encoding='UTF-8' ?>
+<netapp version='1.160' xmlns='http://www.netapp.com/filer/admin'>
+<results status="failed" errno="13005" reason="Unable to find API: bad-get-iter"/></netapp>
+'''
+
+
+def create_zapi_stream_connection(response):
+    zapi_cx = netapp_utils.setup_na_ontap_zapi(create_module(mock_args()))
+    zapi_cx._opener = Mock()
+    zapi_cx._opener.open.return_value = io.BytesIO(response)
+    zapi_cx._refresh_conn = False
+    return zapi_cx
+
+
+def test_sanitized_reader():
+    ''' BEL sequences and code points are removed or replaced, even when split across reads '''
+    data = b'<a>x\x07\r\ny\x07\nz\x08</a>'
+    for chunk_size in (1, 2, 3, 100):
+        reader = netapp_utils.SanitizedReader(io.BytesIO(data), [8], chunk_size)
+        chunks = list()
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        assert b''.join(chunks) == b'<a>xyz.</a>'
+
+
+def test_invoke_elem_records():
+    ''' records are yielded as they are parsed, and detached from the results '''
+    zapi_cx = create_zapi_stream_connection(ZAPI_RECORDS)
+    stream = zapi_cx.invoke_elem_records(netapp_utils.zapi.NaElement('volume-get-iter'))
+    names = [record['volume-id-attributes']['name'] for record in stream]
+    assert names == ['vol1', 'vol..2']
+    assert stream.results.get_child_content('next-tag') == 'tag1'
+    assert stream.results.get_child_content('num-records') == '2'
+    assert stream.results.get_child_by_name('attributes-list').get_children() == []
+
+
+def test_invoke_elem_records_failure():
+    ''' an API error is raised as with invoke_successfully '''
+    zapi_cx = create_zapi_stream_connection(ZAPI_FAILURE)
+    stream = zapi_cx.invoke_elem_records(netapp_utils.zapi.NaElement('bad-get-iter'))
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        list(stream)
+    assert exc.value.code == '13005'
+    assert exc.value.message == 'Unable to find API: bad-get-iter'
+
+
+def build_zapi_page(names, next_tag=None):
+    ''' build a get-iter response with one volume-attributes record per name '''
+    xml = netapp_utils.zapi.NaElement('results')
+    if names:
+        attributes = netapp_utils.zapi.NaElement('attributes-list')
+        for name in names:
+            attributes.translate_struct({'volume-attributes': {'volume-id-attributes': {'name': name}}})
+        xml.add_child_elem(attributes)
+    if next_tag is not None:
+        xml.add_new_child('next-tag', next_tag)
+    xml.add_new_child('num-records', str(len(names)))
+    return xml
+
+
+def test_iter_zapi_records():
+    ''' query and desired-attributes are sent with every page, next-tag is followed '''
+    server = Mock()
+    server.invoke_successfully.side_effect = [build_zapi_page(['vol1', 'vol2'], 'tag1'), build_zapi_page([], 'tag2'), build_zapi_page(['vol3'])]
+    children = [{'query': {'volume-attributes': {'volume-id-attributes': {'vserver': 'svm1'}}}},
+                {'desired-attributes': {'volume-attributes': {'volume-id-attributes': ['name']}}}]
+    records = netapp_utils.iter_zapi_records(server, 'volume-get-iter', children, max_records=2)
+    names = [record['volume-id-attributes']['name'] for record in records]
+    assert names == ['vol1', 'vol2', 'vol3']
+    requests = [args[0][0] for args in server.invoke_successfully.call_args_list]
+    assert [request.get_child_content('tag') for request in requests] == [None, 'tag1', 'tag2']
+    for request in requests:
+        assert request.get_child_content('max-records') == '2'
+        assert request['query']['volume-attributes']['volume-id-attributes'].get_child_content('vserver') == 'svm1'
+        assert request['desired-attributes']['volume-attributes']['volume-id-attributes'].get_child_by_name('name') is not None
+
+
+def test_iter_zapi_records_streamed():
+    ''' with a OntapZAPICx connection, each page is parsed incrementally '''
+    zapi_cx = create_zapi_stream_connection(ZAPI_RECORDS)
+    last_page = ZAPI_RECORDS.replace(b'vol1', b'vol3').replace(b'<next-tag>tag1</next-tag>', b'')
+    zapi_cx._opener.open.side_effect = [io.BytesIO(ZAPI_RECORDS), io.BytesIO(last_page)]
+    records = netapp_utils.iter_zapi_records(zapi_cx, 'volume-get-iter')
+    names = [record['volume-id-attributes']['name'] for record in records]
+    assert names == ['vol1', 'vol..2', 'vol3', 'vol..2']
+    assert zapi_cx._opener.open.call_count == 2
+
+
+ZAPI_VERSION = b'''<?xml version='1.0' encoding='UTF-8' ?>
+<netapp version='1.160' xmlns='http://www.netapp.com/filer/admin'>
+<results status="passed"><version>NetApp Release 9.8</version></results></netapp>
+'''
+
+
+class ZAPIStubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    ''' local ZAPI server, counting TCP connections and requests '''
+    protocol_version = 'HTTP/1.1'
+    # headers and body are sent separately, avoid waiting for a delayed ACK on a keep-alive connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        self.server.connections += 1
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+
+    def do_POST(self):
+        self.server.requests.append(self.rfile.read(int(self.headers['Content-Length'])))
+        body = ZAPI_VERSION if self.server.status == 200 else b''
+        self.send_response(self.server.status)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ZAPIStubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def zapi_stub():
+    server = ZAPIStubServer(('127.0.0.1', 0), ZAPIStubHandler)
+    server.connections = 0
+    server.requests = list()
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, kwargs=dict(poll_interval=0.05))
+    thread.daemon = True
+    thread.start()
+    netapp_utils.ZAPI_SESSIONS.clear()
+    yield server
+    for session in netapp_utils.ZAPI_SESSIONS.values():
+        session.close()
+    netapp_utils.ZAPI_SESSIONS.clear()
+    server.shutdown()
+    server.server_close()
+
+
+def create_zapi_stub_module(port, feature_flags=None):
+    args = mock_args(feature_flags)
+    args.update(hostname='127.0.0.1', http_port=port, https=False)
+    module = create_module(args)
+    module.fail_json = fail_json
+    return module
+
+
+def test_zapi_keep_alive(zapi_stub):
+    ''' vserver and cluster connections to the same host share a single keep-alive connection '''
+    module = create_zapi_stub_module(zapi_stub.server_port)
+    cluster = netapp_utils.setup_na_ontap_zapi(module)
+    vserver = netapp_utils.setup_na_ontap_zapi(module, vserver='svm1')
+    for dummy in range(3):
+        for server in (cluster, vserver):
+            result = server.invoke_successfully(netapp_utils.zapi.NaElement('system-get-version'), True)
+            assert result.get_child_content('version') == 'NetApp Release 9.8'
+    assert len(zapi_stub.requests) == 6
+    assert zapi_stub.connections == 1
+    assert b'vfiler="svm1"' in zapi_stub.requests[1]
+    assert b'vfiler' not in zapi_stub.requests[0]
+
+
+def test_zapi_keep_alive_streamed(zapi_stub):
+    ''' a streamed response releases the connection once consumed '''
+    module = create_zapi_stub_module(zapi_stub.server_port)
+    server = netapp_utils.setup_na_ontap_zapi(module)
+    for dummy in range(2):
+        stream = server.invoke_elem_records(netapp_utils.zapi.NaElement('system-get-version'))
+        assert list(stream) == []
+        assert stream.results.get_child_content('version') == 'NetApp Release 9.8'
+    assert zapi_stub.connections == 1
+
+
+def test_zapi_keep_alive_disabled(zapi_stub):
+    ''' with zapi_keep_alive disabled, urllib opens a new connection for each request '''
+    module = create_zapi_stub_module(zapi_stub.server_port, dict(zapi_keep_alive=False))
+    server = netapp_utils.setup_na_ontap_zapi(module)
+    for dummy in range(3):
+        server.invoke_successfully(netapp_utils.zapi.NaElement('system-get-version'), True)
+    assert zapi_stub.connections == 3
+    assert not netapp_utils.ZAPI_SESSIONS
+
+
+def test_zapi_keep_alive_http_error(zapi_stub):
+    ''' HTTP errors are reported as with urllib '''
+    zapi_stub.status = 401
+    module = create_zapi_stub_module(zapi_stub.server_port)
+    server = netapp_utils.setup_na_ontap_zapi(module)
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        server.invoke_successfully(netapp_utils.zapi.NaElement('system-get-version'), True)
+    assert exc.value.code == 401
+    assert exc.value.message == 'Unauthorized'
+
+
+def test_zapi_keep_alive_tls_error(zapi_stub):
+    ''' a TLS error is not retried, and is reported as with urllib '''
+    args = mock_args(dict(rest_connect_retries=3))
+    args.update(hostname='127.0.0.1', http_port=zapi_stub.server_port, https=True, validate_certs=True)
+    module = create_module(args)
+    module.fail_json = fail_json
+    server = netapp_utils.setup_na_ontap_zapi(module)
+    # the stub server does not speak TLS, the handshake fails
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        server.invoke_successfully(netapp_utils.zapi.NaElement('system-get-version'), True)
+    assert exc.value.code == 'URL error'
+    assert 'SSL' in exc.value.message
+    assert zapi_stub.connections == 1
+    assert not zapi_stub.requests
+
+
+def test_zapi_keep_alive_connection_refused():
+    ''' a refused connection is reported as with urllib '''
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    module = create_zapi_stub_module(port, dict(rest_connect_retries=0))
+    server = netapp_utils.setup_na_ontap_zapi(module)
+    with pytest.raises(netapp_utils.zapi.NaApiError) as exc:
+        server.invoke_successfully(netapp_utils.zapi.NaElement('system-get-version'), True)
+    assert exc.value.code == 'Unable to connect'
+    netapp_utils.ZAPI_SESSIONS.clear()
@@ -242,6 +242,37 @@ class TestMyModule(unittest.TestCase):
         result = my_obj.get_modified_attributes(current, desired, True)
         assert result == {'schedule': ['hourly', 'daily', 'daily']}
 
+    def test_get_modified_attributes_for_list_of_dicts_with_duplicates_diff(self):
+        ''' validate modified attributes for lists of nested dicts with duplicates with diff '''
+        rule1 = {'clients': ['10.0.0.1', '10.0.0.2'], 'protocols': {'nfs': True}}
+        rule2 = {'clients': ['10.0.0.3'], 'protocols': {'nfs': False}}
+        current = {'rules': [dict(rule1), dict(rule2)], 'state': 'present'}
+        desired = {'rules': [dict(rule2), dict(rule1), dict(rule1)], 'state': 'present'}
+        my_obj = na_helper()
+        result = my_obj.get_modified_attributes(current, desired, True)
+        assert result == {'rules': [rule1]}
+
+    def test_compare_lists_with_unhashable_items(self):
+        ''' validate the fallback to pairwise comparisons '''
+        class Unhashable(object):
+            __hash__ = None
+
+            def __eq__(self, other):
+                return isinstance(other, Unhashable)
+
+        current = [Unhashable(), 'a']
+        desired = ['a', Unhashable(), Unhashable()]
+        assert len(na_helper.compare_lists(current, desired, True)) == 1
+        assert na_helper.compare_lists(current, desired[:2], True) is None
+
+    def test_compare_lists_large_lists(self):
+        ''' validate the result for large lists, with the same semantics as pairwise comparisons '''
+        current = ['iqn.1998-01.com.vmware:host%d' % index for index in range(20000)]
+        desired = list(reversed(current[1000:])) + ['iqn.1998-01.com.vmware:new']
+        assert na_helper.compare_lists(current, desired, True) == ['iqn.1998-01.com.vmware:new']
+        assert na_helper.compare_lists(current, desired, False) == desired
+        assert na_helper.compare_lists(current, list(reversed(current)), True) is None
+
     def test_is_rename_action_for_empty_input(self):
         ''' validate rename action for input None '''
         source = None
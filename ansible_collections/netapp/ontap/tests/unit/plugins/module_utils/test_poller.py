@@ -0,0 +1,95 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils poller.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
+
+from ansible_collections.netapp.ontap.plugins.module_utils.poller import Poller, summarize_states
+
+
+def poll_sequence(responses):
+    ''' return a poll function returning each response in turn, the last one is repeated '''
+    responses = list(responses)
+
+    def poll_function():
+        if len(responses) > 1:
+            return responses.pop(0)
+        return responses[0]
+    return poll_function
+
+
+@patch('time.sleep')
+def test_done_on_first_poll(mock_sleep):
+    poller = Poller(60)
+    assert poller.poll(poll_sequence([('success', True, None)])) == ('success', None)
+    assert not poller.timed_out
+    mock_sleep.assert_not_called()
+
+
+@patch('time.sleep')
+def test_exponential_backoff(mock_sleep):
+    poller = Poller(600, max_interval=10)
+    responses = [('running', False, None)] * 6 + [('success', True, None)]
+    assert poller.poll(poll_sequence(responses)) == ('success', None)
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [1, 2, 4, 8, 10, 10]
+    assert poller.states == ['running'] * 6 + ['success']
+
+
+@patch('time.sleep')
+def test_fixed_interval(mock_sleep):
+    poller = Poller(600, max_interval=5, initial_interval=5)
+    responses = [('running', False, None)] * 3 + [('success', True, None)]
+    assert poller.poll(poll_sequence(responses)) == ('success', None)
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [5, 5, 5]
+
+
+@patch('time.sleep')
+def test_timeout(mock_sleep):
+    ''' elapsed time includes sleep time, so that a patched sleep does not loop forever '''
+    poller = Poller(10, max_interval=4)
+    assert poller.poll(poll_sequence([('running', False, None)])) == ('running', None)
+    assert poller.timed_out
+    # last sleep is capped by the time left
+    assert [call[0][0] for call in mock_sleep.call_args_list] == [1, 2, 4, 3]
+    assert poller.summarize_states() == ('running*5', 'running')
+
+
+@patch('time.sleep')
+def test_timeout_0_polls_once(mock_sleep):
+    poller = Poller(0)
+    assert poller.poll(poll_sequence([('running', False, None)])) == ('running', None)
+    assert poller.timed_out
+    mock_sleep.assert_not_called()
+
+
+@patch('time.sleep')
+def test_consecutive_errors(mock_sleep):
+    poller = Poller(600, max_consecutive_errors=3)
+    responses = [('running', False, None), (None, False, 'error1'), (None, False, 'error2'), (None, False, 'error3')]
+    assert poller.poll(poll_sequence(responses)) == ('running', 'error3')
+    assert not poller.timed_out
+    assert poller.errors == ['error1', 'error2', 'error3']
+    assert poller.states == ['running']
+
+
+@patch('time.sleep')
+def test_errors_are_reset_on_success(mock_sleep):
+    poller = Poller(600, max_consecutive_errors=2)
+    responses = [(None, False, 'error1'), ('running', False, None), (None, False, 'error2'), ('success', True, None)]
+    assert poller.poll(poll_sequence(responses)) == ('success', None)
+    assert poller.errors == ['error1', 'error2']
+
+
+@patch('time.sleep')
+def test_errors_are_retried_until_timeout(mock_sleep):
+    poller = Poller(5)
+    assert poller.poll(poll_sequence([(None, False, 'error')])) == (None, 'error')
+    assert poller.timed_out
+
+
+def test_summarize_states():
+    assert summarize_states([]) == ('', '')
+    assert summarize_states(['false', 'false', 'true', 'false']) == ('false*2truefalse', 'false')
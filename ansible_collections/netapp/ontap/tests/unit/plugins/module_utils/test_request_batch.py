@@ -0,0 +1,122 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils request_batch.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+import time
+
+import pytest
+
+from ansible_collections.netapp.ontap.plugins.module_utils import task_runner
+from ansible_collections.netapp.ontap.plugins.module_utils.request_batch import RequestBatch
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import TaskModule
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+class MockModule(object):
+    ''' minimal module, with a fail_json method '''
+
+    def fail_json(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """function to patch over fail_json; package return data into an exception"""
+        kwargs['failed'] = True
+        raise AnsibleFailJson(kwargs)
+
+
+class MockRestAPI(object):
+    ''' record PATCH requests, return an error for the APIs in errors '''
+
+    def __init__(self, errors=None):
+        self.calls = list()
+        self.errors = errors or dict()
+
+    def patch(self, api, body, params=None):
+        self.calls.append((api, body, params))
+        return dict(), self.errors.get(api)
+
+
+def echo(value, delay=0):
+    time.sleep(delay)
+    return value
+
+
+def fail(module, msg):
+    TaskModule(module).fail_json(msg=msg)
+
+
+def test_rest_patch_error():
+    rest_api = MockRestAPI(dict(api1='expected error'))
+    batch = RequestBatch(MockModule(), 2)
+    batch.add_rest_patch('patch1', rest_api, 'api1', dict(comment='x'))
+    batch.add_rest_patch('patch2', rest_api, 'api2', dict(size=10), dict(sizing_method='add_new_resources'))
+    results, errors = batch.run()
+    assert list(results) == ['patch2']
+    assert errors == dict(patch1='Error: calling api: api1: expected error')
+    assert sorted(rest_api.calls) == [
+        ('api1', dict(comment='x'), None),
+        ('api2', dict(size=10), dict(sizing_method='add_new_resources')),
+    ]
+
+
+@pytest.mark.parametrize('max_concurrency', [2, 4])
+def test_errors_are_reported_together(max_concurrency):
+    ''' all requests are run, and errors are reported in order once they complete '''
+    module = MockModule()
+    batch = RequestBatch(module, max_concurrency)
+    batch.add('error1', fail, dict(module=module, msg='error 1'))
+    batch.add('ok', echo, dict(value='ok', delay=0.1))
+    batch.add('error2', fail, dict(module=module, msg='error 2'))
+    batch.add('last', echo, dict(value='last'), depends_on=['ok', 'error2'])
+    with pytest.raises(AnsibleFailJson) as exc:
+        batch.run_or_fail()
+    assert exc.value.args[0]['msg'] == 'error 1 --- error 2 --- Skipped task last as task error2 failed'
+
+
+def test_serial_batch_stops_at_first_error():
+    ''' with max_concurrency set to 1, requests after a failed one are skipped, and only the first error is reported '''
+    module = MockModule()
+    rest_api = MockRestAPI()
+    batch = RequestBatch(module)
+    batch.add('ok', echo, dict(value='ok'))
+    batch.add('error1', fail, dict(module=module, msg='error 1'))
+    batch.add('error2', fail, dict(module=module, msg='error 2'))
+    batch.add_rest_patch('patch', rest_api, 'api1', dict(comment='x'))
+    results, errors = batch.run()
+    assert results == dict(ok='ok')
+    assert errors == dict(error1='error 1',
+                          error2='Skipped task error2 as task error1 failed',
+                          patch='Skipped task patch as task error1 failed')
+    assert rest_api.calls == list()
+    with pytest.raises(AnsibleFailJson) as exc:
+        batch.run_or_fail()
+    assert exc.value.args[0]['msg'] == 'error 1'
+
+
+def rendezvous(events, index):
+    ''' signal this request started, and wait for the other requests to start, return True if they all did '''
+    events[index].set()
+    return all(event.wait(10) for event in events)
+
+
+@pytest.mark.skipif(not task_runner.HAS_FUTURES, reason='requests are run one after the other without concurrent.futures')
+def test_requests_run_concurrently():
+    ''' each request waits for the other ones to start '''
+    events = [threading.Event() for dummy in range(4)]
+    batch = RequestBatch(MockModule(), 4)
+    for index in range(4):
+        batch.add(str(index), rendezvous, dict(events=events, index=index))
+    results = batch.run_or_fail()
+    assert list(results.values()) == [True] * 4
+
+
+def test_duplicate_name():
+    batch = RequestBatch(MockModule())
+    batch.add('name', echo, dict(value=1))
+    with pytest.raises(AnsibleFailJson) as exc:
+        batch.add('name', echo, dict(value=2))
+    assert exc.value.args[0]['msg'] == 'Internal error: duplicate request name in batch: name'
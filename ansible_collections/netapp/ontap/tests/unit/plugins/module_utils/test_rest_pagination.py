@@ -0,0 +1,83 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils rest_pagination.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+
+import pytest
+
+from ansible_collections.netapp.ontap.plugins.module_utils import rest_pagination
+
+
+def page(names, next_href=None):
+    ''' build a REST response for a page of records '''
+    links = dict(self=dict(href='dummy'))
+    if next_href is not None:
+        links['next'] = dict(href=next_href)
+    return dict(records=[dict(name=name) for name in names], num_records=len(names), _links=links)
+
+
+class MockRestAPI(object):
+    ''' return canned responses, record calls '''
+
+    def __init__(self, responses):
+        self.responses = dict(responses)
+        self.calls = list()
+        self.threads = set()
+
+    def get(self, api, params=None):
+        self.calls.append((api, params))
+        self.threads.add(threading.current_thread())
+        return self.responses[api]
+
+
+def pages():
+    ''' responses are modified in place, build a new set for each test '''
+    return {
+        'storage/volumes': (page(['vol1', 'vol2'], '/api/storage/volumes?start.uuid=2&max_records=2'), None),
+        'storage/volumes?start.uuid=2&max_records=2': (page(['vol3', 'vol4'], '/api/storage/volumes?start.uuid=4&max_records=2'), None),
+        'storage/volumes?start.uuid=4&max_records=2': (page(['vol5']), None),
+    }
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_get_all_records(prefetch):
+    ''' records from all pages are merged '''
+    rest_api = MockRestAPI(pages())
+    response, error = rest_pagination.get_all_records(rest_api, 'storage/volumes', dict(max_records=2), prefetch=prefetch)
+    assert error is None
+    assert [record['name'] for record in response['records']] == ['vol1', 'vol2', 'vol3', 'vol4', 'vol5']
+    assert response['num_records'] == 5
+    assert 'next' not in response['_links']
+    assert rest_api.calls[0] == ('storage/volumes', dict(max_records=2))
+    assert len(rest_api.calls) == 3
+    assert (len(rest_api.threads) == 2) == prefetch
+
+
+def test_get_all_records_error_on_next_page():
+    ''' error is reported '''
+    responses = pages()
+    responses['storage/volumes?start.uuid=4&max_records=2'] = (None, 'Expected error')
+    response, error = rest_pagination.get_all_records(MockRestAPI(responses), 'storage/volumes')
+    assert response is None
+    assert error == 'Expected error'
+
+
+def test_iter_pages_stop_early():
+    ''' caller can stop once a record is found '''
+    rest_api = MockRestAPI(pages())
+    for response, dummy in rest_pagination.iter_pages(rest_api, 'storage/volumes'):
+        if 'vol3' in [record['name'] for record in response['records']]:
+            break
+    # the next page may have been prefetched, but not the one after
+    assert len(rest_api.calls) <= 3
+
+
+def test_get_next_api():
+    ''' next link is relative to /api/ '''
+    assert rest_pagination.get_next_api(page([], '/api/storage/volumes?start.uuid=2')) == 'storage/volumes?start.uuid=2'
+    assert rest_pagination.get_next_api(page([])) is None
+    assert rest_pagination.get_next_api(None) is None
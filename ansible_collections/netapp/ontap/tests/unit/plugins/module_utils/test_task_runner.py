@@ -0,0 +1,224 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils task_runner.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+import time
+
+import pytest
+
+from ansible_collections.netapp.ontap.plugins.module_utils import task_runner
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+class MockModule(object):
+    ''' minimal module, with a fail_json method '''
+
+    def __init__(self):
+        self.params = dict(hostname='host')
+
+    def fail_json(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """function to patch over fail_json; package return data into an exception"""
+        kwargs['failed'] = True
+        raise AnsibleFailJson(kwargs)
+
+
+def echo(value, delay=0, log=None):
+    ''' return value after some delay, record start order '''
+    if log is not None:
+        log.append(value)
+    time.sleep(delay)
+    return value
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_results_are_ordered(max_concurrency):
+    ''' results follow the task order, whatever the completion order '''
+    tasks = [
+        ('slow', echo, dict(value='slow', delay=0.2)),
+        ('fast', echo, dict(value='fast')),
+        ('medium', echo, dict(value='medium', delay=0.1)),
+    ]
+    results = task_runner.run_tasks(MockModule(), tasks, max_concurrency)
+    assert list(results.items()) == [('slow', 'slow'), ('fast', 'fast'), ('medium', 'medium')]
+
+
+def rendezvous(events, index):
+    ''' signal this task started, and wait for the other tasks to start, return True if they all did '''
+    events[index].set()
+    return all(event.wait(10) for event in events)
+
+
+@pytest.mark.skipif(not task_runner.HAS_FUTURES, reason='tasks are run one after the other without concurrent.futures')
+def test_tasks_run_concurrently():
+    ''' 4 tasks in parallel, each task waits for the other ones to start '''
+    events = [threading.Event() for dummy in range(4)]
+    tasks = [(str(index), rendezvous, dict(events=events, index=index)) for index in range(4)]
+    results = task_runner.run_tasks(MockModule(), tasks, 4)
+    assert list(results.values()) == [True] * 4
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_dependencies(max_concurrency):
+    ''' a task is started after its dependencies '''
+    log = list()
+    results = dict(existing='value')
+
+    def dependent():
+        # the dependency result is visible
+        log.append('dependent')
+        return results['first'] + '_dependent'
+
+    tasks = [
+        ('dependent', dependent, dict()),
+        ('first', echo, dict(value='first', delay=0.1, log=log)),
+        ('other', echo, dict(value='other', log=log)),
+    ]
+    dependencies = dict(dependent=['first', 'not_scheduled'])
+    task_runner.run_tasks(MockModule(), tasks, max_concurrency, dependencies, results)
+    assert log.index('first') < log.index('dependent')
+    assert list(results.items()) == [('existing', 'value'), ('dependent', 'first_dependent'), ('first', 'first'), ('other', 'other')]
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_circular_dependency(max_concurrency):
+    ''' report an error '''
+    tasks = [
+        ('first', echo, dict(value='first')),
+        ('second', echo, dict(value='second')),
+    ]
+    dependencies = dict(first=['second'], second=['first'])
+    with pytest.raises(AnsibleFailJson) as exc:
+        task_runner.run_tasks(MockModule(), tasks, max_concurrency, dependencies)
+    assert exc.value.args[0]['msg'] == "Internal error: circular dependency between tasks: ['first', 'second']"
+
+
+@pytest.mark.skipif(not task_runner.HAS_FUTURES, reason='tasks are run in the main thread without concurrent.futures')
+def test_fail_json_in_thread():
+    ''' the first failure in task order is reported from the main thread, the module is not modified '''
+    module = MockModule()
+    threads = list()
+
+    def failure(msg, delay=0):
+        time.sleep(delay)
+        threads.append(threading.current_thread())
+        task_runner.TaskModule(module).fail_json(msg=msg)
+
+    tasks = [
+        ('ok', echo, dict(value='ok')),
+        ('error1', failure, dict(msg='error1', delay=0.1)),
+        ('error2', failure, dict(msg='error2')),
+    ]
+    with pytest.raises(AnsibleFailJson) as exc:
+        task_runner.run_tasks(module, tasks, 4)
+    assert exc.value.args[0]['msg'] == 'error1'
+    assert threading.current_thread() not in threads
+    assert 'fail_json' not in vars(module)
+
+
+def test_fail_json_serially():
+    ''' a failure is reported with module.fail_json, later tasks are not run '''
+    module = MockModule()
+    log = list()
+
+    def failure(msg):
+        task_runner.TaskModule(module).fail_json(msg=msg)
+
+    tasks = [
+        ('error', failure, dict(msg='error')),
+        ('ok', echo, dict(value='ok', log=log)),
+    ]
+    with pytest.raises(AnsibleFailJson) as exc:
+        task_runner.run_tasks(module, tasks, 1)
+    assert exc.value.args[0]['msg'] == 'error'
+    assert log == list()
+
+
+def test_exception_in_thread():
+    ''' an unexpected exception is raised again '''
+    tasks = [
+        ('ok', echo, dict(value='ok')),
+        ('error', echo, dict()),
+    ]
+    with pytest.raises(TypeError):
+        task_runner.run_tasks(MockModule(), tasks, 4)
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_errors_are_recorded(max_concurrency):
+    ''' with errors, failures do not fail the module, dependent tasks are skipped, other tasks complete '''
+    module = MockModule()
+
+    def failure(msg):
+        task_runner.TaskModule(module).fail_json(msg=msg)
+
+    tasks = [
+        ('error', failure, dict(msg='error')),
+        ('dependent', echo, dict(value='dependent')),
+        ('exception', echo, dict()),
+        ('ok', echo, dict(value='ok', delay=0.1)),
+    ]
+    errors = dict()
+    results = task_runner.run_tasks(module, tasks, max_concurrency, dict(dependent=['error']), errors=errors)
+    assert list(results.items()) == [('ok', 'ok')]
+    assert sorted(errors) == ['dependent', 'error', 'exception']
+    assert errors['error'] == 'error'
+    assert errors['dependent'] == 'Skipped task dependent as task error failed'
+    assert errors['exception'].startswith('Error in task exception: TypeError(')
+    assert 'fail_json' not in vars(module)
+
+
+class Worker(object):
+    ''' a task object, reporting errors with self.module.fail_json '''
+
+    def __init__(self, module, max_concurrency):
+        self.module = module
+        self.max_concurrency = max_concurrency
+
+    def fail(self, msg):
+        self.module.fail_json(msg=msg)
+
+    def host(self):
+        return self.module.params['hostname']
+
+    def run_inner_tasks(self, prefix, fail):
+        ''' nested run_tasks, report all inner errors with self.module.fail_json '''
+        worker = task_runner.task_worker(self)
+        tasks = [
+            (prefix + '_ok', worker.host, dict()),
+            (prefix + '_error', worker.fail, dict(msg=prefix + ' error')),
+        ]
+        if not fail:
+            tasks.pop()
+        errors = dict()
+        results = task_runner.run_tasks(self.module, tasks, self.max_concurrency, errors=errors)
+        if errors:
+            self.module.fail_json(msg=' and '.join(errors[name] for name in sorted(errors)))
+        return results
+
+
+@pytest.mark.parametrize('max_concurrency', [1, 4])
+def test_nested_run_tasks(max_concurrency):
+    ''' each outer task runs its own tasks, inner errors are reported for the outer task, the module is not modified '''
+    module = MockModule()
+    outer = task_runner.task_worker(Worker(module, max_concurrency))
+    assert outer.module is not module
+    # nested workers wrap the module itself
+    assert task_runner.TaskModule(outer.module)._module is module
+    tasks = [(prefix, outer.run_inner_tasks, dict(prefix=prefix, fail=prefix.startswith('fail')))
+             for prefix in ('ok1', 'fail1', 'ok2', 'fail2')]
+    errors = dict()
+    results = task_runner.run_tasks(module, tasks, max_concurrency, errors=errors)
+    assert results == dict(ok1=dict(ok1_ok='host'), ok2=dict(ok2_ok='host'))
+    assert errors == dict(fail1='fail1 error', fail2='fail2 error')
+    assert 'fail_json' not in vars(module)
+    # and outside of any task, the module fails as usual
+    with pytest.raises(AnsibleFailJson) as exc:
+        Worker(module, max_concurrency).run_inner_tasks('fail3', True)
+    assert exc.value.args[0]['msg'] == 'fail3 error'
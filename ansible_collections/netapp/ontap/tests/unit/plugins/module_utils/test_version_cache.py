@@ -0,0 +1,68 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils version_cache.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+import tempfile
+
+from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch
+
+from ansible_collections.netapp.ontap.plugins.module_utils.version_cache import VersionCache
+
+
+def cache_path():
+    return os.path.join(tempfile.mkdtemp(), 'subdir', 'cache.json')
+
+
+def test_disabled():
+    path = cache_path()
+    cache = VersionCache(path, 0, 'host1')
+    assert not cache.enabled
+    cache.set('ontapi', '170')
+    assert cache.get('ontapi') is None
+    assert not os.path.exists(path)
+
+
+def test_set_get_invalidate():
+    path = cache_path()
+    cache = VersionCache(path, 60, 'host1')
+    other = VersionCache(path, 60, 'host2')
+    cache.set('ontapi', '170')
+    cache.set('rest', dict(status_code=200))
+    other.set('ontapi', '160')
+    assert cache.get('ontapi') == '170'
+    assert cache.get('rest') == dict(status_code=200)
+    assert other.get('ontapi') == '160'
+    cache.invalidate()
+    assert cache.get('ontapi') is None
+    assert other.get('ontapi') == '160'
+
+
+def test_expiry():
+    path = cache_path()
+    cache = VersionCache(path, 60, 'host1')
+    with patch('time.time', return_value=1000):
+        cache.set('ontapi', '170')
+    with patch('time.time', return_value=1059):
+        assert cache.get('ontapi') == '170'
+    with patch('time.time', return_value=1060):
+        assert cache.get('ontapi') is None
+        # expired entries are removed on write
+        VersionCache(path, 60, 'host2').set('ontapi', '160')
+    with open(path) as cache_file:
+        assert list(json.load(cache_file)) == ['host2']
+
+
+def test_unreadable_file_is_ignored():
+    path = cache_path()
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as cache_file:
+        cache_file.write('not json')
+    cache = VersionCache(path, 60, 'host1')
+    assert cache.get('ontapi') is None
+    cache.set('ontapi', '170')
+    assert cache.get('ontapi') == '170'
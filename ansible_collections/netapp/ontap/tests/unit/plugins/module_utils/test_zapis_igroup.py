@@ -0,0 +1,56 @@
+# Copyright (c) 2021 NetApp
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+''' unit tests for module_utils zapis_igroup.py '''
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.netapp.ontap.plugins.module_utils import zapis_igroup
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import TaskModule
+
+
+class AnsibleFailJson(Exception):
+    """Exception class to be raised by module.fail_json and caught by the test case"""
+
+
+class MockModule(object):
+    ''' minimal module, with a fail_json method '''
+
+    def fail_json(self, *args, **kwargs):  # pylint: disable=unused-argument
+        """function to patch over fail_json; package return data into an exception"""
+        kwargs['failed'] = True
+        raise AnsibleFailJson(kwargs)
+
+
+def new_summary():
+    return dict(igroup='ig1', added=list(), removed=list(), errors=dict())
+
+
+def test_modify_initiators():
+    ''' each initiator is added or removed with the requested ZAPI, and recorded in the summary '''
+    calls = list()
+    summary = new_summary()
+    zapis_igroup.modify_initiators(MockModule(), lambda initiator, zapi: calls.append((initiator, zapi)),
+                                   ['init1', 'init2'], 'igroup-remove', 2, summary)
+    assert sorted(calls) == [('init1', 'igroup-remove'), ('init2', 'igroup-remove')]
+    assert summary == dict(igroup='ig1', added=list(), removed=['init1', 'init2'], errors=dict())
+
+
+def test_modify_initiators_errors():
+    ''' all initiators are tried, errors are reported in the initiators order '''
+    module = MockModule()
+
+    def modify_initiator(initiator, zapi):
+        if initiator != 'init2':
+            TaskModule(module).fail_json(msg='error for %s with %s' % (initiator, zapi))
+
+    summary = new_summary()
+    with pytest.raises(AnsibleFailJson) as exc:
+        zapis_igroup.modify_initiators(module, modify_initiator, ['init1', 'init2', 'init3'], 'igroup-add', 1, summary)
+    assert exc.value.args[0]['msg'] == \
+        'Error modifying initiators in igroup ig1: error for init1 with igroup-add; error for init3 with igroup-add'
+    assert exc.value.args[0]['initiators_summary'] is summary
+    assert summary['added'] == ['init2']
+    assert sorted(summary['errors']) == ['init1', 'init3']
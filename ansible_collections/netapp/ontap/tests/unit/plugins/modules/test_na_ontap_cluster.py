@@ -66,6 +66,12 @@ class MockONTAPConnection(object):
             xml = self.build_cluster_info_success()
         elif self.type == 'cluster_add':
             xml = self.build_add_node_info()
+        elif self.type == 'cluster_no_record_yet':
+            self.type = 'cluster'   # progress record present on second call
+            xml = netapp_utils.zapi.NaElement('xml')
+        elif self.type == 'cluster_add_no_record_yet':
+            self.type = 'cluster_add'   # progress record present on second call
+            xml = netapp_utils.zapi.NaElement('xml')
         elif self.type == 'cluster_extra_input':
             self.type = 'cluster'   # success on second call
             raise netapp_utils.zapi.NaApiError(code='TEST1', message="Extra input: single-node-cluster")
@@ -273,6 +279,19 @@ class TestMyModule(unittest.TestCase):
         add_node.assert_called_with()
         assert exc.value.args[0]['changed']
 
+    @patch('time.sleep')
+    def test_wait_without_status_record(self, sleep_mock):
+        ''' an empty first response is retried, for cluster create and node add '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        my_obj.server = MockONTAPConnection('cluster_no_record_yet')
+        assert my_obj.cluster_create_wait()
+        assert sleep_mock.call_count == 1
+        my_obj.server = MockONTAPConnection('cluster_add_no_record_yet')
+        my_obj.node_add_wait()
+        assert sleep_mock.call_count == 2
+        assert my_obj.server.type == 'cluster_add'
+
     def test_if_all_methods_catch_exception(self):
         module_args = {}
         module_args.update(self.set_default_args())
@@ -38,6 +38,14 @@ SRR = {
              protocol='fcp',
              os_type='aix')
     ], num_records=1), None),
+    'igroup_record_initiators': (200, dict(records=[
+        dict(uuid='a1b2c3',
+             name='test',
+             svm=dict(name='vserver'),
+             initiators=[dict(name='init1'), dict(name='init2'), dict(name='init3')],
+             protocol='fcp',
+             os_type='linux')
+    ], num_records=1), None),
 }
 
 
@@ -85,6 +93,10 @@ class MockONTAPConnection(object):
             xml = self.build_igroup()
         if self.kind == 'igroup_no_initiators':
             xml = self.build_igroup_no_initiators()
+        if self.kind == 'igroup_no_initiators_add_fail':
+            if xml.get_name() == 'igroup-add' and xml.get_child_content('initiator') == self.data:
+                raise netapp_utils.zapi.NaApiError(code='TEST', message="This exception is from the unit test")
+            xml = self.build_igroup_no_initiators()
         self.xml_out = xml
         return xml
 
@@ -160,7 +172,7 @@ class TestMyModule(unittest.TestCase):
             'use_rest': use_rest
         }
 
-    def get_igroup_mock_object(self, kind=None):
+    def get_igroup_mock_object(self, kind=None, data=None):
         """
         Helper method to return an na_ontap_igroup object
         :param kind: passes this param to MockONTAPConnection()
@@ -171,7 +183,7 @@ class TestMyModule(unittest.TestCase):
         if kind is None:
             obj.server = MockONTAPConnection()
         else:
-            obj.server = MockONTAPConnection(kind=kind)
+            obj.server = MockONTAPConnection(kind=kind, data=data)
         return obj
 
     def test_module_fail_when_required_args_missing(self):
@@ -340,6 +352,51 @@ class TestMyModule(unittest.TestCase):
         expected_call = call('PATCH', 'protocols/san/igroups/a1b2c3', None, json={'os_type': 'linux'})
         assert expected_call in mock_request.mock_calls
 
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_successful_remove_initiators_rest(self, mock_request):
+        ''' Test initiators are removed with a single DELETE '''
+        data = self.mock_args('always')
+        data.pop('bind_portset')
+        set_module_args(data)
+        mock_request.side_effect = [
+            SRR['is_rest'],
+            SRR['igroup_record_initiators'],    # get
+            SRR['empty_good'],                  # delete (remove initiators)
+            SRR['end_of_sequence']
+        ]
+        with pytest.raises(AnsibleExitJson) as exc:
+            igroup().apply()
+        assert exc.value.args[0]['changed']
+        expected_call = call('DELETE', 'protocols/san/igroups/a1b2c3/initiators', {'name': 'init2|init3'}, json=None)
+        assert expected_call in mock_request.mock_calls
+        assert exc.value.args[0]['initiators_summary'] == dict(igroup='test', added=[], removed=['init2', 'init3'], errors={})
+
+    def test_successful_add_initiators_concurrently(self):
+        ''' Test initiators are added in parallel, and reported in initiators_summary '''
+        data = self.mock_args()
+        data['initiators'] = ['init1', 'init2', 'init3']
+        data['max_concurrency'] = 2
+        set_module_args(data)
+        with pytest.raises(AnsibleExitJson) as exc:
+            self.get_igroup_mock_object('igroup_no_initiators').apply()
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['initiators_summary'] == dict(igroup='test', added=['init1', 'init2', 'init3'], removed=[], errors={})
+
+    def test_negative_add_initiators_concurrently(self):
+        ''' Test all initiators are tried, and errors are reported for each initiator '''
+        data = self.mock_args()
+        data['initiators'] = ['init1', 'init2', 'init3']
+        data['max_concurrency'] = 2
+        set_module_args(data)
+        with pytest.raises(AnsibleFailJson) as exc:
+            self.get_igroup_mock_object('igroup_no_initiators_add_fail', 'init2').apply()
+        msg = 'Error modifying initiators in igroup test: Error modifying igroup initiator init2 in test: ' \
+              'NetApp API failed. Reason - TEST:This exception is from the unit test'
+        assert exc.value.args[0]['msg'] == msg
+        summary = exc.value.args[0]['initiators_summary']
+        assert summary['added'] == ['init1', 'init3']
+        assert list(summary['errors']) == ['init2']
+
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_igroup.NetAppOntapIgroup.get_igroup')
     def test_successful_rename(self, get_vserver):
         '''Test successful rename'''
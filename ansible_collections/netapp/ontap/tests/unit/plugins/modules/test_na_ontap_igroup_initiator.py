@@ -170,6 +170,19 @@ class TestMyModule(unittest.TestCase):
         assert data['name'] not in current
         assert exc.value.args[0]['changed']
 
+    def test_successful_add_several(self):
+        ''' Test new initiators are added, and reported in initiators_summary '''
+        data = self.mock_args()
+        data['names'] = ['init1', 'iamnew', 'iamnew_too']
+        data.pop('name')
+        data['max_concurrency'] = 2
+        set_module_args(data)
+        obj = self.get_initiator_mock_object('initiator')
+        with pytest.raises(AnsibleExitJson) as exc:
+            obj.apply()
+        assert exc.value.args[0]['changed']
+        assert exc.value.args[0]['initiators_summary'] == dict(igroup='test', added=['iamnew', 'iamnew_too'], removed=[], errors={})
+
     def test_successful_add_idempotency(self):
         ''' Test successful add idempotency '''
         data = self.mock_args()
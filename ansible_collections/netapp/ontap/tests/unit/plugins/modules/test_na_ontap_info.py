@@ -6,7 +6,9 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 import json
+import os
 import sys
+import tempfile
 import pytest
 
 from ansible.module_utils import basic
@@ -20,7 +22,7 @@ from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info import __fin
 from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info \
     import NetAppONTAPGatherInfo as info_module  # module under test
 from ansible_collections.netapp.ontap.plugins.modules.na_ontap_info \
-    import convert_keys as info_convert_keys     # function under test
+    import zapi_to_dict as info_zapi_to_dict     # function under test
 
 if not netapp_utils.has_netapp_lib():
     pytestmark = pytest.mark.skip('skipping as missing required netapp_lib')
@@ -67,6 +69,13 @@ class MockONTAPConnection(object):
         self.xml_in = xml
         if self.type == 'vserver':
             xml = self.build_vserver_info()
+        elif self.type == 'vserver_paged':
+            xml = self.build_vserver_info()
+            xml.add_new_child('next-tag', 'next_tag')
+            # for the next call
+            self.type = 'vserver_page_2'
+        elif self.type == 'vserver_page_2':
+            xml = self.build_vserver_info('test_vserver_2')
         elif self.type == 'net_port':
             xml = self.build_net_port_info()
         elif self.type == 'net_port_no_ifgrp':
@@ -77,6 +86,9 @@ class MockONTAPConnection(object):
             self.type = 'net_ifgrp'
         elif self.type == 'net_ifgrp':
             xml = self.build_net_ifgrp_info()
+        elif self.type == 'ontapi':
+            xml = netapp_utils.zapi.NaElement('xml')
+            xml.add_new_child('minor-version', '170')
         elif self.type == 'zapi_error':
             error = netapp_utils.zapi.NaApiError('test', 'error')
             raise error
@@ -92,12 +104,12 @@ class MockONTAPConnection(object):
         return xml
 
     @staticmethod
-    def build_vserver_info():
+    def build_vserver_info(vserver='test_vserver'):
         ''' build xml data for vserser-info '''
         xml = netapp_utils.zapi.NaElement('xml')
         attributes = netapp_utils.zapi.NaElement('attributes-list')
         attributes.add_node_with_children('vserver-info',
-                                          **{'vserver-name': 'test_vserver'})
+                                          **{'vserver-name': vserver})
         xml.add_child_elem(attributes)
         return xml
 
@@ -193,6 +205,10 @@ class TestMyModule(unittest.TestCase):
             use_native_zapi_tags=dict(type='bool', required=False, default=False),
             continue_on_error=dict(type='list', required=False, default=['never']),
             query=dict(type='dict', required=False),
+            max_concurrency=dict(type='int', default=1, required=False),
+            output_format=dict(type='str', choices=['dict', 'columnar'], default='dict'),
+            output_file=dict(type='path', required=False),
+            summary=dict(type='bool', default=False),
         ))
         module = basic.AnsibleModule(
             argument_spec=argument_spec,
@@ -279,6 +295,36 @@ class TestMyModule(unittest.TestCase):
         assert result.get('node_0:ifgrp_0')
         assert result.get('node_1:ifgrp_1')
 
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_info.NetAppONTAPGatherInfo.ontapi')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_info.NetAppONTAPGatherInfo.send_ems_event')
+    def test_get_all_output_file(self, mock_ems_event, mock_ontapi):
+        '''each subset is written when gathered, and replaced with a summary unless another subset depends on it'''
+        args = self.mock_args()
+        args['output_file'] = os.path.join(tempfile.mkdtemp(), 'info.json')
+        set_module_args(args)
+        mock_ontapi.return_value = '170'
+        obj = self.get_info_mock_object('net_port_with_ifgrp')
+        written = list()
+        write_subset = obj.write_subset
+
+        def record_write_subset(subset, subset_info):
+            written.append((subset, obj.writer.count))
+            return write_subset(subset, subset_info)
+        obj.write_subset = record_write_subset
+        ontap_info = obj.get_all(['net_port_info', 'net_ifgrp_info'])
+        # net_port_info is kept for net_ifgrp_info
+        assert sorted(ontap_info['net_port_info']) == ['node_0:port_0', 'node_1:port_1']
+        assert ontap_info['net_ifgrp_info'] == dict(num_records=2)
+        assert written == [('net_port_info', 0), ('net_ifgrp_info', 2)]
+        assert obj.format_output(ontap_info) == dict(
+            ontapi_version=dict(), ontap_version=dict(), net_port_info=dict(num_records=2), net_ifgrp_info=dict(num_records=2))
+        with open(args['output_file'], 'rb') as output_file:
+            lines = [json.loads(line.decode('utf-8')) for line in output_file]
+        assert [(line['subset'], line.get('key')) for line in lines] == [
+            ('net_port_info', 'node_0:port_0'), ('net_port_info', 'node_1:port_1'),
+            ('net_ifgrp_info', 'node_0:ifgrp_0'), ('net_ifgrp_info', 'node_1:ifgrp_1'),
+            ('ontapi_version', None), ('ontap_version', None)]
+
     def test_ontapi_error(self):
         '''test ontapi will raise zapi error'''
         set_module_args(self.mock_args())
@@ -289,6 +335,15 @@ class TestMyModule(unittest.TestCase):
         # Keep both versions to keep the pipeline happy
         assert exc.value.args[0]['msg'] == 'Error calling API system-get-ontapi-version: NetApp API failed. Reason - test:error'
 
+    def test_ontapi_cached(self):
+        '''test ontapi version is read from the version cache when enabled'''
+        args = self.mock_args()
+        args['feature_flags'] = dict(version_cache_ttl=60, version_cache_path=os.path.join(tempfile.mkdtemp(), 'cache.json'))
+        set_module_args(args)
+        assert self.get_info_mock_object('ontapi').ontapi() == '170'
+        # no ZAPI call on second run
+        assert self.get_info_mock_object('zapi_error').ontapi() == '170'
+
     def test_call_api_error(self):
         '''test call_api will raise zapi error'''
         set_module_args(self.mock_args())
@@ -299,6 +354,43 @@ class TestMyModule(unittest.TestCase):
         # Keep both versions to keep the pipeline happy
         assert exc.value.args[0]['msg'] == 'Error calling API nvme-get-iter: NetApp API failed. Reason - test:error'
 
+    def test_call_api_next_tag(self):
+        '''test desired_attributes and query are sent with every page'''
+        args = self.mock_args()
+        args['desired_attributes'] = {'vserver-info': {'vserver-name': None}}
+        args['query'] = {'vserver-info': {'vserver-type': 'data'}}
+        set_module_args(args)
+        obj = self.get_info_mock_object('vserver_paged')
+        obj.sanitize_desired_attributes()
+        obj.sanitize_query()
+        result = obj.get_generic_get_iter('vserver-get-iter', attribute='vserver-info', key_fields='vserver-name')
+        assert sorted(result) == ['test_vserver', 'test_vserver_2']
+        request = obj.server.xml_in
+        assert request.get_child_content('tag') == 'next_tag'
+        assert request.get_child_by_name('desired-attributes').get_child_by_name('vserver-info').get_child_by_name('vserver-name') is not None
+        assert request['query']['vserver-info'].get_child_content('vserver-type') == 'data'
+
+    def test_to_columnar(self):
+        '''test indexed and listed records are converted, other subsets are unchanged'''
+        set_module_args(self.mock_args())
+        obj = self.get_info_mock_object()
+        ontap_info = dict(
+            volume_info={'vol1:svm1': {'volume_id_attributes': {'name': 'vol1'}},
+                         'vol2:svm1': {'volume_id_attributes': {'name': 'vol2'}}},
+            list_info=[{'k1': 'v1'}, {'k1': 'v2'}],
+            ontapi_version='170',
+            error_info={'error': 'some error'})
+        result = obj.to_columnar(ontap_info)
+        assert result['volume_info'] == dict(num_records=2, fields=['volume_id_attributes.name'], columns=[['vol1', 'vol2']],
+                                             keys=['vol1:svm1', 'vol2:svm1'])
+        assert result['list_info'] == dict(num_records=2, fields=['k1'], columns=[['v1', 'v2']])
+        assert result['ontapi_version'] == '170'
+        assert result['error_info'] == {'error': 'some error'}
+        lines = list(obj.iter_output_lines(ontap_info))
+        assert lines[0] == dict(subset='volume_info', key='vol1:svm1', record={'volume_id_attributes': {'name': 'vol1'}})
+        assert lines[2] == dict(subset='list_info', record={'k1': 'v1'})
+        assert lines[4] == dict(subset='ontapi_version', info='170')
+
     def test_find_item(self):
         '''test __find_item return expected key value'''
         obj = {"A": 1, "B": {"C": {"D": 2}}}
@@ -467,41 +559,52 @@ class TestMyModule(unittest.TestCase):
         # make sure there is no extra warnings (eg we found and removed all of them)
         assert obj.warnings == list()
 
-    @staticmethod
-    def d2us(astr):
-        return str.replace(astr, '-', '_')
-
-    def test_convert_keys_string(self):
-        ''' no conversion '''
-        key = 'a-b-c'
-        assert info_convert_keys(key) == key
-
-    def test_convert_keys_tuple(self):
-        ''' no conversion '''
-        key = 'a-b-c'
-        anobject = (key, key)
-        assert info_convert_keys(anobject) == anobject
-
-    def test_convert_keys_list(self):
-        ''' no conversion '''
-        key = 'a-b-c'
-        anobject = [key, key]
-        assert info_convert_keys(anobject) == anobject
-
-    def test_convert_keys_simple_dict(self):
-        ''' conversion of keys '''
-        key = 'a-b-c'
-        anobject = {key: 1}
-        assert list(info_convert_keys(anobject).keys())[0] == self.d2us(key)
-
-    def test_convert_keys_list_of_dict(self):
-        ''' conversion of keys '''
-        key = 'a-b-c'
-        anobject = [{key: 1}, {key: 2}]
-        converted = info_convert_keys(anobject)
-        for adict in converted:
-            for akey in adict:
-                assert akey == self.d2us(key)
+    def test_zapi_to_dict(self):
+        ''' conversion of a NaElement tree, including lists and empty elements '''
+        xml = netapp_utils.zapi.NaElement('volume-info')
+        xml.translate_struct({
+            'volume-id-attributes': {'name': 'vol1', 'owning-vserver-name': 'svm1'},
+            'empty-attribute': None,
+        })
+        ports = netapp_utils.zapi.NaElement('ports')
+        for port in ('e0a', 'e0b'):
+            ports.add_new_child('port', port)
+        xml.add_child_elem(ports)
+        expected = {
+            'volume-id-attributes': {'name': 'vol1', 'owning-vserver-name': 'svm1'},
+            'empty-attribute': None,
+            'ports': {'port': ['e0a', 'e0b']}
+        }
+        assert info_zapi_to_dict(xml) == expected
+        expected = {
+            'volume_id_attributes': {'name': 'vol1', 'owning_vserver_name': 'svm1'},
+            'empty_attribute': None,
+            'ports': {'port': ['e0a', 'e0b']}
+        }
+        assert info_zapi_to_dict(xml, translate_keys=True) == expected
+
+    def test_zapi_to_dict_with_namespace(self):
+        ''' XML namespace is ignored '''
+        response = b"<netapp version='1.180' xmlns='http://www.netapp.com/filer/admin'><results status='passed'>"
+        response += b"<attributes-list><vserver-info><vserver-name>svm1</vserver-name></vserver-info></attributes-list>"
+        response += b"<num-records>1</num-records></results></netapp>"
+        xml = netapp_utils.zapi.NaServer('host')._get_result(response)
+        result = info_zapi_to_dict(xml)
+        assert result == {'attributes-list': {'vserver-info': {'vserver-name': 'svm1'}}, 'num-records': '1'}
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.ems_log_event')
+    def test_get_generic_get_iter_translated_keys(self, mock_ems_log):
+        '''key fields are found when keys are translated'''
+        set_module_args(self.mock_args())
+        obj = self.get_info_mock_object('net_ifgrp')
+        result = obj.get_generic_get_iter(
+            'net-port-ifgrp-get',
+            attribute='net-ifgrp-info',
+            key_fields=('node', 'ifgrp-name'),
+            attributes_list_tag='attributes'
+        )
+        assert result['node_0:ifgrp_0'] == {'ifgrp_name': 'ifgrp_0', 'node': 'node_0'}
+        assert result['node_1:ifgrp_1'] == {'ifgrp_name': 'ifgrp_1', 'node': 'node_1'}
 
     def test_set_error_flags_error_n(self):
         ''' Check set_error__flags return correct dict '''
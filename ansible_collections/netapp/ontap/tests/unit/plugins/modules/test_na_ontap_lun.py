@@ -57,17 +57,24 @@ class MockONTAPConnection(object):
         self.parm1 = parm1
         self.xml_in = None
         self.xml_out = None
+        self.requests = list()
 
     def invoke_successfully(self, xml, enable_tunneling):  # pylint: disable=unused-argument
         ''' mock invoke_successfully returning xml data '''
         self.xml_in = xml
+        self.requests.append(xml)
         if self.type == 'lun':
             xml = self.build_lun_info(self.parm1)
+        elif self.type == 'lun_mapped':
+            if xml.get_name() == 'lun-map-get-iter':
+                xml = self.build_lun_map_info(self.parm1)
+            else:
+                xml = self.build_lun_info(self.parm1, mapped=True)
         self.xml_out = xml
         return xml
 
     @staticmethod
-    def build_lun_info(lun_name):
+    def build_lun_info(lun_name, mapped=False):
         ''' build xml data for lun-info '''
         xml = netapp_utils.zapi.NaElement('xml')
         lun = dict(
@@ -76,6 +83,8 @@ class MockONTAPConnection(object):
                 size=10
             )
         )
+        if mapped:
+            lun['lun_info']['mapped'] = 'true'
         attributes = {
             'num-records': 1,
             'attributes-list': [lun]
@@ -83,6 +92,20 @@ class MockONTAPConnection(object):
         xml.translate_struct(attributes)
         return xml
 
+    @staticmethod
+    def build_lun_map_info(lun_name):
+        ''' build xml data for lun-map-info, with a LUN mapped to two igroups '''
+        xml = netapp_utils.zapi.NaElement('xml')
+        attributes = {
+            'num-records': 2,
+            'attributes-list': [
+                {'lun-map-info': {'path': "/what/ever/%s" % lun_name, 'initiator-group': 'igroup1', 'lun-id': '1'}},
+                {'lun-map-info': {'path': "/what/ever/%s" % lun_name, 'initiator-group': 'igroup2', 'lun-id': '3'}},
+            ]
+        }
+        xml.translate_struct(attributes)
+        return xml
+
 
 class TestMyModule(unittest.TestCase):
     ''' a group of related Unit Tests '''
@@ -175,3 +198,57 @@ class TestMyModule(unittest.TestCase):
             self.get_lun_mock_object('lun', 'other_lun_name').apply()
         msg = 'Error renaming lun: lun_from_name does not exist'
         assert msg == exc.value.args[0]['msg']
+
+    def test_get_lun_exact_path(self):
+        ''' LUN is found with a query on its exact path, volume is not scanned '''
+        data = dict(self.mock_args())
+        data['name'] = '/what/ever/lun_name'
+        set_module_args(data)
+        my_obj = self.get_lun_mock_object('lun', 'lun_name')
+        lun = my_obj.get_lun(data['name'])
+        assert lun['path'] == '/what/ever/lun_name'
+        assert len(my_obj.server.requests) == 1
+        query = my_obj.server.requests[0].get_child_by_name('query').get_child_by_name('lun-info')
+        assert query.get_child_content('path') == '/what/ever/lun_name'
+        assert query.get_child_content('volume') is None
+
+    def test_get_lun_by_name(self):
+        ''' LUN is matched by name at the root of the volume or in a qtree, with a single query on its path '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object('lun', 'lun_name')
+        lun = my_obj.get_lun('lun_name')
+        assert lun['path'] == '/what/ever/lun_name'
+        assert len(my_obj.server.requests) == 1
+        query = my_obj.server.requests[0].get_child_by_name('query').get_child_by_name('lun-info')
+        assert query.get_child_content('path') == '/vol/vol_name/lun_name|/vol/vol_name/*/lun_name'
+        assert query.get_child_content('volume') is None
+
+    def test_get_lun_absent(self):
+        ''' LUN does not exist, all LUNs in the volume are not read '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object()
+        assert my_obj.get_lun('lun_name') is None
+        assert len(my_obj.server.requests) == 1
+        assert my_obj.get_lun('/vol/vol_name/lun_name') is None
+        assert len(my_obj.server.requests) == 2
+
+    def test_get_lun_mapped(self):
+        ''' LUN maps are read with a lun-map-get-iter query, the last map is reported '''
+        data = dict(self.mock_args())
+        data['name'] = '/what/ever/lun_name'
+        set_module_args(data)
+        my_obj = self.get_lun_mock_object('lun_mapped', 'lun_name')
+        lun = my_obj.get_lun(data['name'])
+        assert lun['attached_to'] == 'igroup2'
+        assert lun['lun_id'] == '3'
+        assert len(my_obj.server.requests) == 2
+        assert my_obj.server.requests[1].get_name() == 'lun-map-get-iter'
+
+    def test_get_lun_maps(self):
+        ''' maps for a LUN are returned by a single query on its path '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_lun_mock_object('lun_mapped', 'lun_name')
+        assert my_obj.get_lun_maps('/what/ever/lun_name') == [('igroup1', '1'), ('igroup2', '3')]
+        assert len(my_obj.server.requests) == 1
+        query = my_obj.server.requests[0].get_child_by_name('query').get_child_by_name('lun-map-info')
+        assert query.get_child_content('path') == '/what/ever/lun_name'
@@ -5,7 +5,11 @@
 
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
+import gzip
 import json
+import os
+import tempfile
+import time
 import pytest
 
 from ansible.module_utils import basic
@@ -541,3 +545,232 @@ class TestMyModule(unittest.TestCase):
             my_obj.apply()
         print('Info: test_get_all_records_for_volume_info_to_check_next_api_call_functionality_pass: %s' % repr(exc.value.args))
         assert exc.value.args[0]['ontap_info']['storage/volumes']['num_records'] == total_records
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_with_max_concurrency_pass(self, mock_request):
+        args = self.set_default_args()
+        args['gather_subset'] = ['svm/svms', 'storage/volumes', 'storage/aggregates']
+        args['max_concurrency'] = 3
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        calls = list()
+
+        def send_request(method, api, params, **kwargs):
+            calls.append(api)
+            if api == 'cluster':
+                return SRR['validate_ontap_version_pass']
+            if api == 'next_record_api':
+                return 200, dict(_links=dict(), records=[dict(name='vol3'), dict(name='vol4')]), None
+            # not using SRR, as records are modified in place
+            return 200, dict(_links=dict(next=dict(href='/api/next_record_api')), records=[dict(name='vol1'), dict(name='vol2')]), None
+        mock_request.side_effect = send_request
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print('Info: test_run_ontap_gather_facts_with_max_concurrency_pass: %s' % repr(exc.value.args))
+        assert list(exc.value.args[0]['ontap_info']) == args['gather_subset']
+        for subset in args['gather_subset']:
+            assert exc.value.args[0]['ontap_info'][subset]['num_records'] == 4
+        assert len(calls) == 7
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_with_query_and_subset_fields_pass(self, mock_request):
+        args = self.set_default_args()
+        args['gather_subset'] = ['volume_info', 'aggregate_info']
+        args['query'] = {'volume_info': {'svm.name': 'svm1', 'state': 'offline', 'max_records': 3}}
+        args['subset_fields'] = {'volume_info': ['name', 'state'], 'storage/aggregates': 'name'}
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        calls = list()
+
+        def send_request(method, api, params, **kwargs):
+            calls.append((api, params))
+            if api == 'cluster':
+                return SRR['validate_ontap_version_pass']
+            records = [dict(name='vol%d' % index) for index in range(2)]
+            links = dict(next=dict(href='/api/next_record_api')) if len(calls) < 5 else dict()
+            return 200, dict(_links=links, records=records), None
+        mock_request.side_effect = send_request
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print('Info: test_run_ontap_gather_facts_with_query_and_subset_fields_pass: %s' % repr(exc.value.args))
+        # max_records is honoured across pages
+        assert exc.value.args[0]['ontap_info']['storage/volumes']['num_records'] == 3
+        assert calls[1] == ('storage/volumes', {'max_records': 3, 'fields': 'name,state', 'svm.name': 'svm1', 'state': 'offline'})
+        assert calls[2] == ('next_record_api', None)
+        assert calls[3] == ('storage/aggregates', {'max_records': 1024, 'fields': 'name'})
+        assert len(calls) == 5
+
+    def test_run_ontap_gather_facts_with_query_for_missing_subset_fail(self):
+        args = self.set_default_args()
+        args['gather_subset'] = ['volume_info']
+        args['query'] = {'aggregate_info': {'name': 'aggr1'}}
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.get_options_per_subset('query', my_obj.convert_subsets())
+        assert exc.value.args[0]['msg'] == "Error: query: subset aggregate_info is not present in gather_subset: ['storage/volumes']"
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request', autospec=True)
+    def test_run_ontap_gather_facts_with_hosts_pass(self, mock_request):
+        args = self.set_default_args()
+        del args['hostname']
+        args['hosts'] = [dict(hostname='host1'), dict(hostname='host2', username='user2'), dict(hostname='host3')]
+        args['gather_subset'] = ['volume_info']
+        args['host_timeout'] = 1
+        args['output_file'] = os.path.join(tempfile.mkdtemp(), 'info.json')
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        calls = list()
+
+        def send_request(rest_api, method, api, params, **kwargs):
+            calls.append((rest_api.hostname, rest_api.username, api))
+            if rest_api.hostname == 'host2':
+                return SRR['validate_ontap_version_fail']
+            if api == 'cluster':
+                if rest_api.hostname == 'host3':
+                    time.sleep(1.1)
+                return SRR['validate_ontap_version_pass']
+            return 200, dict(_links=dict(), records=[dict(name='vol1')]), None
+        mock_request.side_effect = send_request
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print('Info: test_run_ontap_gather_facts_with_hosts_pass: %s' % repr(exc.value.args))
+        assert list(exc.value.args[0]['ontap_info']) == ['host1']
+        assert exc.value.args[0]['ontap_info']['host1']['storage/volumes']['num_records'] == 1
+        assert exc.value.args[0]['host_errors'] == {
+            'host2': 'API not found error',
+            'host3': 'Error: host_timeout: no response from host3 in 1 seconds.'}
+        assert ('host2', 'user2', 'cluster') in calls
+        assert ('host1', 'username', 'storage/volumes') in calls
+        assert ('host3', 'username', 'storage/volumes') not in calls
+        with open(args['output_file'], 'rb') as output_file:
+            lines = [json.loads(line.decode('utf-8')) for line in output_file]
+        assert lines == [dict(hostname='host1', subset='storage/volumes', record=dict(name='vol1'))]
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_with_hosts_fail(self, mock_request):
+        args = self.set_default_args()
+        del args['hostname']
+        args['hosts'] = [dict(hostname='host1'), dict(hostname='host2')]
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        mock_request.side_effect = [SRR['validate_ontap_version_fail']] * 2
+
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.apply()
+        assert exc.value.args[0]['msg'] == \
+            "Error: failed to gather information from all hosts: {'host1': 'API not found error', 'host2': 'API not found error'}"
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_incremental_pass(self, mock_request):
+        args = self.set_default_args()
+        args['gather_subset'] = ['support_ems_events', 'volume_info']
+        args['incremental'] = dict(path=tempfile.mkdtemp())
+        calls = list()
+        events = [dict(index=1, message='m1'), dict(index=2, message='m2')]
+        volumes = [dict(uuid='u1', name='vol1'), dict(uuid='u2', name='vol2')]
+
+        def send_request(method, api, params, **kwargs):
+            calls.append((api, params))
+            if api == 'cluster':
+                return SRR['validate_ontap_version_pass']
+            records = events if api == 'support/ems/events' else volumes
+            if params.get('index'):
+                records = [record for record in records if record['index'] > int(params['index'][1:])]
+            # records are modified in place
+            return 200, dict(_links=dict(), records=[dict(record) for record in records]), None
+        mock_request.side_effect = send_request
+
+        set_module_args(args)
+        with pytest.raises(AnsibleExitJson) as exc:
+            ontap_rest_info_module().apply()
+        delta = exc.value.args[0]['ontap_info_delta']
+        assert len(delta['support/ems/events']['added']) == 2
+        assert len(delta['storage/volumes']['added']) == 2
+
+        # second run, only new events are requested
+        events.append(dict(index=3, message='m3'))
+        volumes[1] = dict(uuid='u2', name='vol2_renamed')
+        del volumes[0]
+        del calls[:]
+        set_module_args(args)
+        with pytest.raises(AnsibleExitJson) as exc:
+            ontap_rest_info_module().apply()
+        print('Info: test_run_ontap_gather_facts_incremental_pass: %s' % repr(exc.value.args))
+        assert ('support/ems/events', {'max_records': 1024, 'fields': [], 'index': '>2'}) in calls
+        assert exc.value.args[0]['ontap_info']['support/ems/events']['num_records'] == 3
+        assert exc.value.args[0]['ontap_info']['storage/volumes']['num_records'] == 1
+        delta = exc.value.args[0]['ontap_info_delta']
+        assert delta['support/ems/events'] == dict(added=[dict(index=3, message='m3')], removed=list(), changed=list())
+        assert delta['storage/volumes'] == dict(added=list(),
+                                                removed=[dict(uuid='u1', name='vol1')],
+                                                changed=[dict(uuid='u2', name='vol2_renamed')])
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_columnar_pass(self, mock_request):
+        args = self.set_default_args()
+        args['gather_subset'] = ['volume_info']
+        args['output_format'] = 'columnar'
+        set_module_args(args)
+        records = [dict(name='vol1', svm=dict(name='svm1')), dict(name='vol2', svm=dict(name='svm1'))]
+        mock_request.side_effect = [SRR['validate_ontap_version_pass'], (200, dict(_links=dict(), records=records), None)]
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            ontap_rest_info_module().apply()
+        print('Info: test_run_ontap_gather_facts_columnar_pass: %s' % repr(exc.value.args))
+        assert exc.value.args[0]['ontap_info']['storage/volumes'] == dict(
+            num_records=2, fields=['name', 'svm.name'], columns=[['vol1', 'vol2'], dict(dictionary=['svm1'], indices=[0, 0])])
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_output_file_pass(self, mock_request):
+        args = self.set_default_args()
+        args['gather_subset'] = ['volume_info', 'ontap_system_version']
+        args['output_file'] = os.path.join(tempfile.mkdtemp(), 'info.json.gz')
+        set_module_args(args)
+        records = [dict(name='vol1'), dict(name='vol2')]
+        mock_request.side_effect = [SRR['validate_ontap_version_pass'],
+                                    (200, dict(_links=dict(), records=records), None),
+                                    (200, dict(version=dict(full='9.8')), None)]
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            ontap_rest_info_module().apply()
+        print('Info: test_run_ontap_gather_facts_output_file_pass: %s' % repr(exc.value.args))
+        assert exc.value.args[0]['output_file'] == args['output_file']
+        assert exc.value.args[0]['ontap_info'] == {'storage/volumes': dict(num_records=2), 'cluster/software': dict()}
+        with gzip.open(args['output_file'], 'rb') as output_file:
+            lines = [json.loads(line.decode('utf-8')) for line in output_file]
+        assert lines == [dict(subset='storage/volumes', record=dict(name='vol1')),
+                         dict(subset='storage/volumes', record=dict(name='vol2')),
+                         dict(subset='cluster/software', info=dict(version=dict(full='9.8')))]
+
+    @patch('ansible_collections.netapp.ontap.plugins.module_utils.netapp.OntapRestAPI.send_request')
+    def test_run_ontap_gather_facts_output_file_paged_pass(self, mock_request):
+        ''' records in a page are written before the next page is requested, max_records is honoured '''
+        args = self.set_default_args()
+        args['gather_subset'] = ['volume_info']
+        args['query'] = {'volume_info': {'max_records': 3}}
+        args['output_file'] = os.path.join(tempfile.mkdtemp(), 'info.json')
+        set_module_args(args)
+        my_obj = ontap_rest_info_module()
+        written = list()
+
+        def send_request(method, api, params, **kwargs):
+            if api == 'cluster':
+                return SRR['validate_ontap_version_pass']
+            written.append(my_obj.writer.count)
+            if api == 'next_record_api':
+                return 200, dict(_links=dict(), records=[dict(name='vol3'), dict(name='vol4')]), None
+            return 200, dict(_links=dict(next=dict(href='/api/next_record_api')), records=[dict(name='vol1'), dict(name='vol2')]), None
+        mock_request.side_effect = send_request
+
+        with pytest.raises(AnsibleExitJson) as exc:
+            my_obj.apply()
+        print('Info: test_run_ontap_gather_facts_output_file_paged_pass: %s' % repr(exc.value.args))
+        assert exc.value.args[0]['ontap_info'] == {'storage/volumes': dict(num_records=3)}
+        assert written == [0, 2]
+        with open(args['output_file'], 'rb') as output_file:
+            lines = [json.loads(line.decode('utf-8')) for line in output_file]
+        assert lines == [dict(subset='storage/volumes', record=dict(name='vol%d' % index)) for index in range(1, 4)]
@@ -395,6 +395,21 @@ class TestMyModule(unittest.TestCase):
         assert exc.value.args[0]['changed']
         snapmirror_restore.assert_called_with()
 
+    @patch('time.sleep')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_snapmirror.NetAppONTAPSnapmirror.snapmirror_get')
+    def test_wait_for_status_after_abort(self, snapmirror_get, mock_sleep):
+        ''' aborting is not a terminal state, wait until the relationship is not transferring or gone '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        snapmirror_get.side_effect = [dict(status='aborting'), dict(status='aborting'), dict(status='idle')]
+        assert my_obj.wait_for_status()
+        assert snapmirror_get.call_count == 3
+        assert mock_sleep.call_count == 2
+        snapmirror_get.side_effect = [dict(status='aborting'), None]
+        assert my_obj.wait_for_status()
+        snapmirror_get.side_effect = [dict(status='finalizing'), dict(status='quiesced')]
+        assert my_obj.wait_for_status()
+
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_snapmirror.NetAppONTAPSnapmirror.delete_snapmirror')
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_snapmirror.NetAppONTAPSnapmirror.wait_for_status')
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_snapmirror.NetAppONTAPSnapmirror.snapmirror_abort')
@@ -6,6 +6,7 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 import json
+import time
 import pytest
 
 from ansible.module_utils import basic
@@ -13,6 +14,7 @@ from ansible.module_utils._text import to_bytes
 from ansible_collections.netapp.ontap.tests.unit.compat import unittest
 from ansible_collections.netapp.ontap.tests.unit.compat.mock import patch, Mock
 import ansible_collections.netapp.ontap.plugins.module_utils.netapp as netapp_utils
+from ansible_collections.netapp.ontap.plugins.module_utils.task_runner import TaskModule
 
 from ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume \
     import NetAppOntapVolume as vol_module  # module under test
@@ -303,6 +305,30 @@ class MockONTAPConnection(object):
         return xml
 
 
+class MockBulkConnection(MockONTAPConnection):
+    ''' mock server connection, only the volume described by data exists, record ZAPI names '''
+
+    def __init__(self, data, failing_volumes=None):
+        super(MockBulkConnection, self).__init__(data=data)
+        self.zapis = list()
+        self.failing_volumes = failing_volumes or list()
+
+    def invoke_successfully(self, xml, enable_tunneling):  # pylint: disable=unused-argument
+        self.zapis.append(xml.get_name())
+        if xml.get_name() == 'volume-create' and xml['volume'] in self.failing_volumes:
+            raise netapp_utils.zapi.NaApiError(code='TEST', message='volume-create failed')
+        if xml.get_name() == 'sis-get-iter':
+            return self.build_sis_info()
+        if xml.get_name() == 'volume-get-iter':
+            names = xml['query']['volume-attributes']['volume-id-attributes']['name'].split('|')
+            if self.params['name'] in names:
+                xml = self.build_volume_info(self.params)
+                xml['attributes-list']['volume-attributes']['volume-id-attributes'].add_new_child('name', self.params['name'])
+                return xml
+            return netapp_utils.zapi.NaElement.create_node_with_children('xml', **{'num-records': '0'})
+        return netapp_utils.zapi.NaElement('xml')
+
+
 class TestMyModule(unittest.TestCase):
     ''' a group of related Unit Tests '''
 
@@ -413,6 +439,15 @@ class TestMyModule(unittest.TestCase):
         assert result['name'] == self.mock_vol['name']
         assert result['size'] == self.mock_vol['size']
 
+    def test_get_volume_desired_attributes(self):
+        ''' Test that get_volume only requests the attributes it reads '''
+        set_module_args(self.mock_args())
+        my_obj = self.get_volume_mock_object('volume')
+        my_obj.volume_get_iter('test_vol')
+        desired_attributes = my_obj.server.xml_in['desired-attributes']['volume-attributes']
+        assert desired_attributes['volume-space-attributes'].get_child_by_name('size') is not None
+        assert desired_attributes['volume-space-attributes'].get_child_by_name('size-total') is None
+
     def test_create_error_missing_param(self):
         ''' Test if create throws an error if aggregate_name is not specified'''
         data = self.mock_args()
@@ -631,10 +666,73 @@ class TestMyModule(unittest.TestCase):
             'junction_path': 'something'
         }
         obj = self.get_volume_mock_object('volume')
-        obj.modify_volume(modify)
+        batch = obj.new_request_batch()
+        obj.modify_volume(modify, batch)
+        batch.run_or_fail()
         change_state.assert_called_with()
         mount_volume.assert_called_with()
 
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.wait_for_volume_move')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.move_volume')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.modify_volume_efficiency_config')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.set_snapshot_auto_delete_option')
+    def test_modify_move_is_last(self, auto_delete, efficiency, move_volume, wait_for_move):
+        ''' a volume move starts once the other modify calls are complete, efficiency is changed once the move is complete '''
+        data = self.mock_args()
+        data['max_concurrency'] = 4
+        data['wait_for_completion'] = True
+        data['snapshot_auto_delete'] = {'state': 'on'}
+        set_module_args(data)
+        log = list()
+
+        def slow_efficiency(*args, **kwargs):  # pylint: disable=unused-argument
+            time.sleep(0.1)
+            log.append('efficiency')
+        auto_delete.side_effect = lambda *args, **kwargs: log.append('auto_delete')
+        efficiency.side_effect = slow_efficiency
+        move_volume.side_effect = lambda *args, **kwargs: log.append('move')
+        wait_for_move.side_effect = lambda *args, **kwargs: log.append('wait')
+        modify = {
+            'snapshot_auto_delete': {'state': 'on'},
+            'efficiency_policy': 'default',
+            'aggregate_name': 'aggr2'
+        }
+        obj = self.get_volume_mock_object('volume')
+        obj.volume_style = None
+        obj.take_modify_actions(modify)
+        assert log == ['auto_delete', 'move', 'wait', 'efficiency']
+
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.move_volume')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.modify_volume_efficiency_config')
+    def test_modify_move_skipped_on_error(self, efficiency, move_volume):
+        ''' efficiency settings are not changed if the volume move failed '''
+        data = self.mock_args()
+        data['max_concurrency'] = 4
+        set_module_args(data)
+        obj = self.get_volume_mock_object('volume')
+        obj.volume_style = None
+        move_volume.side_effect = lambda *args, **kwargs: TaskModule(obj.module).fail_json(msg='move error')
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.take_modify_actions({'efficiency_policy': 'default', 'aggregate_name': 'aggr2'})
+        assert exc.value.args[0]['msg'] == 'move error --- Skipped task modify_volume_efficiency_config as task move_volume failed'
+        efficiency.assert_not_called()
+
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.resize_volume')
+    @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.set_snapshot_auto_delete_option')
+    def test_modify_serial_stops_at_first_error(self, auto_delete, resize_volume):
+        ''' with the default max_concurrency, modify calls are sent one at a time, and the first error stops the module '''
+        data = self.mock_args()
+        data['snapshot_auto_delete'] = {'state': 'on', 'trigger': 'volume'}
+        set_module_args(data)
+        obj = self.get_volume_mock_object('volume')
+        obj.volume_style = None
+        auto_delete.side_effect = lambda *args, **kwargs: TaskModule(obj.module).fail_json(msg='auto delete error')
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.take_modify_actions({'snapshot_auto_delete': data['snapshot_auto_delete'], 'size': 20})
+        assert exc.value.args[0]['msg'] == 'auto delete error'
+        assert auto_delete.call_count == 1
+        resize_volume.assert_not_called()
+
     @patch('ansible_collections.netapp.ontap.plugins.modules.na_ontap_volume.NetAppOntapVolume.get_volume')
     def test_compare_chmod_value_true_1(self, get_volume):
         data = self.mock_args()
@@ -1013,7 +1111,7 @@ class TestMyModule(unittest.TestCase):
         job = 'job_info'
         success = 'success_modify_async'
         mount = 'job_info'  # not correct, but works
-        kind = [online, job, job, success, mount, job, job]
+        kind = [online, job, success, mount, job]
         obj = self.get_volume_mock_object(kind)
         with pytest.raises(AnsibleExitJson) as exc:
             obj.apply()
@@ -1145,10 +1243,33 @@ class TestMyModule(unittest.TestCase):
 
         }
         set_module_args(data)
+        obj = self.get_volume_mock_object('zapi_error')
+        batch = obj.new_request_batch()
+        obj.modify_volume(dict(snapshot_auto_delete=data['snapshot_auto_delete']), batch)
         with pytest.raises(AnsibleFailJson) as exc:
-            self.get_volume_mock_object('zapi_error').set_snapshot_auto_delete()
+            batch.run_or_fail()
         assert exc.value.args[0]['msg'] == 'Error setting snapshot auto delete options for volume test_vol: NetApp API failed. Reason - test:error'
 
+    def test_error_modify_reports_all_errors(self):
+        ''' independent modify calls are all sent, and their errors are reported together '''
+        data = {
+            'snapshot_auto_delete': {'state': 'on', 'trigger': 'snap_reserve'},
+            'hostname': 'test',
+            'username': 'test_user',
+            'password': 'test_pass!',
+            'name': 'test_vol',
+            'vserver': 'test_vserver',
+            'size': 20,
+            'max_concurrency': 2
+        }
+        set_module_args(data)
+        obj = self.get_volume_mock_object('zapi_error')
+        obj.volume_style = None
+        with pytest.raises(AnsibleFailJson) as exc:
+            obj.take_modify_actions(dict(snapshot_auto_delete=data['snapshot_auto_delete'], size=20))
+        msg = 'Error setting snapshot auto delete options for volume test_vol: NetApp API failed. Reason - test:error'
+        assert exc.value.args[0]['msg'] == ' --- '.join([msg, msg, 'Error re-sizing volume test_vol: NetApp API failed. Reason - test:error'])
+
     def test_successful_volume_rehost(self):
         data = {
             'hostname': 'test',
@@ -1224,3 +1345,65 @@ class TestMyModule(unittest.TestCase):
             self.get_volume_mock_object('flexgroup').apply()
         msg = 'Error: aggregate_name option cannot be used with FlexGroups.'
         assert msg == exc.value.args[0]['msg']
+
+    def get_bulk_mock_object(self, volumes, **kwargs):
+        data = self.mock_args()
+        del data['name']
+        data['volumes'] = volumes
+        data.update(kwargs)
+        set_module_args(data)
+        obj = self.get_volume_mock_object()
+        obj.server = MockBulkConnection(self.mock_vol)
+        return obj
+
+    def test_bulk_create_and_idempotency(self):
+        ''' one query for the current state of all volumes, results are reported per volume '''
+        for max_concurrency in (1, 2):
+            obj = self.get_bulk_mock_object([dict(name='test_vol'), dict(name='new_vol', size=10)], max_concurrency=max_concurrency)
+            with pytest.raises(AnsibleExitJson) as exc:
+                obj.apply()
+            assert exc.value.args[0]['changed']
+            assert [(volume['name'], volume['changed']) for volume in exc.value.args[0]['volumes']] == [('test_vol', False), ('new_vol', True)]
+            # initial query, and a get after create for new_vol
+            assert obj.server.zapis.count('volume-get-iter') == 2
+            assert obj.server.zapis.count('volume-create') == 1
+            assert obj.volumes[1]['size'] == 10 * 1024 ** 2
+
+    def test_bulk_one_volume_fails(self):
+        ''' the other volumes are still created, the error is reported for the failed volume '''
+        for max_concurrency in (1, 2):
+            obj = self.get_bulk_mock_object([dict(name='vol1'), dict(name='vol2'), dict(name='vol3')], max_concurrency=max_concurrency)
+            obj.server.failing_volumes = ['vol2']
+            with pytest.raises(AnsibleFailJson) as exc:
+                obj.apply()
+            result = exc.value.args[0]
+            assert result['msg'].startswith('Error managing volumes: vol2: Error provisioning volume vol2')
+            assert 'volume-create failed' in result['msg']
+            assert result['changed']
+            assert [volume['name'] for volume in result['volumes']] == ['vol1', 'vol2', 'vol3']
+            assert [volume['changed'] for volume in result['volumes'] if volume['name'] != 'vol2'] == [True, True]
+            assert 'error' not in result['volumes'][0]
+            assert 'volume-create failed' in result['volumes'][1]['error']
+            assert obj.server.zapis.count('volume-create') == 3
+
+    def test_bulk_errors(self):
+        ''' invalid entries are reported '''
+        for volumes, msg in (
+            ([dict(name='vol1'), dict(name='vol1')], 'Error: duplicate volume names in volumes: vol1'),
+            ([dict(name='vol1', hostname='other')], 'Error: option hostname is not supported in volumes entry'),
+            ([dict(name='vol1', size='large')], 'Error: invalid value for size in volumes entry'),
+            ([dict(name='vol1', space_guarantee='thin')], 'Error: value of space_guarantee must be one of: none, file, volume'),
+            ([dict(size=10)], 'Error: name is required in volumes entry'),
+            ([dict(name='vol1', space_guarantee='none')], 'Error: parameters are mutually exclusive: space_guarantee|space_slo'),
+        ):
+            with pytest.raises(AnsibleFailJson) as exc:
+                self.get_bulk_mock_object(volumes).apply()
+            assert exc.value.args[0]['msg'].startswith(msg)
+
+    def test_bulk_name_is_exclusive(self):
+        data = self.mock_args()
+        data['volumes'] = [dict(name='vol1')]
+        set_module_args(data)
+        with pytest.raises(AnsibleFailJson) as exc:
+            vol_module()
+        assert 'mutually exclusive' in exc.value.args[0]['msg']
@@ -84,6 +84,10 @@ def na_storagegrid_host_argument_spec():
     )
 
 
+# number of records requested per page for list APIs
+DEFAULT_PAGE_SIZE = 350
+
+
 class SGRestAPI(object):
     def __init__(self, module, timeout=60):
         self.module = module
@@ -92,6 +96,8 @@ class SGRestAPI(object):
         self.verify = self.module.params["validate_certs"]
         self.timeout = timeout
         self.check_required_library()
+        # name to id indexes, built once per module run
+        self.name_indexes = dict()
 
     def check_required_library(self):
         if not HAS_REQUESTS:
@@ -171,3 +177,53 @@ class SGRestAPI(object):
     def delete(self, api, data, params=None):
         method = "DELETE"
         return self.send_request(method, api, params, json=data)
+
+    def iter_pages(self, api, params=None, limit=DEFAULT_PAGE_SIZE, marker_field="id"):
+        """ generator yielding (records, error) for each page of a list API
+            pages are requested with limit and marker, the marker being the marker_field value of the last record
+            iteration stops after the first error, or when a page has less than limit records
+        """
+        params = dict(params or dict(), limit=limit)
+        while True:
+            response, error = self.get(api, params)
+            if error:
+                yield None, error
+                return
+            records = response.get("data") or list()
+            yield records, None
+            if len(records) < limit or records[-1].get(marker_field) is None:
+                return
+            params["marker"] = records[-1][marker_field]
+
+    def get_all_records(self, api, params=None, limit=DEFAULT_PAGE_SIZE, marker_field="id"):
+        """ return all the records from all pages, and an error if any """
+        all_records = list()
+        for records, error in self.iter_pages(api, params, limit, marker_field):
+            if error:
+                return None, error
+            all_records.extend(records)
+        return all_records, None
+
+    def find_record(self, api, field, value, params=None, limit=DEFAULT_PAGE_SIZE):
+        """ return the first record where field matches value, and an error if any
+            pages are only requested until a match is found
+        """
+        for records, error in self.iter_pages(api, params, limit):
+            if error:
+                return None, error
+            for record in records:
+                if record.get(field) == value:
+                    return record, None
+        return None, None
+
+    def get_name_to_id_map(self, api, name_field="name", id_field="id"):
+        """ return a dict mapping name_field to id_field for all records, and an error if any
+            the index is cached for the module run
+        """
+        key = (api, name_field, id_field)
+        if key not in self.name_indexes:
+            records, error = self.get_all_records(api)
+            if error:
+                return None, error
+            self.name_indexes[key] = dict((record[name_field], record[id_field]) for record in records)
+        return self.name_indexes[key], None
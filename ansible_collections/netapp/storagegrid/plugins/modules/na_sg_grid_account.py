@@ -243,16 +243,15 @@ class SgGridAccount(object):
     def get_tenant_account_id(self):
         # Check if tenant account exists
         # Return tenant account info if found, or None
-        api = "api/v3/grid/accounts?limit=350"
+        api = "api/v3/grid/accounts"
 
-        list_accounts, error = self.rest_api.get(api)
+        account, error = self.rest_api.find_record(api, "name", self.parameters["name"])
 
         if error:
             self.module.fail_json(msg=error)
 
-        for account in list_accounts.get("data"):
-            if account["name"] == self.parameters["name"]:
-                return account["id"]
+        if account:
+            return account["id"]
 
         return None
 
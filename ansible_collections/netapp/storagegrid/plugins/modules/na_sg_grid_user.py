@@ -174,20 +174,14 @@ class SgGridUser(object):
     def get_grid_groups(self):
         # Get list of admin groups
         # Retrun mapping of uniqueName to ids if found, or None
-        api = "api/v3/grid/groups?limit=350"
+        api = "api/v3/grid/groups"
 
-        response, error = self.rest_api.get(api)
+        name_to_id_map, error = self.rest_api.get_name_to_id_map(api, "uniqueName")
 
         if error:
             self.module.fail_json(msg=error)
 
-        if response["data"]:
-            name_to_id_map = dict(
-                zip(
-                    [i["uniqueName"] for i in response["data"]],
-                    [j["id"] for j in response["data"]],
-                )
-            )
+        if name_to_id_map:
             return name_to_id_map
 
         return None
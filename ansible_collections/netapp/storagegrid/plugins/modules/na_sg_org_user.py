@@ -168,19 +168,13 @@ class SgOrgUser(object):
     def get_org_groups(self):
         # Get list of groups
         # Retrun mapping of uniqueName to ids if found, or None
-        api = "api/v3/org/groups?limit=350"
-        response, error = self.rest_api.get(api)
+        api = "api/v3/org/groups"
+        name_to_id_map, error = self.rest_api.get_name_to_id_map(api, "uniqueName")
 
         if error:
             self.module.fail_json(msg=error)
 
-        if response["data"]:
-            name_to_id_map = dict(
-                zip(
-                    [i["uniqueName"] for i in response["data"]],
-                    [j["id"] for j in response["data"]],
-                )
-            )
+        if name_to_id_map:
             return name_to_id_map
 
         return None
@@ -371,3 +371,26 @@ class TestMyModule(unittest.TestCase):
             % repr(exc.value.args[0])
         )
         assert exc.value.args[0]["changed"]
+
+    @patch(
+        "ansible_collections.netapp.storagegrid.plugins.module_utils.netapp.SGRestAPI.send_request"
+    )
+    def test_get_tenant_account_id_on_second_page_pass(self, mock_request):
+        set_module_args(self.set_args_create_na_sg_grid_account())
+        my_obj = grid_account_module()
+        calls = []
+        first_page = [{"name": "tenant%d" % index, "id": str(index)} for index in range(350)]
+        second_page = [{"name": "TestTenantAccount", "id": "12345678901234567890"}, {"name": "other", "id": "999"}]
+
+        def send_request(method, api, params, json=None):
+            calls.append((api, dict(params)))
+            if "marker" not in params:
+                return {"data": first_page}, None
+            return {"data": second_page}, None
+
+        mock_request.side_effect = send_request
+        assert my_obj.get_tenant_account_id() == "12345678901234567890"
+        assert calls == [
+            ("api/v3/grid/accounts", {"limit": 350}),
+            ("api/v3/grid/accounts", {"limit": 350, "marker": "349"}),
+        ]
@@ -467,3 +467,28 @@ class TestMyModule(unittest.TestCase):
         print(
             "Info: test_fail_set_federated_user_password: %s" % repr(exc.value.args[0])
         )
+
+    @patch(
+        "ansible_collections.netapp.storagegrid.plugins.module_utils.netapp.SGRestAPI.send_request"
+    )
+    def test_get_org_groups_all_pages_pass(self, mock_request):
+        set_module_args(self.set_args_create_na_sg_org_user())
+        my_obj = org_user_module()
+        calls = []
+        first_page = [{"uniqueName": "group/group%d" % index, "id": "id%d" % index} for index in range(350)]
+        second_page = [{"uniqueName": "group/testorggroup1", "id": "id350"}]
+
+        def send_request(method, api, params, json=None):
+            calls.append((api, dict(params)))
+            if "marker" not in params:
+                return {"data": first_page}, None
+            return {"data": second_page}, None
+
+        mock_request.side_effect = send_request
+        org_groups = my_obj.get_org_groups()
+        assert len(org_groups) == 351
+        assert org_groups["group/testorggroup1"] == "id350"
+        assert calls[1] == ("api/v3/org/groups", {"limit": 350, "marker": "id349"})
+        # the index is cached for the module run
+        assert my_obj.get_org_groups() is org_groups
+        assert len(calls) == 2
@@ -49,6 +49,13 @@ try:
 except ImportError:
     HAS_REQUESTS = False
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    # python 2.7 - pages are fetched one after the other
+    HAS_FUTURES = False
+
 ERROR_MSG = dict(
     no_cserver='This module is expected to run as cluster admin'
 )
@@ -140,6 +147,60 @@ class UMRestAPI(object):
         method = 'GET'
         return self.send_request(method, api, params)
 
+    @staticmethod
+    def get_next_api(message):
+        ''' return the api for the next page, relative to /api/, or None '''
+        try:
+            href = message['_links']['next']['href']
+        except (KeyError, TypeError):
+            return None
+        if href.startswith('/api/'):
+            return href[len('/api/'):]
+        return href
+
+    def iter_pages(self, api, params=None, max_records=None, order_by=None, fields=None, prefetch=True):
+        ''' generator yielding (message, error) for each page of a collection, following _links.next
+            max_records: number of records per page
+            order_by, fields: passed as query parameters, eg order_by='performance_capacity.used'
+            when prefetch is True, the next page is requested while the caller processes the current one
+            iteration stops after the first error
+        '''
+        params = dict(params or dict())
+        if max_records is not None:
+            params['max_records'] = max_records
+        if order_by is not None:
+            params['order_by'] = order_by
+        if fields is not None:
+            params['fields'] = ','.join(fields) if isinstance(fields, (list, tuple)) else fields
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch and HAS_FUTURES else None
+        try:
+            message, error = self.get(api, params)
+            while True:
+                if error:
+                    yield None, error
+                    return
+                next_api = self.get_next_api(message)
+                future = None
+                if next_api is not None and executor is not None:
+                    # the next link already includes the query parameters
+                    future = executor.submit(self.get, next_api, None)
+                yield message, None
+                if next_api is None:
+                    return
+                message, error = future.result() if future is not None else self.get(next_api, None)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def get_records(self, api, params=None, max_records=None, order_by=None, fields=None):
+        ''' return all the records from all pages, and an error if any '''
+        records = list()
+        for message, error in self.iter_pages(api, params, max_records, order_by, fields):
+            if error:
+                return None, error
+            records.extend(message.get('records') or [])
+        return records, None
+
     def log_error(self, status_code, message):
         self.errors.append(message)
         self.debug_logs.append((status_code, message))
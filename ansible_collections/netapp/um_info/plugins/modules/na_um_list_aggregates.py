@@ -132,14 +132,11 @@ class NetAppUMAggregate(object):
             Dictionary of current details if aggregates found
             None if aggregates is not found
         """
-        data = {}
-        api = "datacenter/storage/aggregates?order_by=performance_capacity.used"
-        message, error = self.rest_api.get(api, data)
+        api = "datacenter/storage/aggregates"
+        records, error = self.rest_api.get_records(api, order_by='performance_capacity.used')
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
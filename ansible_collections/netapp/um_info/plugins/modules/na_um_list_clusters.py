@@ -121,14 +121,11 @@ class NetAppUMCluster(object):
             Dictionary of current details if clusters found
             None if clusters is not found
         """
-        data = {}
         api = "datacenter/cluster/clusters"
-        message, error = self.rest_api.get(api, data)
+        records, error = self.rest_api.get_records(api)
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
@@ -114,14 +114,11 @@ class NetAppUMNode(object):
             Dictionary of current details if nodes found
             None if nodes is not found
         """
-        data = {}
-        api = "datacenter/cluster/nodes?order_by=performance_capacity.used"
-        message, error = self.rest_api.get(api, data)
+        api = "datacenter/cluster/nodes"
+        records, error = self.rest_api.get_records(api, order_by='performance_capacity.used')
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
@@ -143,14 +143,11 @@ class NetAppUMSVM(object):
             Dictionary of current details if svms found
             None if svms is not found
         """
-        data = {}
         api = "datacenter/svm/svms"
-        message, error = self.rest_api.get(api, data)
+        records, error = self.rest_api.get_records(api)
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
@@ -102,14 +102,11 @@ class NetAppUMVolume(object):
             Dictionary of current details if volumes found
             None if volumes is not found
         """
-        data = {}
         api = "datacenter/storage/volumes"
-        message, error = self.rest_api.get(api, data)
+        records, error = self.rest_api.get_records(api)
         if error:
             self.module.fail_json(msg=error)
-        if message['total_records'] != 0:
-            return message['records']
-        return []
+        return records
 
     def apply(self):
         """
@@ -117,3 +117,39 @@ class TestMyModule(unittest.TestCase):
         my_obj = my_module()
         my_obj.get_volumes = Mock(return_value=SRR['get_volumes'])
         assert my_obj.get_volumes() is not None
+
+    @patch('ansible_collections.netapp.um_info.plugins.module_utils.netapp.UMRestAPI.send_request')
+    def test_get_volumes_follows_next_links(self, mock_request):
+        ''' all pages are returned '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        mock_request.side_effect = [
+            ({'records': [{'name': 'vol1'}, {'name': 'vol2'}], 'total_records': 3,
+              '_links': {'next': {'href': '/api/datacenter/storage/volumes?offset=2'}}}, None),
+            ({'records': [{'name': 'vol3'}], 'total_records': 3, '_links': {}}, None),
+        ]
+        assert my_obj.get_volumes() == [{'name': 'vol1'}, {'name': 'vol2'}, {'name': 'vol3'}]
+        assert mock_request.call_args_list[1][0] == ('GET', 'datacenter/storage/volumes?offset=2', None)
+
+    @patch('ansible_collections.netapp.um_info.plugins.module_utils.netapp.UMRestAPI.send_request')
+    def test_get_volumes_error_on_next_page(self, mock_request):
+        ''' an error on any page is reported '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        mock_request.side_effect = [
+            ({'records': [{'name': 'vol1'}], '_links': {'next': {'href': '/api/datacenter/storage/volumes?offset=1'}}}, None),
+            SRR['generic_error'],
+        ]
+        with pytest.raises(AnsibleFailJson) as exc:
+            my_obj.get_volumes()
+        assert exc.value.args[0]['msg'] == 'Expected error'
+
+    @patch('ansible_collections.netapp.um_info.plugins.module_utils.netapp.UMRestAPI.send_request')
+    def test_iter_pages_query_parameters(self, mock_request):
+        ''' max_records, order_by and fields are sent as query parameters '''
+        set_module_args(self.set_default_args())
+        my_obj = my_module()
+        mock_request.side_effect = [({'records': [], 'total_records': 0}, None)]
+        records, error = my_obj.rest_api.get_records('datacenter/storage/volumes', max_records=100, order_by='name', fields=['name', 'uuid'])
+        assert (records, error) == ([], None)
+        assert mock_request.call_args[0][2] == {'max_records': 100, 'order_by': 'name', 'fields': 'name,uuid'}